@@ -0,0 +1,33 @@
+"""user daily activity rollup
+
+Revision ID: 0002_user_daily_activity
+Revises: 0001_initial
+Create Date: 2026-10-19 00:00:00.000000
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0002_user_daily_activity"
+down_revision: Union[str, None] = "0001_initial"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "user_daily_activity",
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("activity_date", sa.Date(), primary_key=True),
+        sa.Column("sessions_completed", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("cards_reviewed", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("lapses", sa.Integer(), server_default="0", nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("user_daily_activity")
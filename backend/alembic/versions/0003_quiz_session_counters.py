@@ -0,0 +1,43 @@
+"""quiz session response counters
+
+Revision ID: 0003_quiz_session_counters
+Revises: 0002_user_daily_activity
+Create Date: 2026-10-19 00:00:00.000000
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0003_quiz_session_counters"
+down_revision: Union[str, None] = "0002_user_daily_activity"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+COUNTERS = {
+    "total_responses": "1 = 1",
+    "correct_count": "r.is_correct IS TRUE",
+    "incorrect_count": "r.is_correct IS FALSE",
+    "unanswered_count": "r.is_correct IS NULL",
+}
+
+
+def upgrade() -> None:
+    for column in COUNTERS:
+        op.add_column("quiz_sessions", sa.Column(column, sa.Integer(), server_default="0", nullable=False))
+
+    # Seed the counters for existing sessions from the responses aggregate.
+    for column, condition in COUNTERS.items():
+        op.execute(
+            f"UPDATE quiz_sessions SET {column} = ("
+            f"SELECT COUNT(*) FROM quiz_responses r WHERE r.session_id = quiz_sessions.id AND {condition})"
+        )
+
+
+def downgrade() -> None:
+    for column in reversed(list(COUNTERS)):
+        op.drop_column("quiz_sessions", column)
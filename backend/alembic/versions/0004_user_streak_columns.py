@@ -0,0 +1,43 @@
+"""user streak and llm settings columns
+
+Revision ID: 0004_user_streak_columns
+Revises: 0003_quiz_session_counters
+Create Date: 2026-10-19 00:00:00.000000
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0004_user_streak_columns"
+down_revision: Union[str, None] = "0003_quiz_session_counters"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _columns() -> list[sa.Column]:
+    return [
+        sa.Column("current_streak", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("longest_streak", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("last_activity_date", sa.Date(), nullable=True),
+        sa.Column("openai_api_key", sa.String(), nullable=True),
+        sa.Column("llm_provider_preference", sa.String(), nullable=True),
+    ]
+
+
+def upgrade() -> None:
+    # Databases set up from the README may already carry these columns from the manual ALTERs.
+    existing = {column["name"] for column in sa.inspect(op.get_bind()).get_columns("users")}
+    for column in _columns():
+        if column.name not in existing:
+            op.add_column("users", column)
+
+
+def downgrade() -> None:
+    # Only the streak columns: the LLM settings columns may predate this migration (manual ALTERs),
+    # and upgrade() skips columns that already exist, so leaving them in place is safe.
+    for name in ("last_activity_date", "longest_streak", "current_streak"):
+        op.drop_column("users", name)
@@ -0,0 +1,36 @@
+"""fsrs scheduler state and scheduler preferences
+
+Revision ID: 0005_srs_schedulers
+Revises: 0004_user_streak_columns
+Create Date: 2026-10-19 00:00:00.000000
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0005_srs_schedulers"
+down_revision: Union[str, None] = "0004_user_streak_columns"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("srs_reviews", sa.Column("last_reviewed_at", sa.DateTime(timezone=True), nullable=True))
+    op.add_column("srs_reviews", sa.Column("stability", sa.Float(), nullable=True))
+    op.add_column("srs_reviews", sa.Column("difficulty", sa.Float(), nullable=True))
+    op.add_column("users", sa.Column("srs_scheduler", sa.String(length=16), server_default="sm2", nullable=False))
+    op.add_column("users", sa.Column("fsrs_weights", sa.JSON(), nullable=True))
+    op.add_column("decks", sa.Column("srs_scheduler", sa.String(length=16), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("decks", "srs_scheduler")
+    op.drop_column("users", "fsrs_weights")
+    op.drop_column("users", "srs_scheduler")
+    op.drop_column("srs_reviews", "difficulty")
+    op.drop_column("srs_reviews", "stability")
+    op.drop_column("srs_reviews", "last_reviewed_at")
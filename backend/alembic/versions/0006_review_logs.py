@@ -0,0 +1,87 @@
+"""append-only review log
+
+Revision ID: 0006_review_logs
+Revises: 0005_srs_schedulers
+Create Date: 2026-10-19 00:00:00.000000
+
+On Postgres, ``alembic -x partition_review_logs=true upgrade head`` creates the table
+range-partitioned by month on ``reviewed_at``, with a default partition. Create the
+monthly partitions with ``scripts/create_review_log_partitions.py``.
+"""
+
+from typing import Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0006_review_logs"
+down_revision: Union[str, None] = "0005_srs_schedulers"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+_PARTITIONED_TABLE = """
+CREATE TABLE review_logs (
+    id BIGSERIAL NOT NULL,
+    user_id INTEGER NOT NULL REFERENCES users (id) ON DELETE CASCADE,
+    card_id INTEGER NOT NULL,
+    reviewed_at TIMESTAMP WITH TIME ZONE NOT NULL,
+    quality SMALLINT NOT NULL,
+    scheduler SMALLINT NOT NULL,
+    elapsed_days REAL NOT NULL,
+    repetitions_before SMALLINT NOT NULL,
+    interval_days_before INTEGER NOT NULL,
+    easiness_before REAL NOT NULL,
+    stability_before REAL,
+    difficulty_before REAL,
+    repetitions SMALLINT NOT NULL,
+    interval_days INTEGER NOT NULL,
+    easiness REAL NOT NULL,
+    stability REAL,
+    difficulty REAL,
+    PRIMARY KEY (id, reviewed_at)
+) PARTITION BY RANGE (reviewed_at)
+"""
+
+
+def _partitioned() -> bool:
+    requested = context.get_x_argument(as_dictionary=True).get("partition_review_logs", "")
+    return op.get_bind().dialect.name == "postgresql" and requested.lower() in ("1", "true", "yes")
+
+
+def upgrade() -> None:
+    if _partitioned():
+        # The partition key must be part of the primary key
+        op.execute(_PARTITIONED_TABLE)
+        op.execute("CREATE TABLE review_logs_default PARTITION OF review_logs DEFAULT")
+    else:
+        op.create_table(
+            "review_logs",
+            sa.Column("id", sa.BigInteger().with_variant(sa.Integer(), "sqlite"), primary_key=True),
+            sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+            sa.Column("card_id", sa.Integer(), nullable=False),
+            sa.Column("reviewed_at", sa.DateTime(timezone=True), nullable=False),
+            sa.Column("quality", sa.SmallInteger(), nullable=False),
+            sa.Column("scheduler", sa.SmallInteger(), nullable=False),
+            sa.Column("elapsed_days", sa.REAL(), nullable=False),
+            sa.Column("repetitions_before", sa.SmallInteger(), nullable=False),
+            sa.Column("interval_days_before", sa.Integer(), nullable=False),
+            sa.Column("easiness_before", sa.REAL(), nullable=False),
+            sa.Column("stability_before", sa.REAL(), nullable=True),
+            sa.Column("difficulty_before", sa.REAL(), nullable=True),
+            sa.Column("repetitions", sa.SmallInteger(), nullable=False),
+            sa.Column("interval_days", sa.Integer(), nullable=False),
+            sa.Column("easiness", sa.REAL(), nullable=False),
+            sa.Column("stability", sa.REAL(), nullable=True),
+            sa.Column("difficulty", sa.REAL(), nullable=True),
+        )
+    op.create_index("ix_review_logs_user_reviewed_at", "review_logs", ["user_id", "reviewed_at"])
+    op.create_index("ix_review_logs_reviewed_at", "review_logs", ["reviewed_at"], postgresql_using="brin")
+
+
+def downgrade() -> None:
+    op.drop_index("ix_review_logs_reviewed_at", table_name="review_logs")
+    op.drop_index("ix_review_logs_user_reviewed_at", table_name="review_logs")
+    op.drop_table("review_logs")
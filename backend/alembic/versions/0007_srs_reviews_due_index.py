@@ -0,0 +1,25 @@
+"""srs_reviews (user_id, due_at) index
+
+Revision ID: 0007_srs_reviews_due_index
+Revises: 0006_review_logs
+Create Date: 2026-10-19 00:00:00.000000
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0007_srs_reviews_due_index"
+down_revision: Union[str, None] = "0006_review_logs"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_srs_reviews_user_due_at", "srs_reviews", ["user_id", "due_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_srs_reviews_user_due_at", table_name="srs_reviews")
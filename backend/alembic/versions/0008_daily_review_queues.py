@@ -0,0 +1,36 @@
+"""daily review queues
+
+Revision ID: 0008_daily_review_queues
+Revises: 0007_srs_reviews_due_index
+Create Date: 2026-10-19 00:00:00.000000
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0008_daily_review_queues"
+down_revision: Union[str, None] = "0007_srs_reviews_due_index"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "daily_review_queues",
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("deck_id", sa.Integer(), sa.ForeignKey("decks.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("queue_date", sa.Date(), nullable=False),
+        sa.Column("card_ids", sa.JSON(), nullable=False),
+        sa.Column("position", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("review_count", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("new_count", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("built_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("daily_review_queues")
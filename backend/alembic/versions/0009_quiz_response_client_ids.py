@@ -0,0 +1,33 @@
+"""client review ids on quiz responses for offline sync
+
+Revision ID: 0009_quiz_response_client_ids
+Revises: 0008_daily_review_queues
+Create Date: 2026-10-19 00:00:00.000000
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0009_quiz_response_client_ids"
+down_revision: Union[str, None] = "0008_daily_review_queues"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("quiz_responses", sa.Column("client_review_id", sa.String(length=64), nullable=True))
+    op.create_index(
+        "uq_quiz_responses_session_client_review",
+        "quiz_responses",
+        ["session_id", "client_review_id"],
+        unique=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("uq_quiz_responses_session_client_review", table_name="quiz_responses")
+    op.drop_column("quiz_responses", "client_review_id")
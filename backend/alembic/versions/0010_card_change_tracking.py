@@ -0,0 +1,36 @@
+"""card change tracking for deck delta sync
+
+Revision ID: 0010_card_change_tracking
+Revises: 0009_quiz_response_client_ids
+Create Date: 2026-10-19 00:00:00.000000
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0010_card_change_tracking"
+down_revision: Union[str, None] = "0009_quiz_response_client_ids"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_cards_deck_updated_at", "cards", ["deck_id", "updated_at"])
+    op.create_table(
+        "card_tombstones",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("deck_id", sa.Integer(), sa.ForeignKey("decks.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("card_id", sa.Integer(), nullable=False),
+        sa.Column("deleted_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+    )
+    op.create_index("ix_card_tombstones_deck_deleted_at", "card_tombstones", ["deck_id", "deleted_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_card_tombstones_deck_deleted_at", table_name="card_tombstones")
+    op.drop_table("card_tombstones")
+    op.drop_index("ix_cards_deck_updated_at", table_name="cards")
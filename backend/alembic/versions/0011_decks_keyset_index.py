@@ -0,0 +1,25 @@
+"""keyset pagination index on decks
+
+Revision ID: 0011_decks_keyset_index
+Revises: 0010_card_change_tracking
+Create Date: 2026-10-19 00:00:00.000000
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0011_decks_keyset_index"
+down_revision: Union[str, None] = "0010_card_change_tracking"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_decks_created_at_id", "decks", ["created_at", "id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_decks_created_at_id", table_name="decks")
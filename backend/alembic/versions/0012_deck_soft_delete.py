@@ -0,0 +1,28 @@
+"""mark decks deleted ahead of their purge
+
+Revision ID: 0012_deck_soft_delete
+Revises: 0011_decks_keyset_index
+Create Date: 2026-10-19 00:00:00.000000
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0012_deck_soft_delete"
+down_revision: Union[str, None] = "0011_decks_keyset_index"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("decks", sa.Column("deleted_at", sa.DateTime(timezone=True), nullable=True))
+    op.create_index("ix_decks_deleted_at", "decks", ["deleted_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_decks_deleted_at", table_name="decks")
+    op.drop_column("decks", "deleted_at")
@@ -0,0 +1,41 @@
+"""copy-on-write deck forks
+
+Revision ID: 0013_deck_forks
+Revises: 0012_deck_soft_delete
+Create Date: 2026-10-19 00:00:00.000000
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0013_deck_forks"
+down_revision: Union[str, None] = "0012_deck_soft_delete"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Batch mode: SQLite cannot add a foreign key to an existing table
+    with op.batch_alter_table("decks") as batch:
+        batch.add_column(sa.Column("forked_from_id", sa.Integer(), nullable=True))
+        batch.create_foreign_key("fk_decks_forked_from_id", "decks", ["forked_from_id"], ["id"], ondelete="SET NULL")
+        batch.create_index("ix_decks_forked_from_id", ["forked_from_id"])
+    op.add_column("cards", sa.Column("source_card_id", sa.Integer(), nullable=True))
+    op.create_table(
+        "hidden_cards",
+        sa.Column("deck_id", sa.Integer(), sa.ForeignKey("decks.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("card_id", sa.Integer(), primary_key=True),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("hidden_cards")
+    op.drop_column("cards", "source_card_id")
+    with op.batch_alter_table("decks") as batch:
+        batch.drop_index("ix_decks_forked_from_id")
+        batch.drop_constraint("fk_decks_forked_from_id", type_="foreignkey")
+        batch.drop_column("forked_from_id")
@@ -0,0 +1,29 @@
+"""card content hashes for duplicate detection
+
+Revision ID: 0014_card_content_hash
+Revises: 0013_deck_forks
+Create Date: 2026-10-19 00:00:00.000000
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0014_card_content_hash"
+down_revision: Union[str, None] = "0013_deck_forks"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Existing rows are hashed by scripts/backfill_card_hashes.py
+    op.add_column("cards", sa.Column("content_hash", sa.String(length=32), nullable=True))
+    op.create_index("ix_cards_deck_content_hash", "cards", ["deck_id", "content_hash"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_cards_deck_content_hash", table_name="cards")
+    op.drop_column("cards", "content_hash")
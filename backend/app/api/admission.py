@@ -0,0 +1,185 @@
+"""
+Admission control: per-client rate limits and a global cap on concurrent requests.
+
+Routes opt in with ``dependencies=[Depends(admit_read)]``. The dependency runs on the
+event loop before any database dependency, so rejected requests never take a worker
+thread from the pool that sync routes share.
+
+- Each client gets a token bucket per route class (``read``, ``answer``, ``write``),
+  with the rate and burst from ``RATE_LIMITS``. A request on an empty bucket is answered
+  ``429`` with a ``Retry-After`` of the time until the next token.
+- At most ``ADMISSION_MAX_CONCURRENCY`` admitted requests run at once. Excess requests
+  wait in line. When ``ADMISSION_MAX_QUEUE`` are already waiting, or a request has waited
+  ``ADMISSION_QUEUE_TIMEOUT_SECONDS``, it is shed with ``503`` and a ``Retry-After``.
+
+Clients are identified without a database lookup: by the subject of a bearer token
+whose signature and expiry check out, otherwise by address. An unverified token counts
+against the address, so making up a new token per request does not get a new bucket.
+Counts are exposed on ``/metrics`` as ``admission_*``.
+"""
+import asyncio
+import math
+import threading
+import time
+from collections.abc import AsyncIterator, Callable
+
+from fastapi import HTTPException, Request, status
+
+from ..core.config import settings
+from ..core.metrics import metrics
+from ..services import auth as auth_service
+
+# Idle buckets are dropped once this many exist; a full bucket carries no state
+_MAX_BUCKETS = 100_000
+
+
+class TokenBuckets:
+    """Token buckets per (route class, client), refilled lazily on each take."""
+
+    def __init__(self, limits: dict[str, tuple[float, float]]) -> None:
+        self.limits = limits
+        self._buckets: dict[tuple[str, str], list[float]] = {}
+        self._lock = threading.Lock()
+
+    def take(self, route_class: str, client: str, now: float | None = None) -> float:
+        """Take one token; returns 0 when admitted, else seconds until a token is available."""
+        limit = self.limits.get(route_class)
+        if limit is None:
+            return 0.0
+        rate, burst = limit
+        now = time.monotonic() if now is None else now
+        key = (route_class, client)
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                if len(self._buckets) >= _MAX_BUCKETS:
+                    self._evict_full(now)
+                bucket = self._buckets[key] = [burst, now]
+            tokens = min(burst, bucket[0] + (now - bucket[1]) * rate)
+            bucket[1] = now
+            if tokens >= 1:
+                bucket[0] = tokens - 1
+                return 0.0
+            bucket[0] = tokens
+            return (1 - tokens) / rate if rate > 0 else math.inf
+
+    def _evict_full(self, now: float) -> None:
+        for key, (tokens, updated) in list(self._buckets.items()):
+            rate, burst = self.limits.get(key[0], (0.0, 0.0))
+            if tokens + (now - updated) * rate >= burst:
+                del self._buckets[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._buckets.clear()
+
+
+class ConcurrencyGate:
+    """Caps concurrent admitted requests; a bounded number may wait for a slot."""
+
+    def __init__(self, max_concurrency: int, max_queue: int, queue_timeout: float) -> None:
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self._semaphore: asyncio.Semaphore | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._waiting = 0
+
+        self._in_flight = metrics.gauge("admission_in_flight", "Admitted requests currently running")
+        self._queued = metrics.gauge("admission_queued", "Requests waiting for a concurrency slot")
+        self._queued_total = metrics.meter("admission_queued_total", "Requests that had to wait for a slot")
+        self._shed = metrics.meter("admission_shed", "Requests shed by the global concurrency cap")
+        self._wait = metrics.summary("admission_wait_seconds", "Time queued requests waited for a slot")
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._loop = loop
+            self._waiting = 0
+        return self._semaphore
+
+    async def acquire(self) -> None:
+        semaphore = self._get_semaphore()
+        if semaphore.locked():
+            if self._waiting >= self.max_queue:
+                self._shed.inc()
+                raise _overloaded(self.queue_timeout)
+            self._waiting += 1
+            self._queued.inc()
+            self._queued_total.inc()
+            started = time.monotonic()
+            try:
+                await asyncio.wait_for(semaphore.acquire(), self.queue_timeout)
+            except asyncio.TimeoutError:
+                self._shed.inc()
+                raise _overloaded(self.queue_timeout) from None
+            finally:
+                self._waiting -= 1
+                self._queued.dec()
+                self._wait.observe(time.monotonic() - started)
+        else:
+            await semaphore.acquire()
+        self._in_flight.inc()
+
+    def release(self) -> None:
+        assert self._semaphore is not None
+        self._in_flight.dec()
+        self._semaphore.release()
+
+
+def _retry_after(seconds: float) -> str:
+    return str(max(1, math.ceil(seconds)))
+
+
+def _overloaded(retry_after: float) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Server busy, retry later",
+        headers={"Retry-After": _retry_after(retry_after)},
+    )
+
+
+def client_key(request: Request) -> str:
+    subject = auth_service.token_subject(request.headers.get("authorization"))
+    if subject is not None:
+        return "user:" + subject
+    return "addr:" + (request.client.host if request.client else "unknown")
+
+
+rate_limits = TokenBuckets(settings.RATE_LIMITS)
+concurrency_gate = ConcurrencyGate(
+    settings.ADMISSION_MAX_CONCURRENCY,
+    settings.ADMISSION_MAX_QUEUE,
+    settings.ADMISSION_QUEUE_TIMEOUT_SECONDS,
+)
+
+
+def admit(route_class: str) -> Callable[[Request], AsyncIterator[None]]:
+    """Route dependency admitting requests of ``route_class``, or rejecting them with 429/503."""
+    rejected = metrics.meter(f"admission_rejected_{route_class}", f"{route_class} requests over the client rate limit")
+
+    async def dependency(request: Request) -> AsyncIterator[None]:
+        if not settings.ADMISSION_ENABLED:
+            yield
+            return
+        wait = rate_limits.take(route_class, client_key(request))
+        if wait > 0:
+            rejected.inc()
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Rate limit exceeded",
+                headers={"Retry-After": _retry_after(wait)},
+            )
+        await concurrency_gate.acquire()
+        try:
+            yield
+        finally:
+            concurrency_gate.release()
+
+    return dependency
+
+
+admit_read = admit("read")
+admit_answer = admit("answer")
+admit_write = admit("write")
@@ -1,6 +1,6 @@
 from fastapi import APIRouter
 
-from .routes import auth, decks, study, users
+from .routes import auth, decks, metrics, study, users
 
 
 api_router = APIRouter()
@@ -8,4 +8,5 @@ api_router.include_router(auth.router)
 api_router.include_router(users.router)
 api_router.include_router(decks.router)
 api_router.include_router(study.router)
+api_router.include_router(metrics.router)
 
@@ -1,7 +1,7 @@
 from fastapi import Depends, HTTPException, status
 from sqlmodel import Session, select
 
-from ..db.session import get_db
+from ..db.session import get_db, get_read_db, primary_reads
 from ..models import User, UserRole
 from ..services.auth import hash_password
 
@@ -47,6 +47,12 @@ def get_current_active_user(db: Session = Depends(get_db)) -> User:
     return get_or_create_default_user(db)
 
 
+def get_current_user_read(db: Session = Depends(get_read_db)) -> User:
+    """Simplified: Always return the default user, looked up on the primary since it may be created here."""
+    with primary_reads(db):
+        return get_or_create_default_user(db)
+
+
 def get_current_admin(current_user: User = Depends(get_current_active_user)) -> User:
     if current_user.role != UserRole.ADMIN:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Insufficient permissions")
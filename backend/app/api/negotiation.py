@@ -0,0 +1,128 @@
+"""
+MessagePack content negotiation for large deck and study payloads.
+
+Endpoints that opt in return ``negotiate(request, payload)``. A client that sends
+``Accept: application/msgpack`` gets a MessagePack body; any other client gets the
+usual JSON. The MessagePack encoding differs from the JSON one in two ways:
+
+- Timestamps are epoch seconds: an int when whole, a float otherwise.
+- Lists of objects with the same keys are columnar: ``{"$columns": [keys...], key:
+  [values...], ...}`` holds one array per key instead of one object per element.
+  Column values are encoded the same way, so a column of nested objects (e.g. the
+  ``card`` of each bootstrap entry) is itself columnar.
+"""
+from datetime import date, datetime, timezone
+from enum import Enum
+from functools import lru_cache
+from typing import Any
+
+import msgpack
+from fastapi import Request, Response
+from pydantic import BaseModel, TypeAdapter
+
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+_MSGPACK_TYPES = (MSGPACK_MEDIA_TYPE, "application/x-msgpack")
+COLUMNS_KEY = "$columns"
+
+
+def _accept_quality(accept: str, media_types: tuple[str, ...]) -> float:
+    best = 0.0
+    for part in accept.split(","):
+        media_type, _, params = part.strip().partition(";")
+        if media_type.strip().lower() not in media_types:
+            continue
+        quality = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        best = max(best, quality)
+    return best
+
+
+def wants_msgpack(request: Request) -> bool:
+    """True when the client accepts MessagePack at least as much as JSON."""
+    accept = request.headers.get("accept", "")
+    if "msgpack" not in accept:
+        return False
+    msgpack_quality = _accept_quality(accept, _MSGPACK_TYPES)
+    return msgpack_quality > 0 and msgpack_quality >= _accept_quality(accept, ("application/json",))
+
+
+def _epoch(moment: datetime) -> int | float:
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    seconds = moment.timestamp()
+    return int(seconds) if moment.microsecond == 0 else seconds
+
+
+_SCALARS = (str, int, float, bool, type(None))
+
+
+def _column(values: list[Any]) -> Any:
+    kinds = {type(value) for value in values}
+    if kinds <= set(_SCALARS):
+        return values
+    if kinds <= {datetime, type(None)}:
+        return [None if value is None else _epoch(value) for value in values]
+    return to_wire(values)
+
+
+def to_wire(value: Any) -> Any:
+    """Convert a ``model_dump()`` tree into the MessagePack wire shape."""
+    if isinstance(value, dict):
+        return {key: to_wire(item) for key, item in value.items()}
+    if isinstance(value, list):
+        if value and all(isinstance(item, dict) for item in value):
+            keys = value[0].keys()
+            if all(item.keys() == keys for item in value):
+                columns: dict[str, Any] = {COLUMNS_KEY: list(keys)}
+                for key in keys:
+                    columns[key] = _column([item[key] for item in value])
+                return columns
+        return [to_wire(item) for item in value]
+    if isinstance(value, datetime):
+        return _epoch(value)
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    return value
+
+
+@lru_cache
+def _list_adapter(item_type: type[BaseModel]) -> TypeAdapter:
+    return TypeAdapter(list[item_type])
+
+
+def encode_msgpack(payload: BaseModel | list[BaseModel]) -> bytes:
+    if isinstance(payload, list):
+        tree = _list_adapter(type(payload[0])).dump_python(payload) if payload else []
+    else:
+        tree = payload.model_dump()
+    return msgpack.packb(to_wire(tree), use_bin_type=True)
+
+
+def vary_on_accept(response: Response) -> None:
+    """Route dependency: JSON responses of negotiated routes also depend on ``Accept``."""
+    response.headers["Vary"] = "Accept"
+
+
+def negotiate(request: Request, payload: Any, status_code: int = 200, headers: dict[str, str] | None = None) -> Any:
+    """
+    Return ``payload`` as MessagePack if the client asked for it, else unchanged for JSON.
+
+    ``headers`` are only added to the MessagePack response; for JSON, set them on the
+    route's injected ``Response`` as usual.
+    """
+    if wants_msgpack(request):
+        return Response(
+            content=encode_msgpack(payload),
+            status_code=status_code,
+            media_type=MSGPACK_MEDIA_TYPE,
+            headers={"Vary": "Accept", **(headers or {})},
+        )
+    return payload
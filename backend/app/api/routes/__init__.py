@@ -1,4 +1,4 @@
-from . import auth, decks, study, users
+from . import auth, decks, metrics, study, users
 
-__all__ = ["auth", "decks", "study", "users"]
+__all__ = ["auth", "decks", "metrics", "study", "users"]
 
@@ -1,69 +1,89 @@
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, BackgroundTasks, Depends, Header, HTTPException, Query, Request, Response, status
 from sqlmodel import Session
 
-from ...api.deps import get_current_active_user, get_current_user_optional
-from ...db.session import get_db
+from ...api.admission import admit_read, admit_write
+from ...api.deps import get_current_active_user, get_current_user_optional, get_current_user_read
+from ...api.negotiation import negotiate, vary_on_accept
+from ...db.session import get_db, get_read_db
 from ...models import Card, Deck, User
 from ...models.enums import UserRole
-from ...schemas.card import CardCreate, CardRead, CardUpdate
+from ...schemas.card import CardCreate, CardImport, CardImportResult, CardRead, CardUpdate, DuplicatePolicy
 from ...schemas.common import Message
-from ...schemas.deck import DeckCreate, DeckRead, DeckSummary, DeckUpdate, TagRead
+from ...schemas.deck import DeckChanges, DeckCreate, DeckFork, DeckRead, DeckSummary, DeckUpdate, TagRead
 from ...services import decks as deck_service
+from ...services import forks as fork_service
+from ...services import purge as purge_service
 
 
 router = APIRouter(prefix="/decks", tags=["decks"])
 
 
-@router.get("", response_model=list[DeckSummary])
+@router.get("", response_model=list[DeckSummary], dependencies=[Depends(admit_read), Depends(vary_on_accept)])
 def list_decks(
     *,
-    db: Session = Depends(get_db),
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_read_db),
     q: str | None = Query(default=None, description="Search decks by title"),
     tag: str | None = Query(default=None, description="Filter by tag"),
-    limit: int = Query(default=20, le=100),
-    offset: int = Query(default=0, ge=0),
-    current_user: User | None = Depends(get_current_user_optional),
+    limit: int = Query(default=20, ge=1, le=100),
+    cursor: str | None = Query(default=None, description="X-Next-Cursor of the previous page"),
+    offset: int = Query(default=0, ge=0, description="Ignored when a cursor is given"),
+    with_total: bool = Header(default=False, alias="X-Total-Count", description="Also count the matching decks"),
+    current_user: User | None = Depends(get_current_user_read),
 ) -> list[DeckSummary]:
-    summaries, _ = deck_service.list_decks(db, current_user, search=q, tag=tag, limit=limit, offset=offset)
-    return summaries
+    """
+    List decks, newest first.
 
+    The next page's cursor is returned in ``X-Next-Cursor`` (absent on the last page).
+    Send ``X-Total-Count: true`` to get the number of matching decks in the same header.
+    """
+    summaries, next_cursor, total = deck_service.list_decks(
+        db, current_user, search=q, tag=tag, limit=limit, offset=offset, cursor=cursor, with_total=with_total
+    )
+    headers = {}
+    if next_cursor:
+        headers["X-Next-Cursor"] = next_cursor
+    if total is not None:
+        headers["X-Total-Count"] = str(total)
+    response.headers.update(headers)
+    return negotiate(request, summaries, headers=headers)
 
-@router.get("/{deck_id}", response_model=DeckRead)
+
+@router.get("/{deck_id}", response_model=DeckRead, dependencies=[Depends(admit_read), Depends(vary_on_accept)])
 def read_deck(
     deck_id: int,
+    request: Request,
+    db: Session = Depends(get_read_db),
+    current_user: User | None = Depends(get_current_user_read),
+) -> DeckRead:
+    deck = deck_service.get_deck_snapshot(db, deck_id)
+    if not deck.is_public and (not current_user or deck.owner_user_id != current_user.id):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Deck is private")
+    return negotiate(request, deck)
+
+
+@router.get(
+    "/{deck_id}/changes",
+    response_model=DeckChanges,
+    dependencies=[Depends(admit_read), Depends(vary_on_accept)],
+)
+def read_deck_changes(
+    deck_id: int,
+    request: Request,
+    since: str | None = Query(default=None, description="Cursor returned by the previous call"),
     db: Session = Depends(get_db),
     current_user: User | None = Depends(get_current_user_optional),
-) -> DeckRead:
+) -> DeckChanges:
+    """Cards added, edited or deleted since the cursor; omit it for the whole deck."""
+    # Served by the primary: a lagging replica could hand out a cursor past unseen changes
     deck = deck_service.get_deck_by_id(db, deck_id)
     if not deck.is_public and (not current_user or deck.owner_user_id != current_user.id):
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Deck is private")
-    return DeckRead(
-        id=deck.id,
-        title=deck.title,
-        description=deck.description,
-        is_public=deck.is_public,
-        owner_user_id=deck.owner_user_id,
-        created_at=deck.created_at,
-        updated_at=deck.updated_at,
-        tags=[TagRead(id=tag.id, name=tag.name) for tag in deck.tags],
-        cards=[
-            CardRead(
-                id=card.id,
-                deck_id=card.deck_id,
-                type=card.type,
-                prompt=card.prompt,
-                answer=card.answer,
-                explanation=card.explanation,
-                created_at=card.created_at,
-                updated_at=card.updated_at,
-            )
-            for card in deck.cards
-        ],
-        tag_names=[tag.name for tag in deck.tags],
-    )
+    return negotiate(request, deck_service.get_deck_changes(db, deck_id, since))
 
 
-@router.post("", response_model=DeckRead, status_code=status.HTTP_201_CREATED)
+@router.post("", response_model=DeckRead, status_code=status.HTTP_201_CREATED, dependencies=[Depends(admit_write)])
 def create_deck(
     payload: DeckCreate,
     db: Session = Depends(get_db),
@@ -76,6 +96,7 @@ def create_deck(
         description=deck.description,
         is_public=deck.is_public,
         owner_user_id=deck.owner_user_id,
+        srs_scheduler=deck.srs_scheduler,
         created_at=deck.created_at,
         updated_at=deck.updated_at,
         tags=[TagRead(id=tag.id, name=tag.name) for tag in deck.tags],
@@ -96,7 +117,7 @@ def create_deck(
     )
 
 
-@router.put("/{deck_id}", response_model=DeckRead)
+@router.put("/{deck_id}", response_model=DeckRead, dependencies=[Depends(admit_write)])
 def update_deck(
     deck_id: int,
     payload: DeckUpdate,
@@ -107,12 +128,15 @@ def update_deck(
     if current_user.role != UserRole.ADMIN and deck.owner_user_id != current_user.id:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not allowed")
     deck = deck_service.update_deck(db, deck, payload)
+    if deck.forked_from_id is not None:
+        return deck_service.get_deck_snapshot(db, deck.id)
     return DeckRead(
         id=deck.id,
         title=deck.title,
         description=deck.description,
         is_public=deck.is_public,
         owner_user_id=deck.owner_user_id,
+        srs_scheduler=deck.srs_scheduler,
         created_at=deck.created_at,
         updated_at=deck.updated_at,
         tags=[TagRead(id=tag.id, name=tag.name) for tag in deck.tags],
@@ -133,30 +157,78 @@ def update_deck(
     )
 
 
-@router.delete("/{deck_id}", response_model=Message)
+@router.delete("/{deck_id}", response_model=Message, dependencies=[Depends(admit_write)])
 def delete_deck(
     deck_id: int,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user),
 ) -> Message:
     deck = deck_service.get_deck_by_id(db, deck_id)
     if current_user.role != UserRole.ADMIN and deck.owner_user_id != current_user.id:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not allowed")
-    deck_service.delete_deck(db, deck)
+    if deck_service.delete_deck(db, deck):
+        background_tasks.add_task(purge_service.purge_deck_in_background, deck.id)
     return Message(message="Deck deleted")
 
 
-@router.post("/{deck_id}/cards", response_model=CardRead, status_code=status.HTTP_201_CREATED)
+@router.post(
+    "/{deck_id}/fork",
+    response_model=DeckSummary,
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(admit_write)],
+)
+def fork_deck(
+    deck_id: int,
+    payload: DeckFork,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+) -> DeckSummary:
+    """
+    Make the caller's own copy of a deck.
+
+    In the default ``shared`` mode the fork reads the source's cards, so it is created
+    at once whatever the deck size; a card is copied when the fork's owner edits it.
+    ``copy`` mode copies every card up front, in the database.
+    """
+    source = deck_service.get_deck_by_id(db, deck_id)
+    if not source.is_public and current_user.role != UserRole.ADMIN and source.owner_user_id != current_user.id:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Deck is private")
+    deck = fork_service.fork_deck(db, source, current_user, payload)
+    return DeckSummary(
+        id=deck.id,
+        title=deck.title,
+        description=deck.description,
+        is_public=deck.is_public,
+        card_count=fork_service.count_deck_cards(db, deck.id),
+        due_count=0,
+        tags=[TagRead(id=tag.id, name=tag.name) for tag in deck.tags],
+    )
+
+
+@router.post(
+    "/{deck_id}/cards",
+    response_model=CardRead,
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(admit_write)],
+)
 def add_card(
     deck_id: int,
     payload: CardCreate,
+    response: Response,
+    on_duplicate: DuplicatePolicy = Query(
+        default=DuplicatePolicy.ALLOW, description="What to do when the deck has a card with this prompt and answer"
+    ),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user),
 ) -> CardRead:
+    """Add a card; with ``skip`` or ``update``, a duplicate is returned (updated) with 200 instead."""
     deck = deck_service.get_deck_by_id(db, deck_id)
     if current_user.role != UserRole.ADMIN and deck.owner_user_id != current_user.id:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not allowed")
-    card = deck_service.attach_card_to_deck(db, deck, payload)
+    card, created = deck_service.attach_card_to_deck(db, deck, payload, on_duplicate)
+    if not created:
+        response.status_code = status.HTTP_200_OK
     return CardRead(
         id=card.id,
         deck_id=card.deck_id,
@@ -169,7 +241,21 @@ def add_card(
     )
 
 
-@router.put("/cards/{card_id}", response_model=CardRead)
+@router.post("/{deck_id}/cards/import", response_model=CardImportResult, dependencies=[Depends(admit_write)])
+def import_cards(
+    deck_id: int,
+    payload: CardImport,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+) -> CardImportResult:
+    """Add many cards at once; cards the deck already has are skipped, updated or added per ``on_duplicate``."""
+    deck = deck_service.get_deck_by_id(db, deck_id)
+    if current_user.role != UserRole.ADMIN and deck.owner_user_id != current_user.id:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not allowed")
+    return deck_service.import_cards(db, deck, payload)
+
+
+@router.put("/cards/{card_id}", response_model=CardRead, dependencies=[Depends(admit_write)])
 def edit_card(
     card_id: int,
     payload: CardUpdate,
@@ -195,7 +281,28 @@ def edit_card(
     )
 
 
-@router.delete("/{deck_id}/cards/{card_id}", response_model=Message)
+@router.put("/{deck_id}/cards/{card_id}", response_model=CardRead, dependencies=[Depends(admit_write)])
+def edit_deck_card(
+    deck_id: int,
+    card_id: int,
+    payload: CardUpdate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+) -> CardRead:
+    """Edit a card of a deck; on a fork, a card shared with the source is copied into the fork first."""
+    card = db.get(Card, card_id)
+    if not card:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Card not found")
+    if not fork_service.deck_has_card(db, deck_id, card):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Card does not belong to this deck")
+    deck = deck_service.get_deck_by_id(db, deck_id)
+    if current_user.role != UserRole.ADMIN and deck.owner_user_id != current_user.id:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not allowed")
+    card = deck_service.update_card(db, card, payload, deck=deck)
+    return CardRead.model_validate(card)
+
+
+@router.delete("/{deck_id}/cards/{card_id}", response_model=Message, dependencies=[Depends(admit_write)])
 def remove_card(
     deck_id: int,
     card_id: int,
@@ -205,10 +312,10 @@ def remove_card(
     card = db.get(Card, card_id)
     if not card:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Card not found")
-    if card.deck_id != deck_id:
+    if not fork_service.deck_has_card(db, deck_id, card):
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Card does not belong to this deck")
-    deck = deck_service.get_deck_by_id(db, card.deck_id)
+    deck = deck_service.get_deck_by_id(db, deck_id)
     if current_user.role != UserRole.ADMIN and deck.owner_user_id != current_user.id:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not allowed")
-    deck_service.delete_card(db, card)
+    deck_service.delete_card(db, card, deck=deck)
     return Message(message="Card deleted")
@@ -0,0 +1,13 @@
+from fastapi import APIRouter, Depends
+
+from ...api.deps import get_current_admin
+from ...core.metrics import metrics
+
+
+router = APIRouter(prefix="/metrics", tags=["metrics"])
+
+
+@router.get("", dependencies=[Depends(get_current_admin)])
+def read_metrics() -> dict:
+    """Snapshot of this worker's in-process metrics (admins only)."""
+    return metrics.snapshot()
@@ -1,27 +1,51 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import JSONResponse
 from sqlmodel import Session
 
-from ...api.deps import get_current_active_user
-from ...db.session import get_db
-from ...models import Card, QuizSession, User
+from ...api.admission import admit_answer, admit_read, admit_write
+from ...api.deps import get_current_active_user, get_current_user_read
+from ...api.negotiation import negotiate, vary_on_accept, wants_msgpack
+from ...db.session import get_db, get_read_db
+from ...models import Card, Deck, QuizSession, User
 from ...schemas.card import CardRead
 from ...schemas.common import Message
 from ...schemas.study import (
     ActivityData,
     DueReviewCard,
+    ForecastDay,
+    ReviewQueuePage,
+    ReviewSyncRequest,
+    ReviewSyncResponse,
     SessionStatistics,
     StudyAnswerCreate,
     StudyAnswerRead,
+    StudySessionBootstrap,
     StudySessionCreate,
     StudySessionRead,
 )
+from ...services import activity as activity_service
+from ...services import decks as deck_service
+from ...services import forks as fork_service
+from ...services import review_queue as review_queue_service
 from ...services import study as study_service
 
 
 router = APIRouter(prefix="/study", tags=["study"])
 
 
-@router.post("/sessions", response_model=StudySessionRead, status_code=status.HTTP_201_CREATED)
+def _get_visible_deck(db: Session, deck_id: int, user: User) -> Deck:
+    deck = deck_service.get_deck_by_id(db, deck_id)
+    if not deck.is_public and deck.owner_user_id != user.id:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Deck is private")
+    return deck
+
+
+@router.post(
+    "/sessions",
+    response_model=StudySessionRead,
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(admit_write)],
+)
 def create_study_session(
     payload: StudySessionCreate,
     current_user: User = Depends(get_current_active_user),
@@ -31,7 +55,26 @@ def create_study_session(
     return StudySessionRead.model_validate(session)
 
 
-@router.get("/sessions/{session_id}", response_model=StudySessionRead)
+@router.post(
+    "/sessions/bootstrap",
+    response_model=StudySessionBootstrap,
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(admit_write), Depends(vary_on_accept)],
+)
+def bootstrap_study_session(
+    payload: StudySessionCreate,
+    request: Request,
+    limit: int = Query(default=20, ge=1, le=200),
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db),
+) -> StudySessionBootstrap:
+    """Create a session and return its first cards with their SRS state in one response."""
+    _get_visible_deck(db, payload.deck_id, current_user)
+    bootstrap = study_service.bootstrap_session(db, current_user, payload, limit)
+    return negotiate(request, bootstrap, status_code=status.HTTP_201_CREATED)
+
+
+@router.get("/sessions/{session_id}", response_model=StudySessionRead, dependencies=[Depends(admit_read)])
 def read_study_session(
     session_id: int,
     current_user: User = Depends(get_current_active_user),
@@ -41,27 +84,28 @@ def read_study_session(
     return StudySessionRead.model_validate(session)
 
 
-@router.get("/sessions/{session_id}/cards")
+@router.get("/sessions/{session_id}/cards", dependencies=[Depends(admit_read), Depends(vary_on_accept)])
 def get_session_cards(
     session_id: int,
+    request: Request,
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db),
 ):
     """Get all cards for a study session"""
-    from fastapi.responses import JSONResponse
-    from sqlalchemy import select as sa_select
-
     session = study_service.get_session_or_404(db, session_id, current_user)
 
-    # Get cards directly from the database
-    cards = list(db.exec(sa_select(Card).where(Card.deck_id == session.deck_id)).scalars().all())
+    cards = study_service.get_session_cards(db, session)
+    if wants_msgpack(request):
+        return negotiate(
+            request, [CardRead.model_validate(card).model_copy(update={"deck_id": session.deck_id}) for card in cards]
+        )
 
-    # Manually serialize the cards
+    # Manually serialize the cards; a fork's shared cards are listed under the fork
     cards_data = []
     for card in cards:
         cards_data.append({
             "id": card.id,
-            "deck_id": card.deck_id,
+            "deck_id": session.deck_id,
             "type": card.type.value if hasattr(card.type, 'value') else card.type,
             "prompt": card.prompt,
             "answer": card.answer,
@@ -73,7 +117,7 @@ def get_session_cards(
     return JSONResponse(content=cards_data)
 
 
-@router.post("/sessions/{session_id}/answer", response_model=StudyAnswerRead)
+@router.post("/sessions/{session_id}/answer", response_model=StudyAnswerRead, dependencies=[Depends(admit_answer)])
 async def submit_answer(
     session_id: int,
     payload: StudyAnswerCreate,
@@ -82,7 +126,7 @@ async def submit_answer(
 ) -> StudyAnswerRead:
     session = study_service.get_session_or_404(db, session_id, current_user)
     card = db.get(Card, payload.card_id)
-    if not card or card.deck_id != session.deck_id:
+    if not card or not fork_service.deck_has_card(db, session.deck_id, card):
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Card not part of session deck")
     response, llm_feedback = await study_service.record_answer(db, session, card, current_user, payload)
 
@@ -93,7 +137,7 @@ async def submit_answer(
     return StudyAnswerRead(**response_dict)
 
 
-@router.post("/sessions/{session_id}/finish", response_model=StudySessionRead)
+@router.post("/sessions/{session_id}/finish", response_model=StudySessionRead, dependencies=[Depends(admit_write)])
 def finish_session(
     session_id: int,
     current_user: User = Depends(get_current_active_user),
@@ -104,7 +148,7 @@ def finish_session(
     return StudySessionRead.model_validate(session)
 
 
-@router.get("/sessions/{session_id}/statistics", response_model=SessionStatistics)
+@router.get("/sessions/{session_id}/statistics", response_model=SessionStatistics, dependencies=[Depends(admit_read)])
 def get_session_statistics(
     session_id: int,
     current_user: User = Depends(get_current_active_user),
@@ -115,19 +159,59 @@ def get_session_statistics(
     return SessionStatistics(**stats)
 
 
-@router.get("/reviews/due", response_model=list[DueReviewCard])
-def get_due_reviews(
+@router.post("/sync", response_model=ReviewSyncResponse, dependencies=[Depends(admit_answer)])
+def sync_reviews(
+    payload: ReviewSyncRequest,
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db),
-) -> list[DueReviewCard]:
-    return study_service.due_reviews(db, current_user)
+) -> ReviewSyncResponse:
+    """Upload answers recorded offline; they are scheduled in the order they happened."""
+    return study_service.sync_offline_reviews(db, current_user, payload.reviews)
 
 
-@router.get("/activity", response_model=list[ActivityData])
-def get_activity(
-    days: int = 7,
+@router.get(
+    "/reviews/due",
+    response_model=list[DueReviewCard],
+    dependencies=[Depends(admit_read), Depends(vary_on_accept)],
+)
+def get_due_reviews(
+    request: Request,
+    current_user: User = Depends(get_current_user_read),
+    db: Session = Depends(get_read_db),
+) -> list[DueReviewCard]:
+    return negotiate(request, study_service.due_reviews(db, current_user))
+
+
+@router.get("/forecast", response_model=list[ForecastDay], dependencies=[Depends(admit_read)])
+def get_review_forecast(
+    days: int = Query(default=7, ge=1, le=study_service.MAX_FORECAST_DAYS),
+    deck_id: int | None = Query(default=None),
+    current_user: User = Depends(get_current_user_read),
+    db: Session = Depends(get_read_db),
+) -> list[ForecastDay]:
+    """Get the number of reviews due on each of the next N days (default 7), optionally for one deck."""
+    return study_service.get_review_forecast(db, current_user, days, deck_id)
+
+
+@router.get("/queue", response_model=ReviewQueuePage, dependencies=[Depends(admit_read), Depends(vary_on_accept)])
+def read_review_queue(
+    deck_id: int,
+    request: Request,
+    cursor: int | None = Query(default=None, ge=0),
+    limit: int = Query(default=20, ge=1, le=200),
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db),
+) -> ReviewQueuePage:
+    """Get the next cards of today's review queue for a deck, resuming from the stored cursor."""
+    _get_visible_deck(db, deck_id, current_user)
+    return negotiate(request, review_queue_service.read_queue(db, current_user.id, deck_id, cursor, limit))
+
+
+@router.get("/activity", response_model=list[ActivityData], dependencies=[Depends(admit_read)])
+def get_activity(
+    days: int = Query(default=7, ge=1, le=activity_service.MAX_ACTIVITY_DAYS),
+    current_user: User = Depends(get_current_user_read),
+    db: Session = Depends(get_read_db),
 ) -> list[ActivityData]:
     """Get quiz activity data for the past N days (default 7)."""
     activity_data = study_service.get_activity_data(db, current_user, days)
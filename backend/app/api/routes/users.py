@@ -5,13 +5,16 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from pydantic import BaseModel
 from sqlmodel import Session, select
 
-from ...api.deps import get_current_active_user
+from ...api.deps import get_current_active_user, get_current_user_read
 from ...db.session import get_db
-from ...models import Deck, User, UserDeckProgress
+from ...models import User, UserDeckProgress
 from ...schemas.common import Message
 from ...schemas.user import UserRead, UserUpdate, UserSettingsUpdate
 from ...services.auth import hash_password, verify_password
+from ...services import decks as deck_service
+from ...services import purge as purge_service
 from ...services import streak as streak_service
+from ...services.invalidation import invalidate_after_commit, user_key
 
 
 router = APIRouter(prefix="/me", tags=["users"])
@@ -37,6 +40,7 @@ def change_password(
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid current password")
     current_user.hashed_password = hash_password(payload.new_password)
     db.add(current_user)
+    invalidate_after_commit(db, user_key(current_user.id))
     db.commit()
     return Message(message="Password updated")
 
@@ -46,8 +50,7 @@ def delete_account(
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db),
 ) -> Message:
-    db.delete(current_user)
-    db.commit()
+    purge_service.delete_account(db, current_user)
     return Message(message="Account deleted")
 
 
@@ -62,9 +65,7 @@ def toggle_pin_deck(
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db),
 ) -> Message:
-    deck = db.get(Deck, deck_id)
-    if not deck:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Deck not found")
+    deck_service.get_deck_by_id(db, deck_id)
     progress = db.exec(
         select(UserDeckProgress).where(UserDeckProgress.user_id == current_user.id, UserDeckProgress.deck_id == deck_id)
     ).first()
@@ -73,6 +74,7 @@ def toggle_pin_deck(
         db.add(progress)
     progress.pinned = payload.pinned
     db.add(progress)
+    invalidate_after_commit(db, user_key(current_user.id))
     db.commit()
     db.refresh(progress)
     return Message(message="Deck pin updated")
@@ -87,7 +89,7 @@ class StreakResponse(BaseModel):
 
 @router.get("/streak", response_model=StreakResponse)
 def get_user_streak(
-    current_user: User = Depends(get_current_active_user),
+    current_user: User = Depends(get_current_user_read),
 ) -> StreakResponse:
     """Get the current user's streak statistics."""
     stats = streak_service.get_streak_stats(current_user)
@@ -100,7 +102,7 @@ def update_llm_settings(
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db),
 ) -> User:
-    """Update user's LLM settings (API keys and provider preference)."""
+    """Update user's LLM settings (API keys and provider preference) and SRS scheduler."""
     # Update API key if provided
     if payload.openai_api_key is not None:
         # Empty string means remove the key
@@ -119,7 +121,11 @@ def update_llm_settings(
     if payload.llm_provider_preference is not None:
         current_user.llm_provider_preference = payload.llm_provider_preference
 
+    if payload.srs_scheduler is not None:
+        current_user.srs_scheduler = payload.srs_scheduler
+
     db.add(current_user)
+    invalidate_after_commit(db, user_key(current_user.id))
     db.commit()
     db.refresh(current_user)
     return current_user
@@ -1,5 +1,5 @@
 from functools import lru_cache
-from typing import List, Optional, Union
+from typing import Dict, List, Optional, Tuple, Union
 
 from pydantic import AnyHttpUrl, field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -15,6 +15,14 @@ class Settings(BaseSettings):
     API_V1_STR: str = "/api/v1"
 
     DATABASE_URL: str = "postgresql+psycopg2://flashdecks:flashdecks@db:5432/flashdecks"
+    # Startup schema check against the Alembic head: "error" refuses to start, "warn" logs, "off" skips
+    DB_SCHEMA_CHECK: str = "error"
+    # Create missing tables with SQLModel.metadata.create_all at startup (throwaway local databases only)
+    DB_CREATE_ALL: bool = False
+    # Read replicas for read-only routes (comma-separated URLs); empty sends everything to DATABASE_URL
+    DATABASE_REPLICA_URLS: Union[List[str], str] = []
+    # Seconds a user's reads stay on the primary after they write (read-your-writes, via a signed cookie)
+    REPLICA_STICKY_SECONDS: float = 5.0
 
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     REFRESH_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 7
@@ -30,14 +38,75 @@ class Settings(BaseSettings):
         "http://127.0.0.1:5173",
     ]
 
+    # Defer deck progress, streak and activity rollup writes to a batched in-process worker
+    WRITE_BEHIND_ENABLED: bool = True
+    WRITE_BEHIND_FLUSH_MS: int = 250
+
+    # Group commit for answers: batch concurrent QuizResponse writes into one transaction
+    ANSWER_GROUP_COMMIT_ENABLED: bool = False
+    ANSWER_GROUP_COMMIT_MAX_BATCH: int = 64
+    ANSWER_GROUP_COMMIT_MAX_DELAY_MS: float = 5.0
+
+    # Typed-answer grading: most typos forgiven in long answers, and compiled answer sets kept per card
+    ANSWER_MAX_EDITS: int = 2
+    ANSWER_MATCHER_CACHE_SIZE: int = 10_000
+
+    # Semantic grading of typed answers: "none", "local" (deterministic stand-in) or "openai"
+    # (any OpenAI-compatible endpoint). Slow or failed gradings fall back to exact matching.
+    GRADING_BACKEND: str = "none"
+    GRADING_OPENAI_BASE_URL: str = "https://api.openai.com/v1"
+    GRADING_OPENAI_API_KEY: Optional[str] = None
+    GRADING_OPENAI_MODEL: str = "gpt-4o-mini"
+    GRADING_TIMEOUT_SECONDS: float = 3.0
+    GRADING_MAX_BATCH: int = 16
+    GRADING_MAX_DELAY_MS: float = 20.0
+    GRADING_MAX_CONCURRENCY: int = 4
+    GRADING_CACHE_SIZE: int = 50_000
+
+    # Admission control: per-client token buckets per route class as (tokens per second, burst),
+    # and a global cap on concurrently running requests with a bounded wait line
+    ADMISSION_ENABLED: bool = True
+    RATE_LIMITS: Dict[str, Tuple[float, float]] = {"read": (20.0, 100.0), "answer": (10.0, 50.0), "write": (5.0, 30.0)}
+    ADMISSION_MAX_CONCURRENCY: int = 32
+    ADMISSION_MAX_QUEUE: int = 100
+    ADMISSION_QUEUE_TIMEOUT_SECONDS: float = 2.0
+
+    # How cache invalidations reach the other workers: "memory" (this process only), "unix" or "postgres"
+    CACHE_INVALIDATION_BACKEND: str = "memory"
+    CACHE_INVALIDATION_SOCKET_DIR: str = "/tmp/flashdecks-invalidation"
+
+    # Read-through cache: in-process LRU plus an optional shared Redis-protocol tier
+    CACHE_ENABLED: bool = True
+    CACHE_MAX_ENTRIES: int = 10_000
+    CACHE_REDIS_URL: Optional[str] = None
+    # TTL in seconds per cache namespace (JSON object in the environment)
+    CACHE_TTLS: Dict[str, float] = {"deck": 300.0, "due_reviews": 30.0, "activity": 60.0, "forecast": 300.0}
+
+    # Deck delta sync: change cursors trail the clock by this much so rows from transactions
+    # still committing are not skipped; tombstones older than the retention force a full resync
+    DECK_CHANGES_LAG_SECONDS: float = 5.0
+    CARD_TOMBSTONE_RETENTION_DAYS: int = 90
+
+    # Deck and account deletion: rows are deleted in chunks of this many, one transaction each;
+    # decks with more cards than the inline maximum are purged by a background task
+    PURGE_CHUNK_SIZE: int = 5_000
+    DECK_PURGE_INLINE_MAX_CARDS: int = 2_000
+
+    # Daily review queue limits per user and deck
+    QUEUE_NEW_CARDS_PER_DAY: int = 20
+    QUEUE_REVIEWS_PER_DAY: int = 200
+
+    # Target recall probability at which FSRS schedules the next review
+    FSRS_DESIRED_RETENTION: float = 0.9
+
     LOG_LEVEL: str = "INFO"
     SENTRY_DSN: Optional[str] = None
 
-    @field_validator("CORS_ORIGINS", mode="before")
+    @field_validator("CORS_ORIGINS", "DATABASE_REPLICA_URLS", mode="before")
     @classmethod
     def assemble_cors_origins(cls, value: Union[str, List[str]]) -> List[str]:
         if isinstance(value, str):
-            return [origin.strip() for origin in value.split(",")]
+            return [origin.strip() for origin in value.split(",") if origin.strip()]
         return value
 
 
@@ -0,0 +1,135 @@
+"""Minimal in-process metrics registry exposed by the ``/metrics`` route.
+
+Metrics are per worker process. Counters and meters are cheap to update from any
+thread; meters also report a per-second rate over a sliding window.
+"""
+import threading
+import time
+from collections import deque
+from typing import Any
+
+
+class Counter:
+    """Monotonic counter."""
+
+    def __init__(self, name: str, description: str = "") -> None:
+        self.name = name
+        self.description = description
+        self._value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self._value += amount
+
+    @property
+    def value(self) -> float:
+        return self._value
+
+    def snapshot(self) -> dict[str, Any]:
+        return {"type": "counter", "value": self._value}
+
+
+class Gauge(Counter):
+    """Value that can go up and down."""
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.inc(-amount)
+
+    def set(self, value: float) -> None:
+        with self._lock:
+            self._value = value
+
+    def snapshot(self) -> dict[str, Any]:
+        return {"type": "gauge", "value": self._value}
+
+
+class Meter(Counter):
+    """Counter that also reports its rate per second over the last ``window`` seconds."""
+
+    def __init__(self, name: str, description: str = "", window: float = 60.0) -> None:
+        super().__init__(name, description)
+        self.window = window
+        self._events: deque[tuple[float, float]] = deque()
+
+    def inc(self, amount: float = 1.0) -> None:
+        now = time.monotonic()
+        with self._lock:
+            self._value += amount
+            self._events.append((now, amount))
+            self._prune(now)
+
+    def _prune(self, now: float) -> None:
+        cutoff = now - self.window
+        while self._events and self._events[0][0] < cutoff:
+            self._events.popleft()
+
+    @property
+    def rate(self) -> float:
+        with self._lock:
+            self._prune(time.monotonic())
+            return sum(amount for _, amount in self._events) / self.window
+
+    def snapshot(self) -> dict[str, Any]:
+        return {"type": "meter", "value": self._value, "per_second": self.rate}
+
+
+class Summary:
+    """Count, sum and max of observed values (latencies, lags, batch sizes)."""
+
+    def __init__(self, name: str, description: str = "") -> None:
+        self.name = name
+        self.description = description
+        self._count = 0
+        self._sum = 0.0
+        self._max = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        with self._lock:
+            self._count += 1
+            self._sum += value
+            self._max = max(self._max, value)
+
+    def snapshot(self) -> dict[str, Any]:
+        mean = self._sum / self._count if self._count else 0.0
+        return {"type": "summary", "count": self._count, "sum": self._sum, "mean": mean, "max": self._max}
+
+
+class MetricsRegistry:
+    """Get-or-create registry so modules can declare their metrics at import time."""
+
+    def __init__(self) -> None:
+        self._metrics: dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def _get(self, cls: type, name: str, description: str, **kwargs: Any) -> Any:
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, description, **kwargs)
+            elif not isinstance(metric, cls):
+                raise TypeError(f"Metric {name} already registered as {type(metric).__name__}")
+            return metric
+
+    def counter(self, name: str, description: str = "") -> Counter:
+        return self._get(Counter, name, description)
+
+    def gauge(self, name: str, description: str = "") -> Gauge:
+        return self._get(Gauge, name, description)
+
+    def meter(self, name: str, description: str = "", window: float = 60.0) -> Meter:
+        return self._get(Meter, name, description, window=window)
+
+    def summary(self, name: str, description: str = "") -> Summary:
+        return self._get(Summary, name, description)
+
+    def snapshot(self) -> dict[str, dict[str, Any]]:
+        with self._lock:
+            metrics = dict(self._metrics)
+        return {name: metric.snapshot() for name, metric in sorted(metrics.items())}
+
+
+metrics = MetricsRegistry()
+
+__all__ = ["Counter", "Gauge", "Meter", "MetricsRegistry", "Summary", "metrics"]
@@ -1,6 +1,6 @@
 """Database helpers for Flash-Decks."""
 
-from .session import engine, get_db
+from .session import engine, get_db, get_read_db
 
-__all__ = ["engine", "get_db"]
+__all__ = ["engine", "get_db", "get_read_db"]
 
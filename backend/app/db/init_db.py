@@ -1,13 +1,87 @@
+import re
+from functools import lru_cache
+from pathlib import Path
+
 from anyio import to_thread
 from loguru import logger
+from sqlalchemy import inspect, text
 from sqlmodel import SQLModel
 
-from ..core.config import settings  # noqa: F401
+from ..core.config import settings
 from .. import models  # noqa: F401  # ensure models are imported for metadata
 from .session import engine
 
+ALEMBIC_DIR = Path(__file__).resolve().parents[2] / "alembic"
+
+
+class SchemaRevisionMismatch(RuntimeError):
+    """Raised at startup when the database is not migrated to the code's Alembic head."""
+
+
+_REVISION_RE = re.compile(r'^(down_revision|revision)\b[^=]*=\s*["\']([^"\']*)["\']', re.MULTILINE)
+
+
+@lru_cache
+def expected_revision() -> str | None:
+    """
+    Return the Alembic head revision shipped with this code.
+
+    The revision identifiers are read straight from the version files rather than via
+    Alembic's ``ScriptDirectory``, which would import Alembic and every migration module
+    on each worker start.
+    """
+    revisions: set[str] = set()
+    parents: set[str] = set()
+    for path in (ALEMBIC_DIR / "versions").glob("*.py"):
+        for name, value in _REVISION_RE.findall(path.read_text(encoding="utf-8")):
+            (revisions if name == "revision" else parents).add(value)
+    heads = revisions - parents
+    if len(heads) > 1:
+        raise SchemaRevisionMismatch(f"Multiple Alembic heads found: {', '.join(sorted(heads))}")
+    return next(iter(heads), None)
+
+
+def current_revision() -> str | None:
+    """
+    Read the database's Alembic revision (None if unversioned).
+
+    Only a missing ``alembic_version`` table counts as unversioned; connection and other
+    database errors propagate so that an unreachable database is not reported as unmigrated.
+    """
+    with engine.connect() as connection:
+        if not inspect(connection).has_table("alembic_version"):
+            return None
+        return connection.execute(text("SELECT version_num FROM alembic_version")).scalar()
+
+
+def check_schema_revision() -> None:
+    """Compare the database revision against the Alembic head according to ``DB_SCHEMA_CHECK``."""
+    mode = settings.DB_SCHEMA_CHECK.lower()
+    if mode == "off":
+        return
+
+    expected = expected_revision()
+    found = current_revision()
+    if found == expected:
+        logger.info("Database schema at revision {}", found)
+        return
+
+    message = f"Database schema revision is {found or 'missing'}, expected {expected}; run `alembic upgrade head`"
+    if mode == "warn":
+        logger.warning(message)
+        return
+    raise SchemaRevisionMismatch(message)
+
 
 async def init_db() -> None:
-    """Create database tables and ensure baseline data exists."""
-    logger.info("Initializing database (ensure tables exist)")
-    await to_thread.run_sync(SQLModel.metadata.create_all, engine)
+    """
+    Verify the database is ready to serve requests.
+
+    Tables are owned by Alembic migrations; startup only checks the applied revision.
+    ``DB_CREATE_ALL`` restores the old ``create_all`` behaviour for throwaway local databases.
+    """
+    if settings.DB_CREATE_ALL:
+        logger.info("Initializing database (ensure tables exist)")
+        await to_thread.run_sync(SQLModel.metadata.create_all, engine)
+        return
+    await to_thread.run_sync(check_schema_revision)
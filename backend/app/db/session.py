@@ -1,23 +1,153 @@
-from collections.abc import Generator
+"""
+Engines and sessions.
 
+Every session is a :class:`RoutingSession` bound to the primary. Read-only routes take
+their session from :func:`get_read_db`, which points the session's reads at a replica
+(from ``DATABASE_REPLICA_URLS``) unless the user wrote within the last
+``REPLICA_STICKY_SECONDS``, so a user always reads their own writes. Flushes, DML
+statements and anything after the session's first write always go to the primary.
+Cache fills run under :func:`primary_reads`, so a lagging replica is never cached.
+
+The time of a user's last write travels with the client, in a signed ``last_write``
+cookie holding the user id (the subject of a valid bearer token, empty when there is
+none) and the wall-clock time of the commit. Any worker on any node can therefore
+honour it without shared state.
+"""
+import hashlib
+import hmac
+import math
+import random
+import time
+from collections.abc import Generator, Iterator
+from contextlib import contextmanager
+
+from fastapi import Depends, Request, Response
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.sql.dml import UpdateBase
 from sqlmodel import Session, create_engine
 
 from ..core.config import settings
 
 
-engine = create_engine(
-    settings.DATABASE_URL,
-    pool_pre_ping=True,
-    pool_recycle=300,
-    echo=False,
-)
+def _create_engine(url: str) -> Engine:
+    return create_engine(url, pool_pre_ping=True, pool_recycle=300, echo=False)
+
+
+engine = _create_engine(settings.DATABASE_URL)
+replica_engines = [_create_engine(url) for url in settings.DATABASE_REPLICA_URLS]
+
+
+class RoutingSession(Session):
+    """
+    Session that sends reads to a replica while ``use_replica`` is set.
+
+    The replica is chosen on the session's first read and kept for the rest of it, so
+    every read sees one replica's snapshot and uses one pooled connection.
+    """
+
+    def __init__(self, *args, replicas: list[Engine] | None = None, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.replicas = replicas or []
+        self.use_replica = False
+        self.replica: Engine | None = None
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if isinstance(clause, UpdateBase):
+            # Once this session writes, keep the rest of its work on the primary
+            self.info["wrote"] = True
+            self.use_replica = False
+        if self.use_replica and self.replicas:
+            if self.replica is None:
+                self.replica = random.choice(self.replicas)
+            return self.replica
+        return super().get_bind(mapper=mapper, clause=clause, **kwargs)
+
+
+@contextmanager
+def primary_reads(db: Session) -> Iterator[None]:
+    """Send ``db``'s reads to the primary for the duration of the block."""
+    use_replica = getattr(db, "use_replica", False)
+    if use_replica:
+        db.use_replica = False
+    try:
+        yield
+    finally:
+        if use_replica and not db.info.get("wrote"):
+            db.use_replica = True
+
+
+SessionLocal = sessionmaker(bind=engine, class_=RoutingSession, replicas=replica_engines, expire_on_commit=False)
+
 
-SessionLocal = sessionmaker(bind=engine, class_=Session, expire_on_commit=False)
+LAST_WRITE_COOKIE = "last_write"
 
 
-def get_db() -> Generator[Session, None, None]:
+@event.listens_for(RoutingSession, "before_flush")
+def _flush_to_primary(session, flush_context, instances) -> None:
+    # A flush and everything after it go to the primary
+    session.info["wrote"] = True
+    session.use_replica = False
+
+
+@event.listens_for(RoutingSession, "after_commit")
+def _note_write(session) -> None:
+    state = session.info.get("request_state")
+    if session.info.pop("wrote", False) and state is not None:
+        state.last_write_at = time.time()
+
+
+def _request_user(request: Request) -> str:
+    """The request's user id for read-your-writes: its bearer token's subject, else empty."""
+    if not hasattr(request.state, "user_id"):
+        from ..services.auth import token_subject
+
+        request.state.user_id = token_subject(request.headers.get("authorization")) or ""
+    return request.state.user_id
+
+
+def _signature(value: str) -> str:
+    return hmac.new(settings.JWT_SECRET_KEY.encode(), value.encode(), hashlib.sha256).hexdigest()
+
+
+def wrote_recently(request: Request) -> bool:
+    """Whether the ``last_write`` cookie shows the request's user wrote within ``REPLICA_STICKY_SECONDS``."""
+    user_id, _, rest = request.cookies.get(LAST_WRITE_COOKIE, "").partition(":")
+    written_at, _, signature = rest.partition(":")
+    if not hmac.compare_digest(signature, _signature(f"{user_id}:{written_at}")) or user_id != _request_user(request):
+        return False
+    try:
+        return time.time() - float(written_at) < settings.REPLICA_STICKY_SECONDS
+    except ValueError:
+        return False
+
+
+async def remember_last_write(request: Request, call_next) -> Response:
+    """HTTP middleware handing the time of the request's last commit to the client."""
+    response = await call_next(request)
+    written_at = getattr(request.state, "last_write_at", None)
+    if written_at is not None:
+        value = f"{_request_user(request)}:{written_at:.3f}"
+        response.set_cookie(
+            LAST_WRITE_COOKIE,
+            f"{value}:{_signature(value)}",
+            max_age=math.ceil(settings.REPLICA_STICKY_SECONDS),
+            httponly=True,
+            samesite="lax",
+        )
+    return response
+
+
+def get_db(request: Request) -> Generator[Session, None, None]:
     """FastAPI dependency that yields a database session."""
     with SessionLocal() as session:
+        session.info["request_state"] = request.state
         yield session
 
+
+def get_read_db(request: Request, db: Session = Depends(get_db)) -> Session:
+    """Dependency for read-only routes: the request's session, reading from a replica."""
+    if isinstance(db, RoutingSession) and not wrote_recently(request):
+        db.use_replica = True
+    return db
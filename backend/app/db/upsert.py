@@ -0,0 +1,11 @@
+from typing import Any
+
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlmodel import Session
+
+
+def dialect_insert(db: Session, table: Any):
+    """Return an ``INSERT`` construct supporting ``on_conflict_do_update`` for the session's dialect."""
+    if db.get_bind().dialect.name == "postgresql":
+        return postgresql.insert(table)
+    return sqlite.insert(table)
@@ -8,19 +8,49 @@ from .api.api_v1 import api_router
 from .core.config import settings
 from .core.logging import configure_logging
 from .db.init_db import init_db
+from .db.session import remember_last_write
+from .services.grading import answer_grader, create_backend
+from .services.invalidation import invalidation_bus
+from .services.study import answer_buffer
+from .services.write_behind import write_behind
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI) -> AsyncIterator[None]:
-    """FastAPI lifespan handler to initialize database resources."""
+    """FastAPI lifespan handler to configure logging and initialize database resources."""
+    # Logging is configured when the server starts, not when app.main is imported.
+    configure_logging()
     await init_db()
-    yield
+    invalidation_bus.start()
+    if settings.WRITE_BEHIND_ENABLED:
+        await write_behind.start()
+    if settings.ANSWER_GROUP_COMMIT_ENABLED:
+        answer_buffer.configure(
+            max_batch=settings.ANSWER_GROUP_COMMIT_MAX_BATCH,
+            max_delay=settings.ANSWER_GROUP_COMMIT_MAX_DELAY_MS / 1000,
+        )
+        await answer_buffer.start()
+    answer_grader.configure(
+        backend=create_backend(settings.GRADING_BACKEND),
+        max_batch=settings.GRADING_MAX_BATCH,
+        max_delay=settings.GRADING_MAX_DELAY_MS / 1000,
+        max_concurrency=settings.GRADING_MAX_CONCURRENCY,
+        timeout=settings.GRADING_TIMEOUT_SECONDS,
+        cache_size=settings.GRADING_CACHE_SIZE,
+    )
+    await answer_grader.start()
+    try:
+        yield
+    finally:
+        # Drain buffered answers, then flush deferred progress/streak updates before the worker exits
+        await answer_grader.stop()
+        await answer_buffer.stop()
+        await write_behind.stop()
+        invalidation_bus.stop()
 
 
 def create_application() -> FastAPI:
     """Instantiate the FastAPI application."""
-    configure_logging()
-
     application = FastAPI(
         title=settings.PROJECT_NAME,
         version=settings.VERSION,
@@ -36,8 +66,11 @@ def create_application() -> FastAPI:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=["X-Next-Cursor", "X-Total-Count", "Retry-After"],
     )
 
+    application.middleware("http")(remember_last_write)
+
     application.include_router(api_router, prefix=settings.API_V1_STR)
 
     return application
@@ -1,23 +1,36 @@
 """Database models for Flash-Decks."""
 
-from .card import Card
+from .card import Card, CardTombstone, HiddenCard
 from .deck import Deck, DeckTagLink
 from .enums import CardType, QuizMode, QuizStatus, UserRole
-from .study import QuizResponse, QuizSession, SRSReview, UserDeckProgress
+from .study import (
+    DailyReviewQueue,
+    QuizResponse,
+    QuizSession,
+    ReviewLog,
+    SRSReview,
+    UserDailyActivity,
+    UserDeckProgress,
+)
 from .tag import Tag
 from .user import User
 
 __all__ = [
     "Card",
+    "CardTombstone",
+    "DailyReviewQueue",
     "Deck",
     "DeckTagLink",
+    "HiddenCard",
     "QuizMode",
     "QuizResponse",
     "QuizSession",
     "QuizStatus",
+    "ReviewLog",
     "SRSReview",
     "Tag",
     "User",
+    "UserDailyActivity",
     "UserDeckProgress",
     "UserRole",
     "CardType",
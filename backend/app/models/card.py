@@ -1,8 +1,10 @@
+import hashlib
+import unicodedata
 from datetime import datetime
 from typing import Optional
 
 from pydantic import ConfigDict
-from sqlalchemy import Column, DateTime, Enum, Text, func
+from sqlalchemy import JSON, Column, DateTime, Enum, Index, Integer, String, Text, event, func
 from sqlmodel import Field, Relationship, SQLModel
 
 from .enums import CardType
@@ -16,16 +18,38 @@ card_type_enum = Enum(
 )
 
 
+def card_content_hash(prompt: str, answer: str) -> str:
+    """
+    Hash of a card's prompt and answer, ignoring case, Unicode form and runs of whitespace.
+
+    Looked up together with ``deck_id`` to find duplicate cards in a deck. The deck is
+    left out of the hash, so a card copied into another deck keeps its hash.
+    """
+    parts = (" ".join(unicodedata.normalize("NFKC", text).casefold().split()) for text in (prompt, answer))
+    return hashlib.blake2b("\x1f".join(parts).encode(), digest_size=16).hexdigest()
+
+
 class Card(SQLModel, table=True):
     __tablename__ = "cards"
+    __table_args__ = (
+        # Serves delta sync: the cards of a deck changed after a cursor
+        Index("ix_cards_deck_updated_at", "deck_id", "updated_at"),
+        # Duplicate detection on create and import
+        Index("ix_cards_deck_content_hash", "deck_id", "content_hash"),
+    )
     model_config = ConfigDict(arbitrary_types_allowed=True)
 
     id: Optional[int] = Field(default=None, primary_key=True)
-    deck_id: int = Field(foreign_key="decks.id", nullable=False, index=True)
+    deck_id: int = Field(foreign_key="decks.id", ondelete="CASCADE", nullable=False, index=True)
     type: CardType = Field(default=CardType.BASIC, sa_column=Column(card_type_enum, nullable=False))
     prompt: str = Field(sa_column=Column(Text, nullable=False))
     answer: str = Field(sa_column=Column(Text, nullable=False))
     explanation: Optional[str] = Field(default=None, sa_column=Column(Text, nullable=True))
+    options: Optional[list] = Field(default=None, sa_column=Column(JSON, nullable=True))
+    # See card_content_hash; kept up to date on every ORM write, NULL on rows not yet backfilled
+    content_hash: Optional[str] = Field(default=None, sa_column=Column(String(32), nullable=True))
+    # The card this one was copied from when a fork copied or edited it
+    source_card_id: Optional[int] = Field(default=None, sa_column=Column(Integer, nullable=True))
 
     created_at: datetime = Field(
         sa_column=Column(
@@ -44,8 +68,41 @@ class Card(SQLModel, table=True):
     )
 
     deck: "Deck" = Relationship(back_populates="cards")
-    quiz_responses: list["QuizResponse"] = Relationship(back_populates="card")
-    srs_reviews: list["SRSReview"] = Relationship(back_populates="card")
+    quiz_responses: list["QuizResponse"] = Relationship(
+        back_populates="card", sa_relationship_kwargs={"passive_deletes": True}
+    )
+    srs_reviews: list["SRSReview"] = Relationship(
+        back_populates="card", sa_relationship_kwargs={"passive_deletes": True}
+    )
+
+
+@event.listens_for(Card, "before_insert")
+@event.listens_for(Card, "before_update")
+def _stamp_content_hash(mapper, connection, card: Card) -> None:
+    card.content_hash = card_content_hash(card.prompt, card.answer)
+
+
+class CardTombstone(SQLModel, table=True):
+    """Record of a deleted card, so delta sync clients learn about the deletion."""
+
+    __tablename__ = "card_tombstones"
+    __table_args__ = (Index("ix_card_tombstones_deck_deleted_at", "deck_id", "deleted_at"),)
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    deck_id: int = Field(foreign_key="decks.id", ondelete="CASCADE", nullable=False)
+    card_id: int = Field(sa_column=Column(Integer, nullable=False))
+    deleted_at: datetime = Field(
+        sa_column=Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    )
+
+
+class HiddenCard(SQLModel, table=True):
+    """A card of the source deck that a copy-on-write fork has deleted from its own view."""
+
+    __tablename__ = "hidden_cards"
+
+    deck_id: int = Field(foreign_key="decks.id", ondelete="CASCADE", primary_key=True)
+    card_id: int = Field(sa_column=Column(Integer, primary_key=True))
 
 
 from .deck import Deck  # noqa: E402
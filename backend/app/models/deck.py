@@ -1,26 +1,36 @@
 from datetime import datetime
 from typing import Optional
 
-from sqlalchemy import JSON, Column, DateTime, String, Text, func
+from sqlalchemy import JSON, Column, DateTime, Index, String, Text, func
 from sqlmodel import Field, Relationship, SQLModel
 
 
 class DeckTagLink(SQLModel, table=True):
     __tablename__ = "deck_tags"
 
-    deck_id: Optional[int] = Field(default=None, foreign_key="decks.id", primary_key=True)
-    tag_id: Optional[int] = Field(default=None, foreign_key="tags.id", primary_key=True)
+    deck_id: Optional[int] = Field(default=None, foreign_key="decks.id", ondelete="CASCADE", primary_key=True)
+    tag_id: Optional[int] = Field(default=None, foreign_key="tags.id", ondelete="CASCADE", primary_key=True)
 
 
 class Deck(SQLModel, table=True):
     __tablename__ = "decks"
+    __table_args__ = (
+        # Keyset pagination of the deck list, newest first
+        Index("ix_decks_created_at_id", "created_at", "id"),
+        # Decks whose purge has not finished
+        Index("ix_decks_deleted_at", "deleted_at"),
+    )
 
     id: Optional[int] = Field(default=None, primary_key=True)
     title: str = Field(sa_column=Column(String(255), nullable=False, index=True))
     description: Optional[str] = Field(default=None, sa_column=Column(Text, nullable=True))
     is_public: bool = Field(default=True)
 
-    owner_user_id: Optional[int] = Field(default=None, foreign_key="users.id")
+    owner_user_id: Optional[int] = Field(default=None, foreign_key="users.id", ondelete="SET NULL")
+    # Set on a copy-on-write fork: the deck's cards include this deck's, minus those shadowed (see services.forks)
+    forked_from_id: Optional[int] = Field(default=None, foreign_key="decks.id", ondelete="SET NULL", index=True)
+    # Overrides the studying user's scheduler for this deck when set
+    srs_scheduler: Optional[str] = Field(default=None, sa_column=Column(String(16), nullable=True))
 
     created_at: datetime = Field(
         sa_column=Column(
@@ -37,6 +47,8 @@ class Deck(SQLModel, table=True):
             onupdate=func.now(),
         )
     )
+    # Set when the deck is deleted; it is hidden from then on and its rows purged (see services.purge)
+    deleted_at: Optional[datetime] = Field(default=None, sa_column=Column(DateTime(timezone=True), nullable=True))
 
     metadata_json: dict | None = Field(
         default=None,
@@ -44,10 +56,16 @@ class Deck(SQLModel, table=True):
     )
 
     owner: Optional["User"] = Relationship(back_populates="decks")
-    cards: list["Card"] = Relationship(back_populates="deck", sa_relationship_kwargs={"cascade": "all, delete-orphan"})
+    cards: list["Card"] = Relationship(
+        back_populates="deck", sa_relationship_kwargs={"cascade": "all, delete-orphan", "passive_deletes": True}
+    )
     tags: list["Tag"] = Relationship(back_populates="decks", link_model=DeckTagLink)
-    progresses: list["UserDeckProgress"] = Relationship(back_populates="deck", sa_relationship_kwargs={"cascade": "all, delete-orphan"})
-    quiz_sessions: list["QuizSession"] = Relationship(back_populates="deck", sa_relationship_kwargs={"cascade": "all, delete-orphan"})
+    progresses: list["UserDeckProgress"] = Relationship(
+        back_populates="deck", sa_relationship_kwargs={"cascade": "all, delete-orphan", "passive_deletes": True}
+    )
+    quiz_sessions: list["QuizSession"] = Relationship(
+        back_populates="deck", sa_relationship_kwargs={"cascade": "all, delete-orphan", "passive_deletes": True}
+    )
 
 
 from .card import Card  # noqa: E402
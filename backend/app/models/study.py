@@ -1,7 +1,25 @@
-from datetime import datetime
+from datetime import date, datetime
 from typing import Optional
 
-from sqlalchemy import Boolean, Column, DateTime, Enum, Float, Integer, JSON, UniqueConstraint, func
+from sqlalchemy import (
+    REAL,
+    BigInteger,
+    Boolean,
+    Column,
+    Date,
+    DateTime,
+    Enum,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    JSON,
+    SmallInteger,
+    String,
+    Text,
+    UniqueConstraint,
+    func,
+)
 from sqlmodel import Field, Relationship, SQLModel
 
 from .enums import QuizMode, QuizStatus
@@ -26,8 +44,8 @@ class UserDeckProgress(SQLModel, table=True):
     __table_args__ = (UniqueConstraint("user_id", "deck_id", name="uq_user_deck"),)
 
     id: Optional[int] = Field(default=None, primary_key=True)
-    user_id: int = Field(foreign_key="users.id", index=True, nullable=False)
-    deck_id: int = Field(foreign_key="decks.id", index=True, nullable=False)
+    user_id: int = Field(foreign_key="users.id", ondelete="CASCADE", index=True, nullable=False)
+    deck_id: int = Field(foreign_key="decks.id", ondelete="CASCADE", index=True, nullable=False)
     percent_complete: float = Field(default=0.0)
     last_studied_at: datetime | None = Field(default=None, nullable=True)
     streak: int = Field(default=0)
@@ -57,8 +75,8 @@ class QuizSession(SQLModel, table=True):
     __tablename__ = "quiz_sessions"
 
     id: Optional[int] = Field(default=None, primary_key=True)
-    user_id: int = Field(foreign_key="users.id", index=True, nullable=False)
-    deck_id: int = Field(foreign_key="decks.id", index=True, nullable=False)
+    user_id: int = Field(foreign_key="users.id", ondelete="CASCADE", index=True, nullable=False)
+    deck_id: int = Field(foreign_key="decks.id", ondelete="CASCADE", index=True, nullable=False)
     mode: QuizMode = Field(sa_column=Column(quiz_mode_enum, nullable=False))
     status: QuizStatus = Field(
         default=QuizStatus.ACTIVE,
@@ -71,20 +89,33 @@ class QuizSession(SQLModel, table=True):
     ended_at: datetime | None = Field(default=None, sa_column=Column(DateTime(timezone=True), nullable=True))
     config: dict | None = Field(default=None, sa_column=Column(JSON, nullable=True))
 
+    # Response counters maintained by record_answer so statistics are a primary-key read
+    total_responses: int = Field(default=0, sa_column=Column(Integer, nullable=False, server_default="0"))
+    correct_count: int = Field(default=0, sa_column=Column(Integer, nullable=False, server_default="0"))
+    incorrect_count: int = Field(default=0, sa_column=Column(Integer, nullable=False, server_default="0"))
+    unanswered_count: int = Field(default=0, sa_column=Column(Integer, nullable=False, server_default="0"))
+
     user: "User" = Relationship(back_populates="quiz_sessions")
     deck: "Deck" = Relationship(back_populates="quiz_sessions")
-    responses: list["QuizResponse"] = Relationship(back_populates="session")
+    responses: list["QuizResponse"] = Relationship(
+        back_populates="session", sa_relationship_kwargs={"passive_deletes": True}
+    )
 
 
 class QuizResponse(SQLModel, table=True):
     __tablename__ = "quiz_responses"
+    __table_args__ = (
+        Index("uq_quiz_responses_session_client_review", "session_id", "client_review_id", unique=True),
+    )
 
     id: Optional[int] = Field(default=None, primary_key=True)
-    session_id: int = Field(foreign_key="quiz_sessions.id", nullable=False, index=True)
-    card_id: int = Field(foreign_key="cards.id", nullable=False, index=True)
-    user_answer: str | None = Field(default=None)
+    session_id: int = Field(foreign_key="quiz_sessions.id", ondelete="CASCADE", nullable=False, index=True)
+    card_id: int = Field(foreign_key="cards.id", ondelete="CASCADE", nullable=False, index=True)
+    user_answer: str | None = Field(default=None, sa_column=Column(Text, nullable=True))
     is_correct: Optional[bool] = Field(default=None, sa_column=Column(Boolean, nullable=True))
     quality: int | None = Field(default=None)
+    # Idempotency id of an answer uploaded by an offline client; NULL for online answers
+    client_review_id: str | None = Field(default=None, sa_column=Column(String(64), nullable=True))
 
     responded_at: datetime = Field(
         sa_column=Column(DateTime(timezone=True), nullable=False, server_default=func.now())
@@ -96,11 +127,14 @@ class QuizResponse(SQLModel, table=True):
 
 class SRSReview(SQLModel, table=True):
     __tablename__ = "srs_reviews"
-    __table_args__ = (UniqueConstraint("user_id", "card_id", name="uq_review_user_card"),)
+    __table_args__ = (
+        UniqueConstraint("user_id", "card_id", name="uq_review_user_card"),
+        Index("ix_srs_reviews_user_due_at", "user_id", "due_at"),
+    )
 
     id: Optional[int] = Field(default=None, primary_key=True)
-    user_id: int = Field(foreign_key="users.id", index=True, nullable=False)
-    card_id: int = Field(foreign_key="cards.id", index=True, nullable=False)
+    user_id: int = Field(foreign_key="users.id", ondelete="CASCADE", index=True, nullable=False)
+    card_id: int = Field(foreign_key="cards.id", ondelete="CASCADE", index=True, nullable=False)
     repetitions: int = Field(default=0)
     interval_days: int = Field(default=1)
     easiness: float = Field(default=2.5)
@@ -108,6 +142,10 @@ class SRSReview(SQLModel, table=True):
         sa_column=Column(DateTime(timezone=True), nullable=False, server_default=func.now())
     )
     last_quality: int | None = Field(default=None)
+    last_reviewed_at: datetime | None = Field(default=None, sa_column=Column(DateTime(timezone=True), nullable=True))
+    # FSRS memory state; NULL until the card is first reviewed under FSRS
+    stability: float | None = Field(default=None, sa_column=Column(Float, nullable=True))
+    difficulty: float | None = Field(default=None, sa_column=Column(Float, nullable=True))
 
     updated_at: datetime = Field(
         sa_column=Column(DateTime(timezone=True), nullable=False, server_default=func.now(), onupdate=func.now())
@@ -117,6 +155,83 @@ class SRSReview(SQLModel, table=True):
     card: "Card" = Relationship(back_populates="srs_reviews")
 
 
+class UserDailyActivity(SQLModel, table=True):
+    """Per-user, per-day rollup of study activity used by the activity endpoints."""
+
+    __tablename__ = "user_daily_activity"
+
+    user_id: int = Field(foreign_key="users.id", ondelete="CASCADE", primary_key=True)
+    activity_date: date = Field(sa_column=Column(Date, primary_key=True))
+    sessions_completed: int = Field(default=0, sa_column=Column(Integer, nullable=False, server_default="0"))
+    cards_reviewed: int = Field(default=0, sa_column=Column(Integer, nullable=False, server_default="0"))
+    lapses: int = Field(default=0, sa_column=Column(Integer, nullable=False, server_default="0"))
+
+
+class DailyReviewQueue(SQLModel, table=True):
+    """
+    A user's materialized study queue for one deck and one UTC day.
+
+    ``card_ids`` holds the day's reviews (most overdue first) followed by new cards.
+    ``position`` is the cursor: entries before it have been consumed. The row is
+    replaced when the first read of a new day rebuilds the queue.
+    """
+
+    __tablename__ = "daily_review_queues"
+
+    user_id: int = Field(foreign_key="users.id", ondelete="CASCADE", primary_key=True)
+    deck_id: int = Field(foreign_key="decks.id", ondelete="CASCADE", primary_key=True)
+    queue_date: date = Field(sa_column=Column(Date, nullable=False))
+    card_ids: list[int] = Field(default_factory=list, sa_column=Column(JSON, nullable=False))
+    position: int = Field(default=0, sa_column=Column(Integer, nullable=False, server_default="0"))
+    review_count: int = Field(default=0, sa_column=Column(Integer, nullable=False, server_default="0"))
+    new_count: int = Field(default=0, sa_column=Column(Integer, nullable=False, server_default="0"))
+    built_at: datetime = Field(
+        sa_column=Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    )
+
+
+class ReviewLog(SQLModel, table=True):
+    """
+    Append-only history of scheduled reviews: one row per SRS update, holding the card's
+    state before and after it. Rows are inserted in the same transaction as the
+    ``srs_reviews`` update and never modified.
+
+    Columns are kept narrow (small integers and 4-byte floats) so a row stays around
+    70 bytes on Postgres. ``card_id`` deliberately has no foreign key: history outlives
+    deleted cards, and inserts skip a lookup into ``cards``.
+    """
+
+    __tablename__ = "review_logs"
+    __table_args__ = (
+        Index("ix_review_logs_user_reviewed_at", "user_id", "reviewed_at"),
+        # BRIN on Postgres: rows arrive in time order, so a few pages index the whole log
+        Index("ix_review_logs_reviewed_at", "reviewed_at", postgresql_using="brin"),
+    )
+
+    id: Optional[int] = Field(
+        default=None, sa_column=Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True)
+    )
+    user_id: int = Field(sa_column=Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False))
+    card_id: int = Field(sa_column=Column(Integer, nullable=False))
+    reviewed_at: datetime = Field(sa_column=Column(DateTime(timezone=True), nullable=False))
+    quality: int = Field(sa_column=Column(SmallInteger, nullable=False))
+    # See app.services.review_log.SCHEDULER_CODES
+    scheduler: int = Field(sa_column=Column(SmallInteger, nullable=False))
+    elapsed_days: float = Field(sa_column=Column(REAL, nullable=False))
+
+    repetitions_before: int = Field(sa_column=Column(SmallInteger, nullable=False))
+    interval_days_before: int = Field(sa_column=Column(Integer, nullable=False))
+    easiness_before: float = Field(sa_column=Column(REAL, nullable=False))
+    stability_before: float | None = Field(default=None, sa_column=Column(REAL, nullable=True))
+    difficulty_before: float | None = Field(default=None, sa_column=Column(REAL, nullable=True))
+
+    repetitions: int = Field(sa_column=Column(SmallInteger, nullable=False))
+    interval_days: int = Field(sa_column=Column(Integer, nullable=False))
+    easiness: float = Field(sa_column=Column(REAL, nullable=False))
+    stability: float | None = Field(default=None, sa_column=Column(REAL, nullable=True))
+    difficulty: float | None = Field(default=None, sa_column=Column(REAL, nullable=True))
+
+
 from .card import Card  # noqa: E402
 from .deck import Deck  # noqa: E402
 from .user import User  # noqa: E402
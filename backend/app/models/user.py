@@ -1,7 +1,7 @@
 from datetime import date, datetime
 from typing import Optional
 
-from sqlalchemy import Column, Date, DateTime, Enum, func
+from sqlalchemy import JSON, Column, Date, DateTime, Enum, String, func
 from sqlmodel import Field, Relationship, SQLModel
 
 from .enums import UserRole
@@ -14,7 +14,7 @@ class User(SQLModel, table=True):
     email: str = Field(index=True, sa_column_kwargs={"unique": True})
     hashed_password: str = Field(nullable=False)
     full_name: Optional[str] = Field(default=None, nullable=True)
-    role: UserRole = Field(default=UserRole.USER, sa_column=Column(Enum(UserRole, name="user_role")))
+    role: UserRole = Field(default=UserRole.USER, sa_column=Column(Enum(UserRole, name="user_role"), nullable=False))
     is_active: bool = Field(default=True)
 
     # Streak tracking fields
@@ -26,6 +26,10 @@ class User(SQLModel, table=True):
     openai_api_key: Optional[str] = Field(default=None, nullable=True)
     llm_provider_preference: Optional[str] = Field(default=None, nullable=True)  # "openai" or "ollama"
 
+    # Spaced-repetition scheduler ("sm2" or "fsrs") and the user's fitted FSRS weights
+    srs_scheduler: str = Field(default="sm2", sa_column=Column(String(16), nullable=False, server_default="sm2"))
+    fsrs_weights: Optional[list] = Field(default=None, sa_column=Column(JSON, nullable=True))
+
     created_at: datetime = Field(
         sa_column=Column(
             DateTime(timezone=True),
@@ -42,10 +46,16 @@ class User(SQLModel, table=True):
         )
     )
 
-    decks: list["Deck"] = Relationship(back_populates="owner")
-    quiz_sessions: list["QuizSession"] = Relationship(back_populates="user")
-    deck_progresses: list["UserDeckProgress"] = Relationship(back_populates="user")
-    srs_reviews: list["SRSReview"] = Relationship(back_populates="user")
+    decks: list["Deck"] = Relationship(back_populates="owner", sa_relationship_kwargs={"passive_deletes": True})
+    quiz_sessions: list["QuizSession"] = Relationship(
+        back_populates="user", sa_relationship_kwargs={"passive_deletes": True}
+    )
+    deck_progresses: list["UserDeckProgress"] = Relationship(
+        back_populates="user", sa_relationship_kwargs={"passive_deletes": True}
+    )
+    srs_reviews: list["SRSReview"] = Relationship(
+        back_populates="user", sa_relationship_kwargs={"passive_deletes": True}
+    )
 
 
 from .deck import Deck  # noqa: E402  # circular import resolution
@@ -1,5 +1,6 @@
 from datetime import datetime
-from typing import Optional
+from enum import Enum
+from typing import List, Optional
 
 from pydantic import BaseModel, ConfigDict
 
@@ -32,3 +33,23 @@ class CardRead(CardBase):
     created_at: datetime
     updated_at: datetime
 
+
+class DuplicatePolicy(str, Enum):
+    """What to do with a card whose prompt and answer the deck already has."""
+
+    SKIP = "skip"
+    # Overwrite the existing card's other fields
+    UPDATE = "update"
+    ALLOW = "allow"
+
+
+class CardImport(BaseModel):
+    cards: List[CardCreate]
+    on_duplicate: DuplicatePolicy = DuplicatePolicy.SKIP
+
+
+class CardImportResult(BaseModel):
+    created: int
+    updated: int
+    # Duplicates skipped, or already matching the import under ``update``
+    unchanged: int
@@ -20,6 +20,7 @@ class DeckBase(BaseModel):
     description: Optional[str] = None
     is_public: bool = True
     tag_names: List[str] = Field(default_factory=list)
+    srs_scheduler: Optional[str] = Field(default=None, pattern="^(sm2|fsrs)$")
 
 
 class DeckCreate(DeckBase):
@@ -31,6 +32,15 @@ class DeckUpdate(BaseModel):
     description: Optional[str] = None
     is_public: Optional[bool] = None
     tag_names: Optional[List[str]] = None
+    srs_scheduler: Optional[str] = Field(default=None, pattern="^(sm2|fsrs)$")
+
+
+class DeckFork(BaseModel):
+    # Defaults to the source deck's title
+    title: Optional[str] = None
+    is_public: bool = False
+    # "shared" reads the source's cards until they are edited; "copy" copies them all up front
+    mode: str = Field(default="shared", pattern="^(shared|copy)$")
 
 
 class DeckSummary(BaseModel):
@@ -47,7 +57,20 @@ class DeckSummary(BaseModel):
 class DeckRead(DeckBase):
     id: int
     owner_user_id: Optional[int]
+    # The deck this copy-on-write fork reads its shared cards from
+    forked_from_id: Optional[int] = None
     created_at: datetime
     updated_at: datetime
     tags: List[TagRead] = Field(default_factory=list)
     cards: List[CardRead] = Field(default_factory=list)
+
+
+class DeckChanges(BaseModel):
+    """Cards upserted and deleted since a change cursor."""
+
+    cards: List[CardRead] = Field(default_factory=list)
+    deleted_card_ids: List[int] = Field(default_factory=list)
+    # Pass as ``since`` on the next request
+    cursor: str
+    # True when ``cards`` is the whole deck and the client should drop what it has cached
+    reset: bool = False
@@ -1,9 +1,10 @@
-from datetime import datetime
-from typing import Optional
+from datetime import date, datetime
+from typing import Literal, Optional
 
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field
 
 from ..models.enums import QuizMode, QuizStatus
+from .card import CardRead
 
 
 class StudySessionConfig(BaseModel):
@@ -64,6 +65,78 @@ class DueReviewCard(BaseModel):
     easiness: float
 
 
+class ForecastDay(BaseModel):
+    date: str
+    due: int
+
+
+class ReviewQueuePage(BaseModel):
+    deck_id: int
+    queue_date: date
+    total: int
+    review_count: int
+    new_count: int
+    cursor: int
+    next_cursor: Optional[int]
+    card_ids: list[int]
+
+
+class CardReviewState(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    due_at: datetime
+    repetitions: int
+    interval_days: int
+    easiness: float
+    stability: Optional[float] = None
+    difficulty: Optional[float] = None
+    last_reviewed_at: Optional[datetime] = None
+
+
+class SessionCard(BaseModel):
+    card: CardRead
+    review: Optional[CardReviewState] = None
+
+
+class StudySessionBootstrap(BaseModel):
+    session: StudySessionRead
+    cards: list[SessionCard]
+    queue: ReviewQueuePage
+
+
+class OfflineReview(BaseModel):
+    client_review_id: str = Field(min_length=1, max_length=64)
+    session_id: int
+    card_id: int
+    quality: int = Field(ge=0, le=5)
+    reviewed_at: datetime
+    user_answer: Optional[str] = None
+    # The card's last_reviewed_at as the client last saw it, used to detect reviews from other devices
+    base_reviewed_at: Optional[datetime] = None
+
+
+class ReviewSyncRequest(BaseModel):
+    reviews: list[OfflineReview] = Field(max_length=1000)
+
+
+class ReviewSyncResult(BaseModel):
+    client_review_id: str
+    card_id: int
+    # applied: scheduled in order; merged: applied on top of a review from another device;
+    # conflict: older than the server's latest review, recorded but not scheduled;
+    # duplicate: already synced earlier
+    status: Literal["applied", "merged", "conflict", "duplicate"]
+
+
+class SyncedReviewState(CardReviewState):
+    card_id: int
+
+
+class ReviewSyncResponse(BaseModel):
+    results: list[ReviewSyncResult]
+    states: list[SyncedReviewState]
+
+
 class SessionStatistics(BaseModel):
     total_responses: int
     correct_count: int
@@ -74,3 +147,5 @@ class SessionStatistics(BaseModel):
 class ActivityData(BaseModel):
     date: str
     count: int
+    cards_reviewed: int = 0
+    lapses: int = 0
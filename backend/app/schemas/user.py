@@ -24,6 +24,7 @@ class UserSettingsUpdate(BaseModel):
     """Schema for updating user LLM settings"""
     openai_api_key: Optional[str] = None
     llm_provider_preference: Optional[str] = Field(default=None, pattern="^(openai|ollama)$")
+    srs_scheduler: Optional[str] = Field(default=None, pattern="^(sm2|fsrs)$")
 
 
 class UserRead(UserBase):
@@ -35,6 +36,7 @@ class UserRead(UserBase):
     last_activity_date: Optional[date]
     llm_provider_preference: Optional[str] = None
     has_openai_key: bool = False  # Indicates if user has set an API key (without exposing it)
+    srs_scheduler: str = "sm2"
     created_at: datetime
     updated_at: datetime
 
@@ -49,7 +51,7 @@ class UserRead(UserBase):
             data_dict = {}
             for field in ['id', 'email', 'full_name', 'role', 'is_active', 'current_streak',
                          'longest_streak', 'last_activity_date', 'llm_provider_preference',
-                         'created_at', 'updated_at']:
+                         'srs_scheduler', 'created_at', 'updated_at']:
                 if hasattr(data, field):
                     data_dict[field] = getattr(data, field)
             data_dict['has_openai_key'] = bool(getattr(data, 'openai_api_key', None))
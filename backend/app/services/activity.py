@@ -0,0 +1,145 @@
+"""
+Service for the per-user daily activity rollup.
+
+Each row of ``user_daily_activity`` holds the sessions completed, cards reviewed and
+lapses (answers rated below 3) for one user on one UTC day. Rows are incremented as
+sessions finish and answers are recorded, so activity reads cost O(days) no matter
+how much history a user has accumulated.
+"""
+from collections.abc import Iterable
+from datetime import date, datetime, timedelta, timezone
+
+from sqlalchemy import case, delete, func, insert, select
+from sqlmodel import Session
+
+from ..db.upsert import dialect_insert
+from ..models import QuizResponse, QuizSession, UserDailyActivity
+from ..models.enums import QuizStatus
+
+# Upper bound for a single activity read (a full year heatmap, leap years included).
+MAX_ACTIVITY_DAYS = 366
+
+
+def as_date(value: date | datetime | str) -> date:
+    """Coerce ``func.date`` results (strings on SQLite, dates on Postgres) to ``date``."""
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(str(value))
+
+
+def record_activity(
+    db: Session,
+    user_id: int,
+    activity_date: date,
+    *,
+    sessions_completed: int = 0,
+    cards_reviewed: int = 0,
+    lapses: int = 0,
+) -> None:
+    """
+    Atomically add to a user's rollup row for ``activity_date``.
+
+    The row is created on first use; the caller owns the transaction.
+    """
+    table = UserDailyActivity.__table__
+    stmt = dialect_insert(db, table).values(
+        user_id=user_id,
+        activity_date=activity_date,
+        sessions_completed=sessions_completed,
+        cards_reviewed=cards_reviewed,
+        lapses=lapses,
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.user_id, table.c.activity_date],
+        set_={
+            "sessions_completed": table.c.sessions_completed + stmt.excluded.sessions_completed,
+            "cards_reviewed": table.c.cards_reviewed + stmt.excluded.cards_reviewed,
+            "lapses": table.c.lapses + stmt.excluded.lapses,
+        },
+    )
+    db.exec(stmt)
+
+
+def get_daily_activity(db: Session, user_id: int, start: date, end: date) -> dict[date, UserDailyActivity]:
+    """Return the rollup rows for ``start``..``end`` (inclusive) keyed by day."""
+    rows = db.exec(
+        select(UserDailyActivity).where(
+            UserDailyActivity.user_id == user_id,
+            UserDailyActivity.activity_date >= start,
+            UserDailyActivity.activity_date <= end,
+        )
+    ).scalars()
+    return {row.activity_date: row for row in rows}
+
+
+def backfill_daily_activity(db: Session, user_ids: Iterable[int] | None = None) -> int:
+    """
+    Rebuild rollup rows from ``quiz_sessions`` and ``quiz_responses``.
+
+    Existing rows for the users in scope (every user when ``user_ids`` is None) are
+    replaced. Returns the number of rollup rows written.
+    """
+    scoped_ids = list(user_ids) if user_ids is not None else None
+
+    session_day = func.date(QuizSession.started_at)
+    sessions_stmt = (
+        select(QuizSession.user_id, session_day, func.count(QuizSession.id))
+        .where(QuizSession.status == QuizStatus.COMPLETED)
+        .group_by(QuizSession.user_id, session_day)
+    )
+
+    response_day = func.date(QuizResponse.responded_at)
+    responses_stmt = (
+        select(
+            QuizSession.user_id,
+            response_day,
+            func.count(QuizResponse.id),
+            func.sum(case((QuizResponse.quality < 3, 1), else_=0)),
+        )
+        .join(QuizSession, QuizSession.id == QuizResponse.session_id)
+        .group_by(QuizSession.user_id, response_day)
+    )
+
+    if scoped_ids is not None:
+        sessions_stmt = sessions_stmt.where(QuizSession.user_id.in_(scoped_ids))
+        responses_stmt = responses_stmt.where(QuizSession.user_id.in_(scoped_ids))
+
+    totals: dict[tuple[int, date], dict[str, int]] = {}
+
+    def _row(user_id: int, day: date | str) -> dict[str, int]:
+        key = (user_id, as_date(day))
+        if key not in totals:
+            totals[key] = {"sessions_completed": 0, "cards_reviewed": 0, "lapses": 0}
+        return totals[key]
+
+    for user_id, day, count in db.exec(sessions_stmt).all():
+        _row(user_id, day)["sessions_completed"] = int(count)
+
+    for user_id, day, reviewed, lapses in db.exec(responses_stmt).all():
+        row = _row(user_id, day)
+        row["cards_reviewed"] = int(reviewed)
+        row["lapses"] = int(lapses or 0)
+
+    clear_stmt = delete(UserDailyActivity)
+    if scoped_ids is not None:
+        clear_stmt = clear_stmt.where(UserDailyActivity.user_id.in_(scoped_ids))
+    db.exec(clear_stmt)
+
+    if totals:
+        db.exec(
+            insert(UserDailyActivity),
+            params=[
+                {"user_id": user_id, "activity_date": day, **counts}
+                for (user_id, day), counts in totals.items()
+            ],
+        )
+    db.commit()
+    return len(totals)
+
+
+def activity_window(days: int) -> tuple[date, date]:
+    """Return the inclusive ``(start, end)`` UTC day range covering the past ``days`` days."""
+    end = datetime.now(tz=timezone.utc).date()
+    return end - timedelta(days=days - 1), end
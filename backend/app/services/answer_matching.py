@@ -0,0 +1,191 @@
+"""
+Typed-answer grading against precompiled answer sets.
+
+A card's acceptable answers are its ``answer`` plus the aliases listed in ``options``
+(or, for cloze cards, the answers of each blank). They are normalized once and cached
+per card id, with ``updated_at`` as the version, so an edited card is recompiled on its
+next grading and an unchanged one is never re-normalized or re-parsed.
+
+Normalization applies NFKC, case folding, accent stripping and punctuation folding, then
+collapses whitespace. A typed answer matches an acceptable one when both normalize to the
+same text or, for longer answers, when they are within a small edit distance. Answers with
+digits are only matched exactly, because "1848" and "1849" are different answers. The
+distance is computed with Myers' bit-parallel algorithm. The pattern bitmasks are built
+at compile time, and the scan stops as soon as the budget can no longer be met.
+"""
+import json
+import threading
+import unicodedata
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Iterable, Optional
+
+from ..core.config import settings
+from ..models import Card
+
+# Punctuation, symbols and separators become spaces; marks are dropped after decomposition
+_FOLDED_CATEGORIES = ("P", "S", "Z", "C")
+_ASCII_FOLD = str.maketrans({chr(code): " " for code in range(128) if not chr(code).isalnum()})
+
+
+def normalize(text: Any) -> str:
+    """Fold ``text`` to the form answers are compared in."""
+    if text is None:
+        return ""
+    text = str(text)
+    if text.isascii():
+        return " ".join(text.translate(_ASCII_FOLD).lower().split())
+    decomposed = unicodedata.normalize("NFD", unicodedata.normalize("NFKC", text).casefold())
+    folded = []
+    for char in decomposed:
+        category = unicodedata.category(char)
+        if category[0] == "M":
+            continue
+        folded.append(" " if category[0] in _FOLDED_CATEGORIES else char)
+    return " ".join(unicodedata.normalize("NFC", "".join(folded)).split())
+
+
+def edit_budget(answer: str) -> int:
+    """Typos tolerated for a normalized acceptable answer: none below four characters."""
+    if any(char.isdigit() for char in answer):
+        return 0
+    return min(settings.ANSWER_MAX_EDITS, len(answer) // 4)
+
+
+@dataclass(frozen=True)
+class _Pattern:
+    text: str
+    budget: int
+    # Bit i of peq[c] is set when text[i] == c
+    peq: dict[str, int]
+
+
+def _compile_pattern(text: str) -> _Pattern:
+    peq: dict[str, int] = {}
+    for position, char in enumerate(text):
+        peq[char] = peq.get(char, 0) | (1 << position)
+    return _Pattern(text=text, budget=edit_budget(text), peq=peq)
+
+
+def bounded_distance(pattern: _Pattern, text: str, limit: int) -> int:
+    """Levenshtein distance between ``pattern.text`` and ``text``, or ``limit + 1`` if above ``limit``."""
+    m, n = len(pattern.text), len(text)
+    if abs(m - n) > limit:
+        return limit + 1
+    if m == 0:
+        return n
+    full = (1 << m) - 1
+    last = 1 << (m - 1)
+    vp, vn, score = full, 0, m
+    peq = pattern.peq
+    for column, char in enumerate(text):
+        eq = peq.get(char, 0)
+        xv = eq | vn
+        xh = (((eq & vp) + vp) ^ vp) | eq
+        hp = vn | (~(xh | vp) & full)
+        hn = vp & xh
+        if hp & last:
+            score += 1
+        elif hn & last:
+            score -= 1
+        # Each remaining character can lower the distance by at most one
+        if score - (n - column - 1) > limit:
+            return limit + 1
+        hp = ((hp << 1) | 1) & full
+        hn = (hn << 1) & full
+        vp = hn | (~(xv | hp) & full)
+        vn = hp & xv
+    return score if score <= limit else limit + 1
+
+
+class AnswerMatcher:
+    """The normalized acceptable answers of one prompt or blank."""
+
+    __slots__ = ("exact", "fuzzy")
+
+    def __init__(self, answers: Iterable[Any]) -> None:
+        normalized = {normalize(answer) for answer in answers}
+        normalized.discard("")
+        self.exact = frozenset(normalized)
+        self.fuzzy = tuple(
+            pattern for pattern in map(_compile_pattern, sorted(normalized)) if pattern.budget > 0
+        )
+
+    def matches(self, user_answer: Any) -> bool:
+        text = normalize(user_answer)
+        if not text:
+            return False
+        if text in self.exact:
+            return True
+        return any(bounded_distance(pattern, text, pattern.budget) <= pattern.budget for pattern in self.fuzzy)
+
+
+@dataclass(frozen=True)
+class CompiledCard:
+    answers: AnswerMatcher
+    # One matcher per blank for cloze cards, None otherwise
+    blanks: Optional[tuple[AnswerMatcher, ...]]
+
+    def matches(self, user_answer: Any) -> bool:
+        return self.answers.matches(user_answer)
+
+    def matches_blanks(self, user_answers: Any) -> bool:
+        if self.blanks is None:
+            return False
+        if isinstance(user_answers, str):
+            try:
+                user_answers = json.loads(user_answers)
+            except json.JSONDecodeError:
+                return False
+        if not isinstance(user_answers, list) or len(user_answers) != len(self.blanks):
+            return False
+        return all(blank.matches(answer) for blank, answer in zip(self.blanks, user_answers))
+
+
+def _as_list(value: Any) -> list:
+    return value if isinstance(value, list) else [value]
+
+
+def compile_card(card: Card) -> CompiledCard:
+    aliases = card.options if isinstance(card.options, list) else []
+    blanks = None
+    cloze_data = getattr(card, "cloze_data", None)
+    if isinstance(cloze_data, dict):
+        blanks = tuple(
+            AnswerMatcher(_as_list(blank["answer"]) if isinstance(blank, dict) and "answer" in blank else [])
+            for blank in cloze_data.get("blanks", [])
+        )
+    return CompiledCard(answers=AnswerMatcher([card.answer, *aliases]), blanks=blanks)
+
+
+class CompiledCardCache:
+    """Thread-safe LRU of compiled cards, keyed by card id and versioned by ``updated_at``."""
+
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max_entries
+        self._entries: OrderedDict[int, tuple[Optional[datetime], CompiledCard]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, card: Card) -> CompiledCard:
+        if card.id is None:
+            return compile_card(card)
+        with self._lock:
+            entry = self._entries.get(card.id)
+            if entry is not None and entry[0] == card.updated_at:
+                self._entries.move_to_end(card.id)
+                return entry[1]
+        compiled = compile_card(card)
+        with self._lock:
+            self._entries[card.id] = (card.updated_at, compiled)
+            self._entries.move_to_end(card.id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return compiled
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+compiled_cards = CompiledCardCache(settings.ANSWER_MATCHER_CACHE_SIZE)
@@ -1,24 +1,35 @@
 from datetime import datetime, timedelta, timezone
-from typing import Optional, Tuple
+from functools import lru_cache
+from typing import TYPE_CHECKING, Optional, Tuple
 
 from fastapi import HTTPException, status
-from jose import JWTError, jwt
-from passlib.context import CryptContext
+from fastapi.security.utils import get_authorization_scheme_param
 from sqlmodel import Session, select
 
 from ..core.config import settings
 from ..models import User, UserRole
 from ..schemas.user import UserCreate
 
-pwd_context = CryptContext(schemes=["argon2"], deprecated="auto")
+if TYPE_CHECKING:
+    from passlib.context import CryptContext
+
+# passlib/argon2 and jose/cryptography are imported on first use rather than at import
+# time, so workers and CLI tools that never hash or sign anything do not pay for them.
+
+
+@lru_cache
+def get_pwd_context() -> "CryptContext":
+    from passlib.context import CryptContext
+
+    return CryptContext(schemes=["argon2"], deprecated="auto")
 
 
 def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
+    return get_pwd_context().hash(password)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    return get_pwd_context().verify(plain_password, hashed_password)
 
 
 def create_access_token(subject: str, expires_delta: Optional[timedelta] = None) -> str:
@@ -26,6 +37,8 @@ def create_access_token(subject: str, expires_delta: Optional[timedelta] = None)
         expires_delta = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     expire = datetime.now(tz=timezone.utc) + expires_delta
     to_encode = {"sub": subject, "exp": expire, "type": "access"}
+    from jose import jwt
+
     return jwt.encode(to_encode, settings.JWT_SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
 
 
@@ -34,10 +47,14 @@ def create_refresh_token(subject: str, expires_delta: Optional[timedelta] = None
         expires_delta = timedelta(minutes=settings.REFRESH_TOKEN_EXPIRE_MINUTES)
     expire = datetime.now(tz=timezone.utc) + expires_delta
     to_encode = {"sub": subject, "exp": expire, "type": "refresh"}
+    from jose import jwt
+
     return jwt.encode(to_encode, settings.JWT_REFRESH_SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
 
 
 def decode_token(token: str, token_type: str = "access") -> dict:
+    from jose import JWTError, jwt
+
     secret = settings.JWT_SECRET_KEY if token_type == "access" else settings.JWT_REFRESH_SECRET_KEY
     try:
         payload = jwt.decode(token, secret, algorithms=[settings.JWT_ALGORITHM])
@@ -48,6 +65,17 @@ def decode_token(token: str, token_type: str = "access") -> dict:
     return payload
 
 
+def token_subject(authorization: str | None) -> str | None:
+    """The subject of a valid bearer access token in an ``Authorization`` header, else None."""
+    scheme, token = get_authorization_scheme_param(authorization)
+    if scheme.lower() != "bearer" or not token:
+        return None
+    try:
+        return str(decode_token(token)["sub"])
+    except (HTTPException, KeyError):
+        return None
+
+
 def authenticate_user(db: Session, email: str, password: str) -> Optional[User]:
     user = db.exec(select(User).where(User.email == email)).first()
     if not user or not verify_password(password, user.hashed_password):
@@ -0,0 +1,373 @@
+"""
+Read-through cache for computed payloads (deck snapshots, due reviews, activity).
+
+There are two tiers:
+
+- An in-process LRU, always on, bounded by ``CACHE_MAX_ENTRIES``.
+- An optional shared tier on any Redis-protocol server (``CACHE_REDIS_URL``), so that
+  workers and nodes reuse each other's results. It is spoken to with a minimal RESP
+  client. If the server cannot be reached, the tier is skipped for a few seconds and
+  lookups fall through to the database.
+
+Values are JSON-compatible data, encoded as compact JSON and zlib-compressed when
+large. Each entry lives in a namespace with its own TTL (``CACHE_TTLS``). Each entry is
+also tagged with the invalidation keys it depends on (``deck:{id}``, ``user:{id}``).
+When those keys are published on the invalidation bus, the entry is dropped from this
+worker's LRU. The worker that made the change also drops it from the shared tier.
+Cached values are shared between requests and must not be mutated.
+
+Both tiers keep a generation per tag, bumped by each invalidation. A computed value is
+only stored if the generations of its tags are unchanged since before it was computed,
+so a read that overlaps a write cannot cache the state from before the write.
+"""
+import json
+import socket
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from collections.abc import Callable, Iterable
+from typing import Any
+from urllib.parse import urlparse
+
+from loguru import logger
+
+from ..core.config import settings
+from ..core.metrics import metrics
+from .invalidation import ALL_KEYS, invalidation_bus
+
+_COMPRESS_THRESHOLD = 1024
+# Tag generations kept in memory before they are reset (which also voids in-flight computes)
+_MAX_GENERATIONS = 100_000
+# Shared tag generations must outlive any compute that read them
+_GENERATION_TTL_MS = 24 * 3600 * 1000
+_RAW, _ZLIB = b"j", b"z"
+
+
+def encode(value: Any) -> bytes:
+    data = json.dumps(value, separators=(",", ":"), default=str).encode()
+    if len(data) >= _COMPRESS_THRESHOLD:
+        return _ZLIB + zlib.compress(data, 1)
+    return _RAW + data
+
+
+def decode(payload: bytes) -> Any:
+    if payload[:1] == _ZLIB:
+        return json.loads(zlib.decompress(payload[1:]))
+    return json.loads(payload[1:])
+
+
+class LRUCache:
+    """Thread-safe LRU with per-entry expiry and tag-based eviction."""
+
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[float, Any, tuple[str, ...]]] = OrderedDict()
+        self._tags: dict[str, set[str]] = {}
+        self._generations: dict[str, int] = {}
+        self._epoch = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> tuple[bool, Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False, None
+            expires_at, value, _ = entry
+            if expires_at <= time.monotonic():
+                self._remove(key)
+                return False, None
+            self._entries.move_to_end(key)
+            return True, value
+
+    def generation(self, tags: tuple[str, ...]) -> tuple[int, ...]:
+        with self._lock:
+            return self._generation(tags)
+
+    def set(
+        self, key: str, value: Any, ttl: float, tags: tuple[str, ...] = (), generation: tuple[int, ...] | None = None
+    ) -> bool:
+        """Store ``value``, unless ``generation`` is given and a tag was invalidated since it was taken."""
+        with self._lock:
+            if generation is not None and generation != self._generation(tags):
+                return False
+            self._remove(key)
+            self._entries[key] = (time.monotonic() + ttl, value, tags)
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+            return True
+
+    def invalidate_tags(self, tags: Iterable[str]) -> None:
+        with self._lock:
+            if len(self._generations) > _MAX_GENERATIONS:
+                self._generations.clear()
+                self._epoch += 1
+            for tag in tags:
+                self._generations[tag] = self._generations.get(tag, 0) + 1
+                for key in list(self._tags.get(tag, ())):
+                    self._remove(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._tags.clear()
+            self._epoch += 1
+
+    def _generation(self, tags: tuple[str, ...]) -> tuple[int, ...]:
+        return (self._epoch, *(self._generations.get(tag, 0) for tag in tags))
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for tag in entry[2]:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+
+class RedisError(Exception):
+    """Error reply from the server."""
+
+
+class RedisTier:
+    """Shared tier on a Redis-protocol server, using one connection per thread."""
+
+    def __init__(self, url: str, prefix: str = "flashdecks", timeout: float = 0.25, retry_after: float = 5.0) -> None:
+        parsed = urlparse(url)
+        self.host = parsed.hostname or "localhost"
+        self.port = parsed.port or 6379
+        self.password = parsed.password
+        self.database = int(parsed.path.lstrip("/") or 0)
+        self.prefix = prefix
+        self.timeout = timeout
+        self.retry_after = retry_after
+        self._local = threading.local()
+        self._down_until = 0.0
+
+    def entry_key(self, key: str) -> str:
+        return f"{self.prefix}:{key}"
+
+    def tag_key(self, tag: str) -> str:
+        return f"{self.prefix}:tag:{tag}"
+
+    def generation_key(self, tag: str) -> str:
+        return f"{self.prefix}:gen:{tag}"
+
+    def generation(self, tags: tuple[str, ...]) -> tuple | None:
+        """Current generations of ``tags``; ``None`` if the server is unavailable."""
+        if not tags:
+            return ()
+        replies = self._run([("MGET", *(self.generation_key(tag) for tag in tags))])
+        return tuple(replies[0]) if replies else None
+
+    def get(self, key: str) -> bytes | None:
+        replies = self._run([("GET", self.entry_key(key))])
+        return replies[0] if replies else None
+
+    def set(
+        self, key: str, payload: bytes, ttl: float, tags: tuple[str, ...] = (), generation: tuple | None = None
+    ) -> None:
+        """
+        Store ``payload`` under ``key``.
+
+        With a ``generation``, the tag generations are read back after the write and the
+        entry is deleted again if they moved. An invalidation bumps the generations before
+        deleting the tagged entries, so either it deletes this entry or this check sees it.
+        """
+        ttl_ms = max(1, int(ttl * 1000))
+        commands = [("SET", self.entry_key(key), payload, "PX", ttl_ms)]
+        for tag in tags:
+            # Tag sets outlive their entries slightly; stale members are harmless to DEL
+            commands.append(("SADD", self.tag_key(tag), self.entry_key(key)))
+            commands.append(("PEXPIRE", self.tag_key(tag), ttl_ms * 2))
+        if generation and tags:
+            commands.append(("MGET", *(self.generation_key(tag) for tag in tags)))
+        replies = self._run(commands)
+        if replies is not None and generation and tags and tuple(replies[-1]) != generation:
+            self._run([("DEL", self.entry_key(key))])
+
+    def invalidate_tags(self, tags: Iterable[str]) -> None:
+        tags = list(tags)
+        commands = []
+        for tag in tags:
+            commands.append(("INCR", self.generation_key(tag)))
+            commands.append(("PEXPIRE", self.generation_key(tag), _GENERATION_TTL_MS))
+        tag_keys = [self.tag_key(tag) for tag in tags]
+        replies = self._run(commands + [("SMEMBERS", tag_key) for tag_key in tag_keys])
+        if replies is None:
+            return
+        keys = {key for reply in replies[len(commands):] for key in (reply or [])}
+        self._run([("DEL", *keys, *tag_keys)])
+
+    def _run(self, commands: list[tuple]) -> list | None:
+        """Send ``commands`` as one pipeline; ``None`` if the server is unavailable."""
+        if time.monotonic() < self._down_until:
+            return None
+        try:
+            connection = self._connection()
+            connection.sendall(b"".join(_encode_command(command) for command in commands))
+            reader = self._local.reader
+            return [_read_reply(reader) for _ in commands]
+        except (OSError, RedisError, ValueError) as exc:
+            logger.warning("Shared cache unavailable, skipping it for {}s: {}", self.retry_after, exc)
+            self._down_until = time.monotonic() + self.retry_after
+            self._close()
+            return None
+
+    def _connection(self) -> socket.socket:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = socket.create_connection((self.host, self.port), timeout=self.timeout)
+            self._local.connection = connection
+            self._local.reader = connection.makefile("rb")
+            setup = []
+            if self.password:
+                setup.append(("AUTH", self.password))
+            if self.database:
+                setup.append(("SELECT", self.database))
+            if setup:
+                connection.sendall(b"".join(_encode_command(command) for command in setup))
+                for _ in setup:
+                    _read_reply(self._local.reader)
+        return connection
+
+    def _close(self) -> None:
+        connection = getattr(self._local, "connection", None)
+        if connection is not None:
+            connection.close()
+        self._local.connection = None
+        self._local.reader = None
+
+
+def _encode_command(args: tuple) -> bytes:
+    parts = [b"*%d\r\n" % len(args)]
+    for arg in args:
+        if not isinstance(arg, bytes):
+            arg = str(arg).encode()
+        parts.append(b"$%d\r\n%s\r\n" % (len(arg), arg))
+    return b"".join(parts)
+
+
+def _read_reply(reader) -> Any:
+    line = reader.readline()
+    if not line:
+        raise ConnectionError("Connection closed by server")
+    kind, body = line[:1], line[1:-2]
+    if kind == b"+":
+        return body.decode()
+    if kind == b"-":
+        raise RedisError(body.decode())
+    if kind == b":":
+        return int(body)
+    if kind == b"$":
+        length = int(body)
+        if length < 0:
+            return None
+        data = reader.read(length + 2)
+        return data[:-2]
+    if kind == b"*":
+        length = int(body)
+        if length < 0:
+            return None
+        return [_read_reply(reader) for _ in range(length)]
+    raise ValueError(f"Unexpected reply: {line!r}")
+
+
+class _NamespaceStats:
+    def __init__(self, namespace: str) -> None:
+        self.hits = metrics.counter(f"cache_{namespace}_hits", "Lookups answered from the local tier")
+        self.shared_hits = metrics.counter(f"cache_{namespace}_shared_hits", "Lookups answered from the shared tier")
+        self.misses = metrics.counter(f"cache_{namespace}_misses", "Lookups that had to be computed")
+        self.hit_ratio = metrics.gauge(f"cache_{namespace}_hit_ratio", "Share of lookups served from either tier")
+
+    def record(self, counter) -> None:
+        counter.inc()
+        total = self.hits.value + self.shared_hits.value + self.misses.value
+        self.hit_ratio.set((self.hits.value + self.shared_hits.value) / total)
+
+
+class Cache:
+    """Two-tier get-or-compute cache."""
+
+    def __init__(self, max_entries: int, shared: RedisTier | None = None, ttls: dict[str, float] | None = None) -> None:
+        self.local = LRUCache(max_entries)
+        self.shared = shared
+        self.ttls = dict(ttls or {})
+        self.enabled = True
+        self._stats: dict[str, _NamespaceStats] = {}
+
+    def get_or_compute(
+        self,
+        namespace: str,
+        key: Any,
+        compute: Callable[[], Any],
+        tags: Iterable[str] = (),
+    ) -> Any:
+        """Return the cached value for ``key`` in ``namespace``, computing and storing it on a miss."""
+        if not self.enabled:
+            return compute()
+        full_key = f"{namespace}:{key}"
+        stats = self._namespace_stats(namespace)
+        ttl = self.ttls.get(namespace, 60.0)
+        tags = tuple(tags)
+
+        found, value = self.local.get(full_key)
+        if found:
+            stats.record(stats.hits)
+            return value
+
+        # Taken before reading anything, so an invalidation from here on voids the store
+        generation = self.local.generation(tags)
+        shared_generation = None
+        if self.shared is not None:
+            payload = self.shared.get(full_key)
+            if payload is not None:
+                value = decode(payload)
+                self.local.set(full_key, value, ttl, tags, generation)
+                stats.record(stats.shared_hits)
+                return value
+            shared_generation = self.shared.generation(tags)
+
+        stats.record(stats.misses)
+        value = compute()
+        stored = self.local.set(full_key, value, ttl, tags, generation)
+        if stored and shared_generation is not None:
+            self.shared.set(full_key, encode(value), ttl, tags, shared_generation)
+        return value
+
+    def invalidate_local(self, tags: list[str]) -> None:
+        if ALL_KEYS in tags:
+            self.local.clear()
+        else:
+            self.local.invalidate_tags(tags)
+
+    def invalidate_shared(self, tags: list[str]) -> None:
+        if self.shared is not None:
+            self.shared.invalidate_tags(tag for tag in tags if tag != ALL_KEYS)
+
+    def clear(self) -> None:
+        self.local.clear()
+
+    def _namespace_stats(self, namespace: str) -> _NamespaceStats:
+        stats = self._stats.get(namespace)
+        if stats is None:
+            stats = self._stats[namespace] = _NamespaceStats(namespace)
+        return stats
+
+
+cache = Cache(
+    max_entries=settings.CACHE_MAX_ENTRIES,
+    shared=RedisTier(settings.CACHE_REDIS_URL) if settings.CACHE_REDIS_URL else None,
+    ttls=settings.CACHE_TTLS,
+)
+cache.enabled = settings.CACHE_ENABLED
+invalidation_bus.subscribe(cache.invalidate_local)
+invalidation_bus.subscribe(cache.invalidate_shared, local_only=True)
@@ -1,14 +1,35 @@
+import base64
+import binascii
 from collections.abc import Iterable
+from datetime import datetime, timedelta, timezone
 from typing import Tuple
 
 from fastapi import HTTPException, status
-from sqlalchemy import func, select
+from sqlalchemy import delete, func, insert, select, tuple_, update
 from sqlalchemy.orm import selectinload
 from sqlmodel import Session
 
-from ..models import Card, CardType, Deck, DeckTagLink, SRSReview, Tag, User, UserDeckProgress
-from ..schemas.card import CardCreate, CardUpdate
-from ..schemas.deck import DeckCreate, DeckRead, DeckSummary, DeckUpdate, TagRead
+from ..models import (
+    Card,
+    CardTombstone,
+    CardType,
+    Deck,
+    DeckTagLink,
+    QuizResponse,
+    SRSReview,
+    Tag,
+    User,
+    UserDeckProgress,
+)
+from ..models.card import card_content_hash
+from ..schemas.card import CardCreate, CardImport, CardImportResult, CardRead, CardUpdate, DuplicatePolicy
+from ..core.config import settings
+from ..db.session import primary_reads
+from ..schemas.deck import DeckChanges, DeckCreate, DeckRead, DeckSummary, DeckUpdate, TagRead
+from . import forks as fork_service
+from . import purge as purge_service
+from .cache import cache
+from .invalidation import deck_key, invalidate_after_commit, user_key
 
 
 def _resolve_tags(db: Session, tag_names: Iterable[str]) -> list[Tag]:
@@ -33,6 +54,7 @@ def create_deck(db: Session, owner: User | None, deck_in: DeckCreate) -> Deck:
         description=deck_in.description,
         is_public=deck_in.is_public,
         owner_user_id=owner.id if owner else None,
+        srs_scheduler=deck_in.srs_scheduler,
     )
     deck.tags = tags
     db.add(deck)
@@ -43,6 +65,7 @@ def create_deck(db: Session, owner: User | None, deck_in: DeckCreate) -> Deck:
             card = Card(deck_id=deck.id, **card_data.model_dump(exclude_unset=True))
             db.add(card)
 
+    invalidate_after_commit(db, deck_key(deck.id), *([user_key(owner.id)] if owner else []))
     db.commit()
     db.refresh(deck)
     return deck
@@ -55,23 +78,88 @@ def update_deck(db: Session, deck: Deck, deck_in: DeckUpdate) -> Deck:
         else:
             setattr(deck, field, value)
     db.add(deck)
+    invalidate_after_commit(db, deck_key(deck.id))
     db.commit()
     db.refresh(deck)
     return deck
 
 
-def delete_deck(db: Session, deck: Deck) -> None:
-    db.delete(deck)
-    db.commit()
+def delete_deck(db: Session, deck: Deck) -> bool:
+    """
+    Delete a deck: it disappears immediately, and small decks are purged right away.
+
+    Returns True when the deck is too large to purge within the request; the caller then
+    schedules ``purge.purge_deck_in_background``.
+    """
+    purge_service.mark_deck_deleted(db, deck)
+    if purge_service.deck_card_count(db, deck.id) > settings.DECK_PURGE_INLINE_MAX_CARDS:
+        return True
+    purge_service.purge_deck(db, deck.id)
+    return False
 
 
 def get_deck_by_id(db: Session, deck_id: int) -> Deck:
     deck = db.get(Deck, deck_id)
-    if not deck:
+    if not deck or deck.deleted_at is not None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Deck not found")
     return deck
 
 
+def _deck_to_read(db: Session, deck: Deck) -> DeckRead:
+    cards = deck.cards
+    if deck.forked_from_id is not None:
+        cards = db.exec(select(Card).where(fork_service.deck_cards(db, deck.id)).order_by(Card.id)).scalars().all()
+    return DeckRead(
+        id=deck.id,
+        title=deck.title,
+        description=deck.description,
+        is_public=deck.is_public,
+        owner_user_id=deck.owner_user_id,
+        forked_from_id=deck.forked_from_id,
+        srs_scheduler=deck.srs_scheduler,
+        created_at=deck.created_at,
+        updated_at=deck.updated_at,
+        tags=[TagRead(id=tag.id, name=tag.name) for tag in deck.tags],
+        # Shared cards are listed under the fork, like its own
+        cards=[CardRead.model_validate(card).model_copy(update={"deck_id": deck.id}) for card in cards],
+        tag_names=[tag.name for tag in deck.tags],
+    )
+
+
+def get_deck_snapshot(db: Session, deck_id: int) -> DeckRead:
+    """Full deck with tags and cards, served from the cache until the deck changes."""
+    payload = cache.get_or_compute(
+        "deck",
+        deck_id,
+        lambda: _load_deck_snapshot(db, deck_id),
+        tags=[deck_key(deck_id)],
+    )
+    return DeckRead.model_validate(payload)
+
+
+def _load_deck_snapshot(db: Session, deck_id: int) -> dict:
+    # Read from the primary: a lagging replica's snapshot would be served to everyone until the TTL
+    with primary_reads(db):
+        return _deck_to_read(db, get_deck_by_id(db, deck_id)).model_dump(mode="json")
+
+
+def _encode_cursor(version: str, moment: datetime, *ids: int) -> str:
+    """Opaque cursor: a format version, a timestamp to the microsecond and any tie-breaking ids."""
+    micros = int(moment.replace(tzinfo=moment.tzinfo or timezone.utc).timestamp() * 1_000_000)
+    return base64.urlsafe_b64encode(":".join([version, str(micros), *map(str, ids)]).encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str, version: str, kind: str, ids: int = 0) -> tuple:
+    """Unpack an :func:`_encode_cursor` cursor of ``version`` into ``(moment, *ids)``; 400 if it is not one."""
+    try:
+        found, micros, *values = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode().split(":")
+        if found != version or len(values) != ids:
+            raise ValueError(found)
+        return (datetime.fromtimestamp(int(micros) / 1_000_000, tz=timezone.utc), *map(int, values))
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Invalid {kind} cursor")
+
+
 def list_decks(
     db: Session,
     user: User | None,
@@ -79,14 +167,26 @@ def list_decks(
     tag: str | None = None,
     limit: int = 20,
     offset: int = 0,
-) -> tuple[list[DeckSummary], int]:
+    cursor: str | None = None,
+    with_total: bool = False,
+) -> tuple[list[DeckSummary], str | None, int | None]:
+    """
+    Newest decks first, one page at a time.
+
+    Pages are keyed on ``(created_at, id)``: pass the returned cursor to get the next page,
+    which is an index range scan however deep it is. ``offset`` is still honoured when no
+    cursor is given. Returns the summaries, the cursor of the next page (None on the last
+    page), and the number of matching decks if ``with_total`` is set.
+    """
     deck_stmt = (
         select(Deck)
         .options(selectinload(Deck.tags), selectinload(Deck.cards))
-        .offset(offset)
-        .limit(limit)
+        .order_by(Deck.created_at.desc(), Deck.id.desc())
+        # One extra row tells whether there is a next page
+        .limit(limit + 1)
+        .where(Deck.deleted_at.is_(None))
     )
-    count_stmt = select(func.count(Deck.id))
+    count_stmt = select(func.count(Deck.id)).where(Deck.deleted_at.is_(None))
 
     if search:
         pattern = f"%{search.lower()}%"
@@ -97,14 +197,24 @@ def list_decks(
         deck_stmt = deck_stmt.join(DeckTagLink).join(Tag).where(func.lower(Tag.name) == tag.lower())
         count_stmt = count_stmt.join(DeckTagLink).join(Tag).where(func.lower(Tag.name) == tag.lower())
 
-    deck_stmt = deck_stmt.order_by(Deck.created_at.desc())
+    if cursor:
+        after = _decode_cursor(cursor, "p1", "page", ids=1)
+        deck_stmt = deck_stmt.where(tuple_(Deck.created_at, Deck.id) < tuple_(*after))
+    elif offset:
+        deck_stmt = deck_stmt.offset(offset)
 
     decks = db.exec(deck_stmt).scalars().all()
-    total = db.exec(count_stmt).scalar_one()
+    next_cursor = None
+    if len(decks) > limit:
+        decks = decks[:limit]
+        next_cursor = _encode_cursor("p1", decks[-1].created_at, decks[-1].id)
+    total = db.exec(count_stmt).scalar_one() if with_total else None
 
     summaries: list[DeckSummary] = []
     for deck in decks:
         tag_reads = [TagRead(id=t.id, name=t.name) for t in deck.tags]
+        # A fork's shared cards are not in deck.cards
+        card_count = len(deck.cards) if deck.forked_from_id is None else fork_service.count_deck_cards(db, deck.id)
         due_count = 0
         is_pinned = False
         if user:
@@ -114,7 +224,7 @@ def list_decks(
                     .join(Card, Card.id == SRSReview.card_id)
                     .where(
                         SRSReview.user_id == user.id,
-                        Card.deck_id == deck.id,
+                        fork_service.deck_cards(db, deck.id),
                         SRSReview.due_at <= func.now(),
                     )
                 ).scalar_one()
@@ -135,13 +245,13 @@ def list_decks(
                 title=deck.title,
                 description=deck.description,
                 is_public=deck.is_public,
-                card_count=len(deck.cards),
+                card_count=card_count,
                 due_count=due_count,
                 tags=tag_reads,
                 is_pinned=is_pinned,
             )
         )
-    return summaries, total
+    return summaries, next_cursor, total
 
 
 def _prepare_card_payload(card_in: CardCreate | CardUpdate) -> dict:
@@ -156,25 +266,200 @@ def _prepare_card_payload(card_in: CardCreate | CardUpdate) -> dict:
     return data
 
 
-def attach_card_to_deck(db: Session, deck: Deck, card_in: CardCreate) -> Card:
+# Cards looked up, inserted or updated per statement by import_cards
+_IMPORT_BATCH_SIZE = 1_000
+# Fields an import may change on a duplicate; prompt and answer can differ in case and spacing only
+_IMPORT_FIELDS = ("type", "prompt", "answer", "explanation")
+
+
+def find_duplicate(db: Session, deck: Deck, prompt: str, answer: str) -> Card | None:
+    """A card of the deck with the same prompt and answer (see ``card_content_hash``), if any."""
+    return db.exec(
+        select(Card)
+        .where(fork_service.deck_cards(db, deck.id), Card.content_hash == card_content_hash(prompt, answer))
+        .order_by(Card.id)
+        .limit(1)
+    ).scalar_one_or_none()
+
+
+def attach_card_to_deck(
+    db: Session, deck: Deck, card_in: CardCreate, on_duplicate: DuplicatePolicy = DuplicatePolicy.ALLOW
+) -> tuple[Card, bool]:
+    """
+    Add a card to a deck, unless ``on_duplicate`` says to reuse a card with the same content.
+
+    Returns the card and whether it was created.
+    """
     payload = _prepare_card_payload(card_in)
+    if on_duplicate is not DuplicatePolicy.ALLOW:
+        duplicate = find_duplicate(db, deck, payload["prompt"], payload["answer"])
+        if duplicate is not None and on_duplicate is DuplicatePolicy.SKIP:
+            return duplicate, False
+        if duplicate is not None:
+            return update_card(db, duplicate, CardUpdate(**payload), deck=deck), False
     card = Card(deck_id=deck.id, **payload)
     db.add(card)
+    invalidate_after_commit(db, *fork_service.card_change_keys(db, deck.id))
     db.commit()
     db.refresh(card)
-    return card
+    return card, True
+
+
+def import_cards(db: Session, deck: Deck, card_import: CardImport) -> CardImportResult:
+    """
+    Add many cards to a deck with a few set-based statements, matching duplicates by content hash.
 
+    A card duplicates one the deck already has, or an earlier card of the import, when
+    prompt and answer match up to case and spacing. Under ``skip`` the existing card is
+    kept as it is. Under ``update`` its fields are overwritten, but only where they differ.
+    Under ``allow`` the card is added anyway. Unchanged rows are not written, so
+    re-importing the same file writes nothing and leaves ``updated_at`` alone.
+    Cards not yet backfilled with a hash are never matched.
+    """
+    policy = card_import.on_duplicate
+    # Content hash -> (row to insert, fields the import sets)
+    incoming: dict[str, tuple[dict, dict]] = {}
+    rows: list[dict] = []
+    for card_in in card_import.cards:
+        payload = _prepare_card_payload(card_in)
+        content_hash = card_content_hash(payload["prompt"], payload["answer"])
+        row = {"type": CardType.BASIC.value, "explanation": None, **payload, "deck_id": deck.id}
+        row["content_hash"] = content_hash
+        if policy is DuplicatePolicy.ALLOW:
+            rows.append(row)
+        elif policy is DuplicatePolicy.UPDATE or content_hash not in incoming:
+            # The last of several matching cards wins under update, the first under skip
+            incoming[content_hash] = (row, payload)
 
-def update_card(db: Session, card: Card, card_in: CardUpdate) -> Card:
+    existing: dict[str, Card] = {}
+    hashes = list(incoming)
+    for start in range(0, len(hashes), _IMPORT_BATCH_SIZE):
+        for card in db.exec(
+            select(Card).where(
+                fork_service.deck_cards(db, deck.id), Card.content_hash.in_(hashes[start : start + _IMPORT_BATCH_SIZE])
+            )
+        ).scalars():
+            existing.setdefault(card.content_hash, card)
+
+    changes: list[dict] = []
+    unchanged = 0
+    for content_hash, (row, payload) in incoming.items():
+        card = existing.get(content_hash)
+        if card is None:
+            rows.append(row)
+            continue
+        # Fields the import leaves unset keep their value
+        values = {field: payload.get(field, getattr(card, field)) for field in _IMPORT_FIELDS}
+        if policy is DuplicatePolicy.SKIP or all(getattr(card, field) == values[field] for field in _IMPORT_FIELDS):
+            unchanged += 1
+        else:
+            # A fork edits its own copy of a card it shares with its source
+            card = fork_service.materialize_card(db, deck, card)
+            changes.append({"id": card.id, **values})
+
+    for start in range(0, len(rows), _IMPORT_BATCH_SIZE):
+        db.exec(insert(Card), params=rows[start : start + _IMPORT_BATCH_SIZE])
+    for start in range(0, len(changes), _IMPORT_BATCH_SIZE):
+        db.exec(update(Card), params=changes[start : start + _IMPORT_BATCH_SIZE])
+    if rows or changes:
+        invalidate_after_commit(db, *fork_service.card_change_keys(db, deck.id))
+    db.commit()
+    return CardImportResult(created=len(rows), updated=len(changes), unchanged=unchanged)
+
+
+def backfill_card_hashes(db: Session) -> int:
+    """Hash cards that have no content hash yet, a batch per transaction; returns how many were hashed."""
+    hashed = 0
+    while True:
+        batch = db.exec(
+            select(Card.id, Card.prompt, Card.answer, Card.updated_at)
+            .where(Card.content_hash.is_(None))
+            .limit(_IMPORT_BATCH_SIZE)
+        ).all()
+        if not batch:
+            return hashed
+        # updated_at is written back unchanged: delta sync clients have nothing new to fetch
+        db.exec(
+            update(Card),
+            params=[
+                {"id": card_id, "content_hash": card_content_hash(prompt, answer), "updated_at": updated_at}
+                for card_id, prompt, answer, updated_at in batch
+            ],
+        )
+        db.commit()
+        hashed += len(batch)
+
+
+def update_card(db: Session, card: Card, card_in: CardUpdate, deck: Deck | None = None) -> Card:
+    """Edit a card; editing a card a fork (``deck``) shares with its source edits the fork's own copy."""
+    if deck is not None:
+        card = fork_service.materialize_card(db, deck, card)
     payload = _prepare_card_payload(card_in)
     for key, value in payload.items():
         setattr(card, key, value)
     db.add(card)
+    invalidate_after_commit(db, *fork_service.card_change_keys(db, card.deck_id))
     db.commit()
     db.refresh(card)
     return card
 
 
-def delete_card(db: Session, card: Card) -> None:
+def delete_card(db: Session, card: Card, deck: Deck | None = None) -> None:
+    """Delete a card; deleting a card a fork (``deck``) shares with its source only hides it from the fork."""
+    if deck is not None and card.deck_id != deck.id:
+        fork_service.hide_card(db, deck, card)
+        return
+    invalidate_after_commit(db, *fork_service.card_change_keys(db, card.deck_id))
+    db.add(CardTombstone(deck_id=card.deck_id, card_id=card.id))
+    # Set-based, like the deck purge: the ORM would otherwise load every response to the card
+    db.exec(delete(QuizResponse).where(QuizResponse.card_id == card.id))
+    db.exec(delete(SRSReview).where(SRSReview.card_id == card.id))
     db.delete(card)
     db.commit()
+
+
+def get_deck_changes(db: Session, deck_id: int, since: str | None) -> DeckChanges:
+    """
+    Cards of a deck upserted or deleted since the ``since`` cursor.
+
+    Both lookups are range scans on ``(deck_id, updated_at)`` and ``(deck_id, deleted_at)``,
+    so the cost follows the number of changes rather than the deck size. The returned
+    cursor trails the clock by ``DECK_CHANGES_LAG_SECONDS`` so that rows from transactions
+    still committing are not skipped; a card may therefore be sent twice, and clients
+    apply changes as upserts. Without a cursor, or with one older than the tombstone
+    retention, the whole deck is returned with ``reset`` set. A fork also receives the
+    changes to the cards it shares with its source.
+    """
+    issued_at = datetime.now(tz=timezone.utc)
+    since_at = _decode_cursor(since, "c1", "change")[0] if since else None
+    reset = since_at is None or since_at < issued_at - timedelta(days=settings.CARD_TOMBSTONE_RETENTION_DAYS)
+
+    deck = get_deck_by_id(db, deck_id)
+    cards_stmt = select(Card).where(fork_service.deck_cards(db, deck_id))
+    tombstone_deck_ids = [deck_id] + ([deck.forked_from_id] if deck.forked_from_id is not None else [])
+    deleted_card_ids: list[int] = []
+    if not reset:
+        cards_stmt = cards_stmt.where(Card.updated_at >= since_at)
+        deleted_card_ids = list(
+            db.exec(
+                select(CardTombstone.card_id).where(
+                    CardTombstone.deck_id.in_(tombstone_deck_ids), CardTombstone.deleted_at >= since_at
+                )
+            ).scalars()
+        )
+    cards = db.exec(cards_stmt.order_by(Card.updated_at, Card.id)).scalars().all()
+
+    return DeckChanges(
+        cards=[CardRead.model_validate(card).model_copy(update={"deck_id": deck_id}) for card in cards],
+        deleted_card_ids=deleted_card_ids,
+        cursor=_encode_cursor("c1", issued_at - timedelta(seconds=settings.DECK_CHANGES_LAG_SECONDS)),
+        reset=reset,
+    )
+
+
+def purge_card_tombstones(db: Session) -> int:
+    """Delete tombstones older than the retention period; returns how many were removed."""
+    cutoff = datetime.now(tz=timezone.utc) - timedelta(days=settings.CARD_TOMBSTONE_RETENTION_DAYS)
+    result = db.exec(delete(CardTombstone).where(CardTombstone.deleted_at < cutoff))
+    db.commit()
+    return result.rowcount
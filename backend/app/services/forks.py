@@ -0,0 +1,172 @@
+"""
+Copy-on-write deck forks.
+
+A fork made in ``shared`` mode is a new deck row pointing at its source through
+``forked_from_id``. It owns no cards and reads the source's instead, so forking costs
+one INSERT whatever the size of the deck. The fork's owner edits a shared card by way of
+a private copy: the copy records the original in ``source_card_id``, and from then on
+it takes the original's place in the fork. Deleting a shared card from the fork hides
+it (``hidden_cards``). Until then, edits to the source show through in the fork.
+
+``copy`` mode instead copies every card up front with one ``INSERT ... SELECT``, so no
+card crosses the wire. It is also used to fork a fork, which keeps forks one level deep.
+The forks of a deck are detached the same way before the deck is purged.
+
+Queries for "the cards of a deck" use :func:`deck_cards` so that forks see both
+their own and their shared cards.
+"""
+from typing import Any
+
+from sqlalchemy import and_, delete, func, insert, literal, or_, select, update
+from sqlalchemy.orm import aliased
+from sqlmodel import Session
+
+from ..models import Card, CardTombstone, Deck, HiddenCard, QuizResponse, QuizSession, SRSReview, User
+from ..schemas.deck import DeckFork
+from .invalidation import deck_key, invalidate_after_commit, user_key
+
+# Columns a copy takes from its original; ids, the deck and timestamps are the copy's own
+_COPIED_COLUMNS = ("type", "prompt", "answer", "explanation", "options", "content_hash")
+
+
+def _inherited_cards(fork_id: int, source_id: int) -> Any:
+    """Criterion for the source cards a fork still shares: not copied and not hidden."""
+    copied = select(Card.source_card_id).where(Card.deck_id == fork_id, Card.source_card_id.is_not(None))
+    hidden = select(HiddenCard.card_id).where(HiddenCard.deck_id == fork_id)
+    return and_(Card.deck_id == source_id, Card.id.not_in(copied), Card.id.not_in(hidden))
+
+
+def deck_cards(db: Session, deck_id: int) -> Any:
+    """Criterion on ``Card`` selecting the cards of a deck, including those a fork shares."""
+    deck = db.get(Deck, deck_id)
+    if deck is None or deck.forked_from_id is None:
+        return Card.deck_id == deck_id
+    return or_(Card.deck_id == deck_id, _inherited_cards(deck_id, deck.forked_from_id))
+
+
+def deck_has_card(db: Session, deck_id: int, card: Card) -> bool:
+    if card.deck_id == deck_id:
+        return True
+    deck = db.get(Deck, deck_id)
+    if deck is None or deck.forked_from_id != card.deck_id:
+        return False
+    shared = select(Card.id).where(Card.id == card.id, _inherited_cards(deck_id, card.deck_id))
+    return db.exec(shared).first() is not None
+
+
+def count_deck_cards(db: Session, deck_id: int) -> int:
+    return db.exec(select(func.count(Card.id)).where(deck_cards(db, deck_id))).scalar_one()
+
+
+def card_change_keys(db: Session, deck_id: int) -> list[str]:
+    """Cache tags to invalidate when a deck's cards change: the deck's and those of its shared forks."""
+    fork_ids = db.exec(select(Deck.id).where(Deck.forked_from_id == deck_id)).scalars()
+    return [deck_key(deck_id), *(deck_key(fork_id) for fork_id in fork_ids)]
+
+
+def copy_cards(db: Session, criterion: Any, deck_id: int) -> int:
+    """Copy the cards matching ``criterion`` into a deck with a single INSERT ... SELECT."""
+    rows = select(literal(deck_id), *(getattr(Card, column) for column in _COPIED_COLUMNS), Card.id).where(criterion)
+    result = db.exec(insert(Card.__table__).from_select(["deck_id", *_COPIED_COLUMNS, "source_card_id"], rows))
+    return result.rowcount
+
+
+def fork_deck(db: Session, source: Deck, owner: User, fork_in: DeckFork) -> Deck:
+    """Create ``owner``'s fork of ``source``; a fork of a fork is always made in ``copy`` mode."""
+    shared = fork_in.mode == "shared" and source.forked_from_id is None
+    deck = Deck(
+        title=fork_in.title or source.title,
+        description=source.description,
+        is_public=fork_in.is_public,
+        owner_user_id=owner.id,
+        srs_scheduler=source.srs_scheduler,
+        forked_from_id=source.id if shared else None,
+    )
+    deck.tags = list(source.tags)
+    db.add(deck)
+    db.flush()
+    if not shared:
+        copy_cards(db, deck_cards(db, source.id), deck.id)
+    invalidate_after_commit(db, deck_key(deck.id), user_key(owner.id))
+    db.commit()
+    db.refresh(deck)
+    return deck
+
+
+def materialize_card(db: Session, deck: Deck, card: Card) -> Card:
+    """
+    The deck's own version of ``card``, copying it first if the deck shares it with its source.
+
+    The copy replaces the shared card in the fork, and the fork owner's review state
+    moves to the copy. The caller commits.
+    """
+    if card.deck_id == deck.id:
+        return card
+    copy = Card(
+        deck_id=deck.id, source_card_id=card.id, **{column: getattr(card, column) for column in _COPIED_COLUMNS}
+    )
+    db.add(copy)
+    db.flush()
+    # Delta sync clients of the fork drop the shared card and pick up the copy
+    db.add(CardTombstone(deck_id=deck.id, card_id=card.id))
+    if deck.owner_user_id is not None:
+        db.exec(
+            update(SRSReview)
+            .where(SRSReview.user_id == deck.owner_user_id, SRSReview.card_id == card.id)
+            .values(card_id=copy.id)
+        )
+    return copy
+
+
+def hide_card(db: Session, deck: Deck, card: Card) -> None:
+    """Remove a shared card from a fork; the source deck keeps it."""
+    db.add(HiddenCard(deck_id=deck.id, card_id=card.id))
+    db.add(CardTombstone(deck_id=deck.id, card_id=card.id))
+    invalidate_after_commit(db, deck_key(deck.id))
+    db.commit()
+
+
+def detach_forks(db: Session, deck_id: int) -> int:
+    """
+    Copy the cards each shared fork of a deck still reads from it into the fork, ahead of the deck's purge.
+
+    Answers given in the fork's sessions, and the review state of the fork's users, move
+    from the shared cards to the copies. The shared cards get tombstones in the fork, so its
+    delta sync clients replace them with the copies. Returns how many forks were detached.
+    """
+    fork_ids = list(db.exec(select(Deck.id).where(Deck.forked_from_id == deck_id)).scalars())
+    for fork_id in fork_ids:
+        inherited = select(literal(fork_id), Card.id).where(_inherited_cards(fork_id, deck_id))
+        db.exec(insert(CardTombstone.__table__).from_select(["deck_id", "card_id"], inherited))
+        copy_cards(db, _inherited_cards(fork_id, deck_id), fork_id)
+        copied = select(Card.source_card_id).where(Card.deck_id == fork_id, Card.source_card_id.is_not(None))
+
+        def copy_of(card_id: Any) -> Any:
+            return select(Card.id).where(Card.deck_id == fork_id, Card.source_card_id == card_id).scalar_subquery()
+
+        fork_sessions = select(QuizSession.id).where(QuizSession.deck_id == fork_id)
+        db.exec(
+            update(QuizResponse)
+            .where(QuizResponse.session_id.in_(fork_sessions), QuizResponse.card_id.in_(copied))
+            .values(card_id=copy_of(QuizResponse.card_id))
+            .execution_options(synchronize_session=False)
+        )
+        # Skipping users who already review the copy keeps (user, card) unique
+        existing = aliased(SRSReview)
+        reviews_copy = (
+            select(existing.id)
+            .where(existing.user_id == SRSReview.user_id, existing.card_id == copy_of(SRSReview.card_id))
+            .exists()
+        )
+        fork_users = select(QuizSession.user_id).where(QuizSession.deck_id == fork_id)
+        db.exec(
+            update(SRSReview)
+            .where(SRSReview.user_id.in_(fork_users), SRSReview.card_id.in_(copied), ~reviews_copy)
+            .values(card_id=copy_of(SRSReview.card_id))
+            .execution_options(synchronize_session=False)
+        )
+        db.exec(delete(HiddenCard).where(HiddenCard.deck_id == fork_id))
+        db.exec(update(Deck).where(Deck.id == fork_id).values(forked_from_id=None))
+        invalidate_after_commit(db, deck_key(fork_id))
+        db.commit()
+    return len(fork_ids)
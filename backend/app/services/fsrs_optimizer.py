@@ -0,0 +1,236 @@
+"""
+Per-user FSRS weight fitting, vectorized with NumPy.
+
+A user's review history is split into one sequence per card. Each sequence holds the
+rating of each review and the days elapsed since the previous one. Reviews of a card on
+the same UTC day are collapsed into the first one, as FSRS only models long-term recall.
+The forward pass replays every sequence of every user in the chunk at once, one review
+position at a time. At each position it predicts recall probability and scores it
+against the actual outcome (any rating other than "again") with log loss.
+
+Weights are fitted in log space around the defaults, ``w = default * exp(x)``, so they
+stay positive. An L2 penalty on ``x`` pulls users with little history towards the
+defaults. Gradients are forward differences. All users in a chunk move together:
+perturbing one coordinate of ``x`` for every user costs one forward pass. An iteration
+therefore costs 18 passes over the chunk, however many users it holds, and memory is
+bounded by ``chunk_size``.
+"""
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass
+from datetime import datetime, timezone
+
+import numpy as np
+from sqlalchemy import select
+from sqlmodel import Session
+
+from ..models import QuizResponse, QuizSession, User
+from .scheduler import (
+    FSRS,
+    FSRS_DECAY,
+    FSRS_DEFAULT_WEIGHTS,
+    FSRS_FACTOR,
+    MAX_STABILITY,
+    MIN_STABILITY,
+    quality_to_rating,
+)
+
+N_WEIGHTS = len(FSRS_DEFAULT_WEIGHTS)
+_DEFAULTS = np.asarray(FSRS_DEFAULT_WEIGHTS)
+
+
+@dataclass
+class ReviewSequences:
+    """Padded per-card review sequences for a batch of users."""
+
+    user_index: np.ndarray  # (n_sequences,) row of the owning user in the weight matrix
+    ratings: np.ndarray  # (n_sequences, max_len) 1-4, 0 past the end of a sequence
+    elapsed: np.ndarray  # (n_sequences, max_len) days since the previous review
+    lengths: np.ndarray  # (n_sequences,)
+    n_users: int
+
+    def reviews_per_user(self) -> np.ndarray:
+        """Number of scored reviews (all but each card's first) per user."""
+        return np.bincount(self.user_index, weights=np.maximum(self.lengths - 1, 0), minlength=self.n_users)
+
+
+def build_sequences(
+    user_index: np.ndarray,
+    card_ids: np.ndarray,
+    ratings: np.ndarray,
+    days: np.ndarray,
+    n_users: int,
+    max_len: int = 64,
+) -> ReviewSequences:
+    """
+    Pack flat review arrays into padded per-card sequences.
+
+    The inputs must be sorted by (user, card, time). ``days`` is the review time in
+    fractional days since any fixed epoch. Sequences longer than ``max_len`` keep their
+    first ``max_len`` reviews.
+    """
+    day_index = np.floor(days).astype(np.int64)
+    new_card = np.ones(len(card_ids), dtype=bool)
+    new_card[1:] = (user_index[1:] != user_index[:-1]) | (card_ids[1:] != card_ids[:-1])
+    same_day = np.zeros(len(card_ids), dtype=bool)
+    same_day[1:] = ~new_card[1:] & (day_index[1:] == day_index[:-1])
+    keep = ~same_day
+
+    user_index, ratings, days, new_card = user_index[keep], ratings[keep], days[keep], new_card[keep]
+    starts = np.flatnonzero(new_card)
+    sequence_of = np.cumsum(new_card) - 1
+    position = np.arange(len(ratings)) - starts[sequence_of]
+    lengths = np.minimum(np.diff(np.append(starts, len(ratings))), max_len)
+
+    elapsed = np.zeros(len(ratings))
+    elapsed[1:] = np.where(new_card[1:], 0.0, days[1:] - days[:-1])
+
+    inside = position < max_len
+    width = int(lengths.max()) if len(lengths) else 0
+    padded_ratings = np.zeros((len(starts), width), dtype=np.int8)
+    padded_elapsed = np.zeros((len(starts), width))
+    padded_ratings[sequence_of[inside], position[inside]] = ratings[inside]
+    padded_elapsed[sequence_of[inside], position[inside]] = elapsed[inside]
+
+    # Longest first, so the sequences still active at any step are a prefix of the rows
+    order = np.argsort(-lengths, kind="stable")
+    return ReviewSequences(
+        user_index[starts][order], padded_ratings[order], padded_elapsed[order], lengths[order], n_users
+    )
+
+
+def _initial_difficulty(w: np.ndarray, rating: np.ndarray) -> np.ndarray:
+    return np.clip(w[:, 4] - (rating - 3) * w[:, 5], 1.0, 10.0)
+
+
+def user_losses(weights: np.ndarray, seqs: ReviewSequences) -> np.ndarray:
+    """Mean log loss of each user's recall predictions under ``weights`` (n_users, 17)."""
+    w = weights[seqs.user_index]
+    n_sequences = len(seqs.lengths)
+    first = seqs.ratings[:, 0].astype(np.int64) if seqs.ratings.size else np.zeros(0, dtype=np.int64)
+
+    stability = w[np.arange(n_sequences), np.maximum(first, 1) - 1]
+    difficulty = _initial_difficulty(w, first)
+    mean_reversion = w[:, 7] * _initial_difficulty(w, np.full(n_sequences, 3))
+    total = np.zeros(n_sequences)
+    # Sequences are sorted longest first: at each step only the first n_active rows take part
+    active_counts = (seqs.lengths[None, :] > np.arange(seqs.ratings.shape[1])[:, None]).sum(axis=1)
+
+    for step in range(1, seqs.ratings.shape[1]):
+        n = active_counts[step]
+        ww, s, d = w[:n], stability[:n], difficulty[:n]
+        rating = seqs.ratings[:n, step].astype(np.int64)
+        r = np.clip((1 + FSRS_FACTOR * seqs.elapsed[:n, step] / s) ** FSRS_DECAY, 1e-6, 1 - 1e-6)
+        recalled = rating > 1
+        total[:n] -= np.where(recalled, np.log(r), np.log1p(-r))
+
+        hard_penalty = np.where(rating == 2, ww[:, 15], 1.0)
+        easy_bonus = np.where(rating == 4, ww[:, 16], 1.0)
+        recall_stability = s * (
+            np.exp(ww[:, 8]) * (11 - d) * s ** -ww[:, 9] * np.expm1(ww[:, 10] * (1 - r)) * hard_penalty * easy_bonus
+            + 1
+        )
+        forget_stability = ww[:, 11] * d ** -ww[:, 12] * ((s + 1) ** ww[:, 13] - 1) * np.exp(ww[:, 14] * (1 - r))
+        stability[:n] = np.clip(np.where(recalled, recall_stability, forget_stability), MIN_STABILITY, MAX_STABILITY)
+        difficulty[:n] = np.clip(mean_reversion[:n] + (1 - ww[:, 7]) * (d - ww[:, 6] * (rating - 3)), 1.0, 10.0)
+
+    counts = seqs.reviews_per_user()
+    sums = np.bincount(seqs.user_index, weights=total, minlength=seqs.n_users)
+    return np.divide(sums, counts, out=np.zeros(seqs.n_users), where=counts > 0)
+
+
+def fit_weights(
+    seqs: ReviewSequences,
+    iterations: int = 30,
+    learning_rate: float = 0.05,
+    l2: float = 20.0,
+    epsilon: float = 1e-3,
+) -> np.ndarray:
+    """
+    Fit one weight vector per user with Adam on the regularized mean log loss.
+
+    ``l2`` is divided by each user's review count, so the pull towards the defaults fades
+    as history accumulates.
+    """
+    counts = np.maximum(seqs.reviews_per_user(), 1.0)
+    penalty = (l2 / counts)[:, None]
+    x = np.zeros((seqs.n_users, N_WEIGHTS))
+    m = np.zeros_like(x)
+    v = np.zeros_like(x)
+
+    def objective(x: np.ndarray) -> np.ndarray:
+        return user_losses(_DEFAULTS * np.exp(x), seqs) + (penalty * x**2).sum(axis=1)
+
+    for t in range(1, iterations + 1):
+        base = objective(x)
+        grad = np.empty_like(x)
+        for k in range(N_WEIGHTS):
+            shifted = x.copy()
+            shifted[:, k] += epsilon
+            grad[:, k] = (objective(shifted) - base) / epsilon
+        m = 0.9 * m + 0.1 * grad
+        v = 0.999 * v + 0.001 * grad**2
+        x -= learning_rate * (m / (1 - 0.9**t)) / (np.sqrt(v / (1 - 0.999**t)) + 1e-8)
+        np.clip(x, -3.0, 3.0, out=x)
+
+    return _DEFAULTS * np.exp(x)
+
+
+def _days(moment: datetime) -> float:
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.timestamp() / 86400
+
+
+def _load_history(db: Session, user_ids: Sequence[int]) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    rows = db.exec(
+        select(QuizSession.user_id, QuizResponse.card_id, QuizResponse.quality, QuizResponse.responded_at)
+        .join(QuizSession, QuizSession.id == QuizResponse.session_id)
+        .where(QuizSession.user_id.in_(user_ids), QuizResponse.quality.is_not(None))
+        .order_by(QuizSession.user_id, QuizResponse.card_id, QuizResponse.responded_at)
+    ).all()
+    row_of = {user_id: index for index, user_id in enumerate(user_ids)}
+    user_index = np.fromiter((row_of[row[0]] for row in rows), dtype=np.int64, count=len(rows))
+    card_ids = np.fromiter((row[1] for row in rows), dtype=np.int64, count=len(rows))
+    ratings = np.fromiter((quality_to_rating(row[2]) for row in rows), dtype=np.int8, count=len(rows))
+    days = np.fromiter((_days(row[3]) for row in rows), dtype=np.float64, count=len(rows))
+    return user_index, card_ids, ratings, days
+
+
+def optimize_users(
+    db: Session,
+    user_ids: Iterable[int] | None = None,
+    chunk_size: int = 2_000,
+    min_reviews: int = 50,
+    iterations: int = 30,
+) -> int:
+    """
+    Fit and store ``fsrs_weights`` for FSRS users (or ``user_ids``) with enough history.
+
+    Users are processed ``chunk_size`` at a time, each chunk committed on its own.
+    Users with fewer than ``min_reviews`` scored reviews keep their current weights.
+
+    Returns:
+        Number of users whose weights were updated
+    """
+    if user_ids is None:
+        user_ids = db.exec(select(User.id).where(User.srs_scheduler == FSRS).order_by(User.id)).scalars().all()
+    user_ids = list(user_ids)
+
+    updated = 0
+    for start in range(0, len(user_ids), chunk_size):
+        chunk = user_ids[start : start + chunk_size]
+        user_index, card_ids, ratings, days = _load_history(db, chunk)
+        if not len(ratings):
+            continue
+        seqs = build_sequences(user_index, card_ids, ratings, days, n_users=len(chunk))
+        enough = seqs.reviews_per_user() >= min_reviews
+        if not enough.any():
+            continue
+        weights = fit_weights(seqs, iterations=iterations)
+        for row in np.flatnonzero(enough):
+            user = db.get(User, chunk[row])
+            user.fsrs_weights = [round(float(value), 4) for value in weights[row]]
+            db.add(user)
+            updated += 1
+        db.commit()
+    return updated
@@ -0,0 +1,290 @@
+"""
+Semantic grading of typed answers through a pluggable backend.
+
+``answer_grader.grade(card, user_answer)`` returns a :class:`Grade`, or None when the
+backend is disabled, failed or did not answer within ``GRADING_TIMEOUT_SECONDS``.
+Callers then fall back to exact matching. Between callers and the backend:
+
+- A memo keyed by (card id, card ``updated_at``, normalized answer). A repeated answer,
+  such as a common misspelling, is graded once per card version.
+- Concurrent requests for the same key share one in-flight grading.
+- Micro-batching: requests that arrive within ``GRADING_MAX_DELAY_MS`` of each other
+  (or until ``GRADING_MAX_BATCH`` are waiting) go to the backend in one call.
+- At most ``GRADING_MAX_CONCURRENCY`` backend calls run at once.
+
+Backends are selected with ``GRADING_BACKEND``. ``local`` is a deterministic stand-in
+for tests and development that grades with the typo-tolerant matcher. ``openai`` calls
+an OpenAI-compatible chat completions endpoint, which also covers Ollama and vLLM.
+"""
+import asyncio
+import json
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional, Protocol
+
+from loguru import logger
+
+from ..core.config import settings
+from ..core.metrics import metrics
+from ..models import Card
+from . import answer_matching
+
+
+@dataclass(frozen=True)
+class GradeRequest:
+    prompt: str
+    expected: tuple[str, ...]
+    answer: str
+
+
+@dataclass(frozen=True)
+class Grade:
+    is_correct: bool
+    feedback: Optional[str] = None
+
+
+class GradingBackend(Protocol):
+    async def grade(self, requests: list[GradeRequest]) -> list[Grade]:
+        """Grade a batch; the result has one grade per request, in order."""
+        ...
+
+
+class LocalGradingBackend:
+    """Deterministic grading with the typo-tolerant matcher, for tests and development."""
+
+    def __init__(self) -> None:
+        self.calls = 0
+
+    async def grade(self, requests: list[GradeRequest]) -> list[Grade]:
+        self.calls += 1
+        grades = []
+        for request in requests:
+            if answer_matching.AnswerMatcher(request.expected).matches(request.answer):
+                grades.append(Grade(is_correct=True, feedback="Correct."))
+            else:
+                grades.append(Grade(is_correct=False, feedback=f"Expected: {' / '.join(request.expected)}"))
+        return grades
+
+
+_GRADING_INSTRUCTIONS = (
+    "You grade flashcard answers. For each numbered item, decide whether the student's answer means "
+    "the same as one of the expected answers; ignore spelling mistakes that do not change the meaning. "
+    'Reply with JSON only: {"grades": [{"item": <number>, "correct": <true|false>, '
+    '"feedback": "<one short sentence for the student>"}]} with one entry per item.'
+)
+
+
+class OpenAIGradingBackend:
+    """Batch grading through an OpenAI-compatible chat completions endpoint."""
+
+    def __init__(self, base_url: str, api_key: Optional[str], model: str, timeout: float) -> None:
+        # Imported here: httpx adds noticeably to app startup, and only this backend needs it
+        import httpx
+
+        headers = {"Authorization": f"Bearer {api_key}"} if api_key else {}
+        self.model = model
+        self._client = httpx.AsyncClient(base_url=base_url.rstrip("/"), headers=headers, timeout=timeout)
+
+    async def grade(self, requests: list[GradeRequest]) -> list[Grade]:
+        items = [
+            {"item": number, "question": request.prompt, "expected": list(request.expected), "answer": request.answer}
+            for number, request in enumerate(requests, 1)
+        ]
+        response = await self._client.post(
+            "/chat/completions",
+            json={
+                "model": self.model,
+                "temperature": 0,
+                "response_format": {"type": "json_object"},
+                "messages": [
+                    {"role": "system", "content": _GRADING_INSTRUCTIONS},
+                    {"role": "user", "content": json.dumps(items, ensure_ascii=False)},
+                ],
+            },
+        )
+        response.raise_for_status()
+        content = json.loads(response.json()["choices"][0]["message"]["content"])
+        by_item = {entry["item"]: entry for entry in content["grades"]}
+        if set(by_item) != set(range(1, len(requests) + 1)):
+            raise ValueError(f"Grading reply covers items {sorted(by_item)} of {len(requests)}")
+        return [
+            Grade(is_correct=bool(by_item[number]["correct"]), feedback=by_item[number].get("feedback"))
+            for number in range(1, len(requests) + 1)
+        ]
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+
+def create_backend(name: str) -> Optional[GradingBackend]:
+    if name == "none":
+        return None
+    if name == "local":
+        return LocalGradingBackend()
+    if name == "openai":
+        return OpenAIGradingBackend(
+            base_url=settings.GRADING_OPENAI_BASE_URL,
+            api_key=settings.GRADING_OPENAI_API_KEY,
+            model=settings.GRADING_OPENAI_MODEL,
+            timeout=settings.GRADING_TIMEOUT_SECONDS,
+        )
+    raise ValueError(f"Unknown grading backend: {name}")
+
+
+def grade_request(card: Card, user_answer: str) -> GradeRequest:
+    compiled = answer_matching.compiled_cards.get(card)
+    if compiled.blanks is not None:
+        expected = tuple(" / ".join(sorted(blank.exact)) for blank in compiled.blanks)
+    else:
+        aliases = card.options if isinstance(card.options, list) else []
+        expected = tuple(str(answer) for answer in [card.answer, *aliases] if answer)
+    return GradeRequest(prompt=card.prompt, expected=expected, answer=user_answer)
+
+
+_GradeKey = tuple[Optional[int], Optional[datetime], str]
+
+
+class AnswerGrader:
+    """Memoized, deduplicated, micro-batched and concurrency-limited access to a grading backend."""
+
+    def __init__(
+        self,
+        backend: Optional[GradingBackend] = None,
+        max_batch: int = 16,
+        max_delay: float = 0.02,
+        max_concurrency: int = 4,
+        timeout: float = 3.0,
+        cache_size: int = 50_000,
+    ) -> None:
+        self.backend = backend
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.cache_size = cache_size
+        self._memo: OrderedDict[_GradeKey, Grade] = OrderedDict()
+        self._memo_lock = threading.Lock()
+        self._inflight: dict[_GradeKey, asyncio.Future] = {}
+        self._pending: list[tuple[_GradeKey, GradeRequest]] = []
+        self._timer: asyncio.TimerHandle | None = None
+        self._slots: asyncio.Semaphore | None = None
+        self._tasks: set[asyncio.Task] = set()
+        self._running = False
+
+        self._memo_hits = metrics.meter("grading_memo_hits", "Grades served from the memo")
+        self._calls = metrics.meter("grading_backend_calls", "Batched calls to the grading backend")
+        self._failures = metrics.meter("grading_fallbacks", "Gradings that fell back to exact matching")
+        self._batch_size = metrics.summary("grading_batch_size", "Answers per grading backend call")
+
+    @property
+    def running(self) -> bool:
+        return self._running
+
+    def configure(
+        self,
+        backend: Optional[GradingBackend],
+        max_batch: int,
+        max_delay: float,
+        max_concurrency: int,
+        timeout: float,
+        cache_size: int,
+    ) -> None:
+        self.backend = backend
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.cache_size = cache_size
+
+    async def start(self) -> None:
+        self._slots = asyncio.Semaphore(self.max_concurrency)
+        self._running = self.backend is not None
+
+    async def stop(self) -> None:
+        """Send whatever is still buffered and wait for in-flight calls."""
+        self._running = False
+        self._flush()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        close = getattr(self.backend, "aclose", None)
+        if close is not None:
+            await close()
+
+    def clear(self) -> None:
+        with self._memo_lock:
+            self._memo.clear()
+
+    async def grade(self, card: Card, user_answer: str) -> Optional[Grade]:
+        if not self._running:
+            return None
+        key: _GradeKey = (card.id, card.updated_at, answer_matching.normalize(user_answer))
+        with self._memo_lock:
+            grade = self._memo.get(key)
+            if grade is not None:
+                self._memo.move_to_end(key)
+        if grade is not None:
+            self._memo_hits.inc()
+            return grade
+
+        future = self._inflight.get(key)
+        if future is None:
+            future = asyncio.get_running_loop().create_future()
+            self._inflight[key] = future
+            self._pending.append((key, grade_request(card, user_answer)))
+            if len(self._pending) >= self.max_batch:
+                self._flush()
+            elif self._timer is None:
+                self._timer = asyncio.get_running_loop().call_later(self.max_delay, self._flush)
+        try:
+            # Shielded: a caller that gives up leaves the grading running for the others and the memo
+            return await asyncio.wait_for(asyncio.shield(future), self.timeout)
+        except Exception as exc:
+            self._failures.inc()
+            logger.warning(f"Answer grading unavailable, falling back to exact matching: {exc!r}")
+            return None
+
+    def _remember(self, key: _GradeKey, grade: Grade) -> None:
+        with self._memo_lock:
+            self._memo[key] = grade
+            self._memo.move_to_end(key)
+            while len(self._memo) > self.cache_size:
+                self._memo.popitem(last=False)
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._pending:
+            return
+        batch, self._pending = self._pending, []
+        task = asyncio.get_running_loop().create_task(self._call(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _call(self, batch: list[tuple[_GradeKey, GradeRequest]]) -> None:
+        assert self._slots is not None and self.backend is not None
+        try:
+            async with self._slots:
+                self._calls.inc()
+                self._batch_size.observe(len(batch))
+                grades = await asyncio.wait_for(self.backend.grade([request for _, request in batch]), self.timeout)
+            if len(grades) != len(batch):
+                raise ValueError(f"Grading backend returned {len(grades)} grades for {len(batch)} answers")
+        except Exception as exc:
+            for key, _ in batch:
+                future = self._inflight.pop(key)
+                if not future.done():
+                    future.set_exception(exc)
+                # Nobody may be left to retrieve it
+                future.exception()
+            return
+        for (key, _), grade in zip(batch, grades):
+            self._remember(key, grade)
+            future = self._inflight.pop(key)
+            if not future.done():
+                future.set_result(grade)
+
+
+answer_grader = AnswerGrader()
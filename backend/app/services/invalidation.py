@@ -0,0 +1,319 @@
+"""
+Cache invalidation bus shared by every worker.
+
+Services call :func:`invalidate_after_commit` with keys such as ``deck:12`` or
+``user:3``. The keys are held on the session and published only once the transaction
+commits (they are dropped on rollback). Subscribers in this process are called
+immediately. Other workers learn about the keys through a backend, picked with
+``CACHE_INVALIDATION_BACKEND``:
+
+- ``memory``: stays within the process, which is enough for a single worker and for tests.
+  Buses that share an :class:`InMemoryHub` deliver to each other.
+- ``unix``: one datagram socket per worker in ``CACHE_INVALIDATION_SOCKET_DIR``, for
+  several workers on one host.
+- ``postgres``: ``LISTEN``/``NOTIFY`` on the primary database, for any number of hosts.
+
+A subscriber receives a list of keys. ``"*"`` means "drop everything". It is sent after
+a backend reconnects, because messages may have been missed while it was disconnected.
+Callbacks may run on a backend thread, so they must be thread-safe.
+"""
+import json
+import os
+import socket
+import threading
+import time
+import uuid
+from collections.abc import Callable, Iterable
+from contextlib import suppress
+from pathlib import Path
+
+from loguru import logger
+from sqlalchemy import event, text
+from sqlmodel import Session
+
+from ..core.config import settings
+from ..core.metrics import metrics
+
+ALL_KEYS = "*"
+CHANNEL = "cache_invalidation"
+# NOTIFY payloads are limited to 8000 bytes; keys are sent in chunks well below that
+MAX_KEYS_PER_MESSAGE = 200
+
+_PENDING_KEY = "invalidate_keys"
+
+Deliver = Callable[[bytes], None]
+
+
+def deck_key(deck_id: int) -> str:
+    return f"deck:{deck_id}"
+
+
+def user_key(user_id: int) -> str:
+    return f"user:{user_id}"
+
+
+class InMemoryHub:
+    """Connects in-memory backends, standing in for the network between workers."""
+
+    def __init__(self) -> None:
+        self._backends: list["InMemoryBackend"] = []
+        self._lock = threading.Lock()
+
+    def attach(self, backend: "InMemoryBackend") -> None:
+        with self._lock:
+            self._backends.append(backend)
+
+    def detach(self, backend: "InMemoryBackend") -> None:
+        with self._lock:
+            if backend in self._backends:
+                self._backends.remove(backend)
+
+    def broadcast(self, sender: "InMemoryBackend", payload: bytes) -> None:
+        with self._lock:
+            receivers = [backend for backend in self._backends if backend is not sender]
+        for backend in receivers:
+            backend.receive(payload)
+
+
+class InMemoryBackend:
+    """Delivers to other buses attached to the same hub, synchronously."""
+
+    def __init__(self, hub: InMemoryHub | None = None) -> None:
+        self.hub = hub or InMemoryHub()
+        self._deliver: Deliver | None = None
+
+    def start(self, deliver: Deliver) -> None:
+        self._deliver = deliver
+        self.hub.attach(self)
+
+    def stop(self) -> None:
+        self.hub.detach(self)
+        self._deliver = None
+
+    def publish(self, payload: bytes) -> None:
+        self.hub.broadcast(self, payload)
+
+    def receive(self, payload: bytes) -> None:
+        if self._deliver is not None:
+            self._deliver(payload)
+
+
+class UnixSocketBackend:
+    """One datagram socket per worker in a shared directory; publishing sends to all of them."""
+
+    def __init__(self, directory: str | Path) -> None:
+        self.directory = Path(directory)
+        self.path = self.directory / f"{os.getpid()}-{uuid.uuid4().hex[:8]}.sock"
+        self._socket: socket.socket | None = None
+        self._thread: threading.Thread | None = None
+
+    def start(self, deliver: Deliver) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self._socket.bind(str(self.path))
+        self._thread = threading.Thread(target=self._listen, args=(self._socket, deliver), daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._socket is not None:
+            # Unblocks recv() in the listener thread
+            with suppress(OSError):
+                self._socket.shutdown(socket.SHUT_RDWR)
+            self._socket.close()
+            self._socket = None
+        with suppress(FileNotFoundError):
+            self.path.unlink()
+        if self._thread is not None:
+            self._thread.join(timeout=1)
+            self._thread = None
+
+    def publish(self, payload: bytes) -> None:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM) as sender:
+            for peer in self.directory.glob("*.sock"):
+                if peer == self.path:
+                    continue
+                try:
+                    sender.sendto(payload, str(peer))
+                except (ConnectionRefusedError, FileNotFoundError):
+                    # The worker that owned this socket is gone
+                    with suppress(FileNotFoundError):
+                        peer.unlink()
+                except OSError as exc:
+                    logger.warning("Could not send cache invalidation to {}: {}", peer, exc)
+
+    @staticmethod
+    def _listen(sock: socket.socket, deliver: Deliver) -> None:
+        while True:
+            try:
+                payload = sock.recv(65536)
+            except OSError:
+                return
+            if not payload:
+                return
+            deliver(payload)
+
+
+class PostgresBackend:
+    """``LISTEN``/``NOTIFY`` on a dedicated psycopg connection."""
+
+    def __init__(self, database_url: str, channel: str = CHANNEL, reconnect_delay: float = 1.0) -> None:
+        from sqlalchemy.engine import make_url
+
+        url = make_url(database_url)
+        self.conninfo = url.set(drivername="postgresql").render_as_string(hide_password=False)
+        self.channel = channel
+        self.reconnect_delay = reconnect_delay
+        self._connection = None
+        self._stopping = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self, deliver: Deliver) -> None:
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._listen, args=(deliver,), daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopping.set()
+        if self._connection is not None:
+            # Closing the connection ends the blocking notifies() iterator
+            with suppress(Exception):
+                self._connection.close()
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+            self._thread = None
+
+    def publish(self, payload: bytes) -> None:
+        from ..db.session import engine
+
+        with engine.connect() as connection:
+            connection.execute(
+                text("SELECT pg_notify(:channel, :payload)"),
+                {"channel": self.channel, "payload": payload.decode()},
+            )
+            connection.commit()
+
+    def _listen(self, deliver: Deliver) -> None:
+        import psycopg
+
+        connected_before = False
+        while not self._stopping.is_set():
+            try:
+                self._connection = psycopg.connect(self.conninfo, autocommit=True)
+                self._connection.execute(f'LISTEN "{self.channel}"')
+                if connected_before:
+                    deliver(_encode([ALL_KEYS], origin=""))
+                connected_before = True
+                for notify in self._connection.notifies():
+                    deliver(notify.payload.encode())
+            except Exception as exc:
+                if self._stopping.is_set():
+                    return
+                logger.warning("Cache invalidation listener disconnected: {}", exc)
+                time.sleep(self.reconnect_delay)
+            finally:
+                if self._connection is not None:
+                    with suppress(Exception):
+                        self._connection.close()
+
+
+def _encode(keys: list[str], origin: str) -> bytes:
+    return json.dumps({"keys": keys, "origin": origin, "sent_at": time.time()}).encode()
+
+
+def create_backend(name: str):
+    if name == "memory":
+        return InMemoryBackend()
+    if name == "unix":
+        return UnixSocketBackend(settings.CACHE_INVALIDATION_SOCKET_DIR)
+    if name == "postgres":
+        return PostgresBackend(settings.DATABASE_URL)
+    raise ValueError(f"Unknown cache invalidation backend: {name}")
+
+
+class InvalidationBus:
+    """Fans invalidated keys out to local subscribers and, through the backend, to other workers."""
+
+    def __init__(self, backend=None) -> None:
+        self.backend = backend
+        self.origin = uuid.uuid4().hex
+        self._subscribers: list[tuple[Callable[[list[str]], None], bool]] = []
+        self._started = False
+
+        self._published = metrics.counter("cache_invalidation_published", "Keys published to other workers")
+        self._received = metrics.counter("cache_invalidation_received", "Keys received from other workers")
+        self._lag = metrics.summary("cache_invalidation_lag_seconds", "Delay from publish to delivery in another worker")
+
+    def subscribe(self, callback: Callable[[list[str]], None], *, local_only: bool = False) -> None:
+        """Call ``callback`` with invalidated keys; ``local_only`` skips keys from other workers."""
+        self._subscribers.append((callback, local_only))
+
+    def start(self) -> None:
+        if self.backend is None:
+            self.backend = create_backend(settings.CACHE_INVALIDATION_BACKEND)
+        self.backend.start(self._receive)
+        self._started = True
+
+    def stop(self) -> None:
+        if self._started:
+            self._started = False
+            self.backend.stop()
+
+    def invalidate(self, keys: Iterable[str]) -> None:
+        """Drop ``keys`` in this process now and tell the other workers."""
+        keys = sorted(set(keys))
+        if not keys:
+            return
+        self._notify(keys, remote=False)
+        if not self._started:
+            return
+        for start in range(0, len(keys), MAX_KEYS_PER_MESSAGE):
+            chunk = keys[start : start + MAX_KEYS_PER_MESSAGE]
+            try:
+                self.backend.publish(_encode(chunk, self.origin))
+            except Exception as exc:
+                logger.error("Failed to publish cache invalidation for {} keys: {}", len(chunk), exc)
+                continue
+            self._published.inc(len(chunk))
+
+    def _receive(self, payload: bytes) -> None:
+        try:
+            message = json.loads(payload)
+        except ValueError:
+            logger.warning("Ignoring malformed cache invalidation message")
+            return
+        if message.get("origin") == self.origin:
+            return
+        self._lag.observe(max(0.0, time.time() - message.get("sent_at", time.time())))
+        self._received.inc(len(message["keys"]))
+        self._notify(message["keys"], remote=True)
+
+    def _notify(self, keys: list[str], remote: bool) -> None:
+        for callback, local_only in list(self._subscribers):
+            if remote and local_only:
+                continue
+            try:
+                callback(keys)
+            except Exception as exc:
+                logger.error("Cache invalidation subscriber failed: {}", exc)
+
+
+invalidation_bus = InvalidationBus()
+
+
+def invalidate_after_commit(db: Session, *keys: str) -> None:
+    """Publish ``keys`` once ``db`` commits its current transaction."""
+    db.info.setdefault(_PENDING_KEY, set()).update(keys)
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_pending(session) -> None:
+    keys = session.info.pop(_PENDING_KEY, None)
+    if keys:
+        invalidation_bus.invalidate(keys)
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _discard_pending(session, transaction) -> None:
+    # Runs after after_commit, so anything left here was rolled back or closed
+    if transaction.parent is None:
+        session.info.pop(_PENDING_KEY, None)
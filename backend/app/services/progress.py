@@ -0,0 +1,38 @@
+from datetime import datetime, timezone
+
+from sqlalchemy import func, select
+from sqlmodel import Session
+
+from ..models import QuizResponse, QuizSession, UserDeckProgress
+from . import forks as fork_service
+
+
+def update_deck_progress(db: Session, user_id: int, deck_id: int, studied_at: datetime | None = None) -> None:
+    """Recompute a user's completion percentage for a deck and stamp the last study time."""
+    progress = db.exec(
+        select(UserDeckProgress).where(UserDeckProgress.user_id == user_id, UserDeckProgress.deck_id == deck_id)
+    ).scalar_one_or_none()
+
+    if not progress:
+        progress = UserDeckProgress(user_id=user_id, deck_id=deck_id, percent_complete=0.0)
+        db.add(progress)
+
+    total_cards = fork_service.count_deck_cards(db, deck_id)
+
+    reviewed_cards = int(
+        db.exec(
+            select(func.count(QuizResponse.id))
+            .join(QuizSession, QuizSession.id == QuizResponse.session_id)
+            .where(
+                QuizSession.user_id == user_id,
+                QuizSession.deck_id == deck_id,
+            )
+        ).scalar_one()
+    )
+
+    if total_cards:
+        progress.percent_complete = min(100.0, (reviewed_cards / total_cards) * 100)
+    progress.last_studied_at = studied_at or datetime.now(tz=timezone.utc)
+    progress.streak = max(progress.streak, 1)
+
+    db.add(progress)
@@ -0,0 +1,137 @@
+"""
+Set-based deletion of decks and accounts.
+
+Deleting through the ORM loads every dependent row and deletes them one by one, which
+for a deck with tens of thousands of cards and years of sessions does not finish within
+a request. Instead, rows are removed with DELETE statements, children first, in chunks
+of ``PURGE_CHUNK_SIZE`` rows, with a commit after each chunk. Every transaction stays
+short and no rows are loaded into the session. The foreign keys also cascade
+(``ON DELETE CASCADE``). Deleting children explicitly keeps each statement bounded and
+works on SQLite, where foreign keys are not enforced by default.
+
+A deck is marked deleted (``deleted_at``) before its rows are removed, and reads stop
+returning it at that point. Decks with more than ``DECK_PURGE_INLINE_MAX_CARDS`` cards
+are purged after the response by a background task. ``scripts/purge_deleted_decks.py``
+finishes any purge interrupted by a restart.
+
+Review logs of a deleted deck are kept: history outlives deleted cards (see
+:class:`~app.models.study.ReviewLog`). They go when their user's account is deleted.
+"""
+from collections.abc import Callable
+from datetime import datetime, timezone
+from typing import Any
+
+from loguru import logger
+from sqlalchemy import delete, func, select, update
+from sqlmodel import Session
+
+from ..core.config import settings
+from ..models import (
+    Card,
+    CardTombstone,
+    DailyReviewQueue,
+    Deck,
+    DeckTagLink,
+    HiddenCard,
+    QuizResponse,
+    QuizSession,
+    ReviewLog,
+    SRSReview,
+    User,
+    UserDailyActivity,
+    UserDeckProgress,
+)
+from . import forks as fork_service
+from .invalidation import deck_key, invalidate_after_commit, user_key
+
+
+def _default_session_factory() -> Session:
+    from ..db.session import SessionLocal
+
+    return SessionLocal()
+
+
+session_factory: Callable[[], Session] = _default_session_factory
+
+
+def _delete_chunked(db: Session, model: Any, *criteria: Any, chunk_size: int) -> int:
+    """Delete the rows of ``model`` matching ``criteria`` by primary key, ``chunk_size`` at a time."""
+    removed = 0
+    while True:
+        chunk = select(model.id).where(*criteria).limit(chunk_size)
+        count = db.exec(delete(model).where(model.id.in_(chunk))).rowcount
+        db.commit()
+        removed += count
+        if count < chunk_size:
+            return removed
+
+
+def mark_deck_deleted(db: Session, deck: Deck) -> None:
+    """Hide a deck from every read; its rows are removed by :func:`purge_deck`."""
+    deck.deleted_at = datetime.now(tz=timezone.utc)
+    db.add(deck)
+    invalidate_after_commit(db, deck_key(deck.id), *([user_key(deck.owner_user_id)] if deck.owner_user_id else []))
+    db.commit()
+
+
+def deck_card_count(db: Session, deck_id: int) -> int:
+    return db.exec(select(func.count(Card.id)).where(Card.deck_id == deck_id)).scalar_one()
+
+
+def purge_deck(db: Session, deck_id: int, chunk_size: int | None = None) -> None:
+    """Delete a deck and everything that belongs to it, children first, committing every chunk."""
+    chunk_size = chunk_size or settings.PURGE_CHUNK_SIZE
+    # Forks still reading this deck's cards get copies of them first
+    fork_service.detach_forks(db, deck_id)
+    deck_sessions = select(QuizSession.id).where(QuizSession.deck_id == deck_id)
+    deck_cards = select(Card.id).where(Card.deck_id == deck_id)
+
+    responses = _delete_chunked(db, QuizResponse, QuizResponse.session_id.in_(deck_sessions), chunk_size=chunk_size)
+    responses += _delete_chunked(db, QuizResponse, QuizResponse.card_id.in_(deck_cards), chunk_size=chunk_size)
+    reviews = _delete_chunked(db, SRSReview, SRSReview.card_id.in_(deck_cards), chunk_size=chunk_size)
+    sessions = _delete_chunked(db, QuizSession, QuizSession.deck_id == deck_id, chunk_size=chunk_size)
+    cards = _delete_chunked(db, Card, Card.deck_id == deck_id, chunk_size=chunk_size)
+
+    # One row per user or tag at most: small enough for single statements
+    for model in (UserDeckProgress, DailyReviewQueue, CardTombstone, DeckTagLink, HiddenCard):
+        db.exec(delete(model).where(model.deck_id == deck_id))
+    db.exec(delete(Deck).where(Deck.id == deck_id))
+    db.commit()
+    logger.info(
+        f"Purged deck {deck_id}: {cards} cards, {sessions} sessions, {responses} responses, {reviews} reviews"
+    )
+
+
+def purge_deck_in_background(deck_id: int) -> None:
+    """Background-task entry point: purge a deck in a session of its own."""
+    with session_factory() as db:
+        purge_deck(db, deck_id)
+
+
+def purge_deleted_decks(db: Session) -> int:
+    """Finish purging every deck marked deleted; returns how many were purged."""
+    deck_ids = list(db.exec(select(Deck.id).where(Deck.deleted_at.is_not(None))).scalars())
+    for deck_id in deck_ids:
+        purge_deck(db, deck_id)
+    return len(deck_ids)
+
+
+def delete_account(db: Session, user: User, chunk_size: int | None = None) -> None:
+    """Delete a user and all of their study data. Decks they own are kept, without an owner."""
+    chunk_size = chunk_size or settings.PURGE_CHUNK_SIZE
+    user_id = user.id
+    owned_deck_ids = list(db.exec(select(Deck.id).where(Deck.owner_user_id == user_id)).scalars())
+    db.expunge(user)
+
+    user_sessions = select(QuizSession.id).where(QuizSession.user_id == user_id)
+    _delete_chunked(db, QuizResponse, QuizResponse.session_id.in_(user_sessions), chunk_size=chunk_size)
+    _delete_chunked(db, QuizSession, QuizSession.user_id == user_id, chunk_size=chunk_size)
+    _delete_chunked(db, SRSReview, SRSReview.user_id == user_id, chunk_size=chunk_size)
+    _delete_chunked(db, ReviewLog, ReviewLog.user_id == user_id, chunk_size=chunk_size)
+
+    for model in (UserDeckProgress, UserDailyActivity, DailyReviewQueue):
+        db.exec(delete(model).where(model.user_id == user_id))
+    db.exec(update(Deck).where(Deck.owner_user_id == user_id).values(owner_user_id=None))
+    db.exec(delete(User).where(User.id == user_id))
+    invalidate_after_commit(db, user_key(user_id), *(deck_key(deck_id) for deck_id in owned_deck_ids))
+    db.commit()
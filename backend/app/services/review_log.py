@@ -0,0 +1,83 @@
+"""
+Append-only review log.
+
+:func:`apply_review` wraps ``scheduler.review``. It captures the card's state before and
+after the update and returns it as a ``review_logs`` row, which :func:`append` then
+inserts in the caller's transaction. A log row therefore commits or rolls back together
+with the ``srs_reviews`` update it describes.
+
+On Postgres the table can be range-partitioned by month. Pass
+``-x partition_review_logs=true`` to ``alembic upgrade`` when migration 0006 runs, then
+run ``scripts/create_review_log_partitions.py`` monthly to create upcoming partitions.
+"""
+from datetime import date, datetime
+from typing import Any
+
+from sqlalchemy import insert, text
+from sqlalchemy.engine import Connection
+from sqlmodel import Session
+
+from ..models import ReviewLog, SRSReview
+from .scheduler import FSRS, SM2, Scheduler, elapsed_days
+
+SCHEDULER_CODES = {SM2: 0, FSRS: 1}
+
+
+def apply_review(review: SRSReview, scheduler: Scheduler, quality: int, now: datetime) -> dict[str, Any]:
+    """Apply ``scheduler.review`` to ``review`` and return the log row describing it."""
+    row: dict[str, Any] = {
+        "user_id": review.user_id,
+        "card_id": review.card_id,
+        "reviewed_at": now,
+        "quality": quality,
+        "scheduler": SCHEDULER_CODES[scheduler.name],
+        "elapsed_days": elapsed_days(review, now),
+        "repetitions_before": review.repetitions,
+        "interval_days_before": review.interval_days,
+        "easiness_before": review.easiness,
+        "stability_before": review.stability,
+        "difficulty_before": review.difficulty,
+    }
+    scheduler.review(review, quality, now)
+    row.update(
+        repetitions=review.repetitions,
+        interval_days=review.interval_days,
+        easiness=review.easiness,
+        stability=review.stability,
+        difficulty=review.difficulty,
+    )
+    return row
+
+
+def append(db: Session, rows: list[dict[str, Any]]) -> None:
+    """Insert log rows with one multi-row INSERT in the current transaction."""
+    if rows:
+        db.exec(insert(ReviewLog), params=rows)
+
+
+def _month_start(day: date, offset: int = 0) -> date:
+    month = day.month - 1 + offset
+    return date(day.year + month // 12, month % 12 + 1, 1)
+
+
+def create_partitions(connection: Connection, start: date, months: int) -> list[str]:
+    """
+    Create monthly ``review_logs`` partitions from the month of ``start`` onwards.
+
+    Existing partitions are left alone. Requires the partitioned layout (Postgres only).
+
+    Returns:
+        Names of the partitions covered
+    """
+    names = []
+    for offset in range(months):
+        lower, upper = _month_start(start, offset), _month_start(start, offset + 1)
+        name = f"review_logs_{lower:%Y_%m}"
+        connection.execute(
+            text(
+                f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF review_logs "
+                f"FOR VALUES FROM ('{lower.isoformat()}') TO ('{upper.isoformat()}')"
+            )
+        )
+        names.append(name)
+    return names
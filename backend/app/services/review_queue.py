@@ -0,0 +1,164 @@
+"""
+Materialized daily review queues.
+
+The first read of a user's queue for a deck on a UTC day builds it with two indexed
+queries. The first finds the user's reviews in the deck due by the end of the day, via
+``ix_srs_reviews_user_due_at``. The second finds the deck's cards the user has never
+reviewed, via the ``uq_review_user_card`` anti-join. Both are capped by the
+``QUEUE_*_PER_DAY`` limits. The queue is stored as a card id array in
+``daily_review_queues``. Every later read that day pages through the array from the
+stored cursor, and checks only the returned page against ``srs_reviews`` and ``cards``.
+"""
+from datetime import date, datetime, time, timedelta, timezone
+
+from sqlalchemy import and_, or_, select, update
+from sqlmodel import Session
+
+from ..core.config import settings
+from ..db.upsert import dialect_insert
+from ..models import Card, DailyReviewQueue, SRSReview, UserDeckProgress
+from ..schemas.study import ReviewQueuePage
+from . import forks as fork_service
+
+
+def as_aware(moment: datetime) -> datetime:
+    """Attach UTC to a naive datetime, as SQLite returns them."""
+    return moment if moment.tzinfo else moment.replace(tzinfo=timezone.utc)
+
+
+def _queue_card_ids(db: Session, user_id: int, deck_id: int, day: date) -> tuple[list[int], list[int]]:
+    """Return ``(review_ids, new_ids)`` for the day: most overdue reviews first, then new cards by id."""
+    day_end = datetime.combine(day + timedelta(days=1), time.min, tzinfo=timezone.utc)
+    due_rows = db.exec(
+        select(SRSReview.card_id, SRSReview.due_at, SRSReview.interval_days)
+        .join(Card, Card.id == SRSReview.card_id)
+        .where(SRSReview.user_id == user_id, SRSReview.due_at < day_end, fork_service.deck_cards(db, deck_id))
+    ).all()
+
+    def overdueness(row) -> tuple[float, datetime, int]:
+        card_id, due_at, interval_days = row
+        due_at = as_aware(due_at)
+        # Days overdue relative to the interval: a 1-day card 3 days late beats a 30-day card 5 days late
+        return (-(day_end - due_at).total_seconds() / 86400 / max(interval_days, 1), due_at, card_id)
+
+    review_ids = [row[0] for row in sorted(due_rows, key=overdueness)[: settings.QUEUE_REVIEWS_PER_DAY]]
+
+    reviewed = select(SRSReview.id).where(SRSReview.user_id == user_id, SRSReview.card_id == Card.id).exists()
+    new_ids = list(
+        db.exec(
+            select(Card.id)
+            .where(fork_service.deck_cards(db, deck_id), ~reviewed)
+            .order_by(Card.id)
+            .limit(settings.QUEUE_NEW_CARDS_PER_DAY)
+        ).scalars()
+    )
+    return review_ids, new_ids
+
+
+def build_queue(db: Session, user_id: int, deck_id: int, day: date) -> DailyReviewQueue:
+    """(Re)build and store the queue for ``day``, resetting its cursor. The caller commits."""
+    review_ids, new_ids = _queue_card_ids(db, user_id, deck_id, day)
+    values = {
+        "queue_date": day,
+        "card_ids": review_ids + new_ids,
+        "position": 0,
+        "review_count": len(review_ids),
+        "new_count": len(new_ids),
+        "built_at": datetime.now(tz=timezone.utc),
+    }
+    table = DailyReviewQueue.__table__
+    stmt = dialect_insert(db, table).values(user_id=user_id, deck_id=deck_id, **values)
+    db.exec(stmt.on_conflict_do_update(index_elements=[table.c.user_id, table.c.deck_id], set_=values))
+    return db.get(DailyReviewQueue, (user_id, deck_id), populate_existing=True)
+
+
+def get_queue(db: Session, user_id: int, deck_id: int, day: date) -> DailyReviewQueue:
+    """Today's stored queue, building it on the first read of the day."""
+    queue = db.get(DailyReviewQueue, (user_id, deck_id))
+    if queue is not None and queue.queue_date == day:
+        return queue
+    queue = build_queue(db, user_id, deck_id, day)
+    db.commit()
+    return queue
+
+
+def read_queue_cards(
+    db: Session, user_id: int, deck_id: int, cursor: int | None, limit: int
+) -> tuple[ReviewQueuePage, list[tuple[Card, SRSReview | None]]]:
+    """
+    Return up to ``limit`` queued cards from ``cursor`` (default: the stored cursor).
+
+    Passing ``cursor`` marks every entry before it as consumed, so a later read without
+    one resumes there. Cards answered since the queue was built, or removed from the
+    deck, are left out of the page but still count towards ``next_cursor``. The page's
+    cards and their review state come from one joined query.
+
+    Returns:
+        Tuple of (page, [(card, review or None), ...] in queue order)
+    """
+    day = datetime.now(tz=timezone.utc).date()
+    queue = get_queue(db, user_id, deck_id, day)
+    total = len(queue.card_ids)
+
+    position = queue.position if cursor is None else min(max(cursor, 0), total)
+    if position != queue.position:
+        db.exec(
+            update(DailyReviewQueue)
+            .where(DailyReviewQueue.user_id == user_id, DailyReviewQueue.deck_id == deck_id)
+            .values(position=position)
+        )
+        db.commit()
+
+    page = queue.card_ids[position : position + limit]
+    rows: dict[int, tuple[Card, SRSReview | None]] = {}
+    if page:
+        for card, review in db.exec(
+            select(Card, SRSReview)
+            .outerjoin(SRSReview, and_(SRSReview.card_id == Card.id, SRSReview.user_id == user_id))
+            .where(
+                Card.id.in_(page),
+                fork_service.deck_cards(db, deck_id),
+                or_(SRSReview.last_reviewed_at.is_(None), SRSReview.last_reviewed_at < queue.built_at),
+            )
+        ).all():
+            rows[card.id] = (card, review)
+
+    end = position + len(page)
+    ordered = [rows[card_id] for card_id in page if card_id in rows]
+    return (
+        ReviewQueuePage(
+            deck_id=deck_id,
+            queue_date=day,
+            total=total,
+            review_count=queue.review_count,
+            new_count=queue.new_count,
+            cursor=position,
+            next_cursor=end if end < total else None,
+            card_ids=[card.id for card, _ in ordered],
+        ),
+        ordered,
+    )
+
+
+def read_queue(db: Session, user_id: int, deck_id: int, cursor: int | None, limit: int) -> ReviewQueuePage:
+    """Card ids of the next queue page; see :func:`read_queue_cards`."""
+    return read_queue_cards(db, user_id, deck_id, cursor, limit)[0]
+
+
+def build_daily_queues(db: Session, day: date, active_days: int = 30, batch_size: int = 500) -> int:
+    """
+    Prebuild ``day``'s queue for every deck a user studied in the last ``active_days``.
+
+    Returns:
+        Number of queues built
+    """
+    since = datetime.combine(day - timedelta(days=active_days), time.min, tzinfo=timezone.utc)
+    pairs = db.exec(
+        select(UserDeckProgress.user_id, UserDeckProgress.deck_id).where(UserDeckProgress.last_studied_at >= since)
+    ).all()
+    for index, (user_id, deck_id) in enumerate(pairs, start=1):
+        build_queue(db, user_id, deck_id, day)
+        if index % batch_size == 0:
+            db.commit()
+    db.commit()
+    return len(pairs)
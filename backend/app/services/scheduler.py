@@ -0,0 +1,162 @@
+"""
+Spaced-repetition schedulers.
+
+``record_answer`` asks :func:`get_scheduler` for the scheduler that applies to a user
+and deck, then calls ``review(review, quality, now)``. That call updates the
+``SRSReview`` row in place. Two schedulers are available:
+
+- ``sm2``: the original SM-2 algorithm with fixed constants. This is the default.
+- ``fsrs``: FSRS-4.5. It tracks each card's memory stability and difficulty, and
+  schedules the next review for when recall probability falls to the desired retention.
+  It uses the user's fitted weights (``users.fsrs_weights``, see
+  :mod:`app.services.fsrs_optimizer`) when present, and the published defaults otherwise.
+
+A deck's ``srs_scheduler`` overrides the user's choice for that deck.
+"""
+import math
+from datetime import datetime, timedelta, timezone
+from typing import Protocol, Sequence
+
+from ..core.config import settings
+from ..models import SRSReview, User
+
+SM2 = "sm2"
+FSRS = "fsrs"
+SCHEDULERS = (SM2, FSRS)
+
+# FSRS-4.5 default weights
+FSRS_DEFAULT_WEIGHTS: tuple[float, ...] = (
+    0.4872, 1.4003, 3.7145, 13.8206, 5.1618, 1.2298, 0.8975, 0.031, 1.6474,
+    0.1367, 1.0461, 2.1072, 0.0793, 0.3246, 1.587, 0.2272, 2.8755,
+)
+FSRS_DECAY = -0.5
+FSRS_FACTOR = 0.9 ** (1 / FSRS_DECAY) - 1  # 19/81: R(t = S) = 90%
+MIN_STABILITY = 0.01
+MAX_STABILITY = 36500.0
+
+
+class Scheduler(Protocol):
+    name: str
+
+    def review(self, review: SRSReview, quality: int, now: datetime) -> None:
+        """Apply an answer of ``quality`` (0-5) given at ``now`` to ``review``."""
+
+
+def quality_to_rating(quality: int) -> int:
+    """Map the 0-5 quality scale onto FSRS ratings: 1 again, 2 hard, 3 good, 4 easy."""
+    if quality < 3:
+        return 1
+    return quality - 1
+
+
+def elapsed_days(review: SRSReview, now: datetime) -> float:
+    """Days since ``review`` was last reviewed, or 0 for a card never reviewed."""
+    last = review.last_reviewed_at
+    if last is None:
+        return 0.0
+    if last.tzinfo is None:
+        last = last.replace(tzinfo=timezone.utc)
+    return max(0.0, (now - last).total_seconds() / 86400)
+
+
+class SM2Scheduler:
+    name = SM2
+
+    def review(self, review: SRSReview, quality: int, now: datetime) -> None:
+        if quality < 3:
+            review.repetitions = 0
+            review.interval_days = 1
+        else:
+            if review.repetitions == 0:
+                review.repetitions = 1
+                review.interval_days = 1
+            elif review.repetitions == 1:
+                review.repetitions = 2
+                review.interval_days = 6
+            else:
+                review.interval_days = max(1, round(review.interval_days * review.easiness))
+                review.repetitions += 1
+
+        review.easiness = max(
+            1.3,
+            review.easiness + (0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02)),
+        )
+        review.last_quality = quality
+        review.last_reviewed_at = now
+        review.due_at = now + timedelta(days=review.interval_days)
+
+
+class FSRSScheduler:
+    name = FSRS
+
+    def __init__(self, weights: Sequence[float] | None = None, desired_retention: float | None = None) -> None:
+        self.w = tuple(weights) if weights is not None else FSRS_DEFAULT_WEIGHTS
+        self.desired_retention = desired_retention or settings.FSRS_DESIRED_RETENTION
+
+    def initial_difficulty(self, rating: int) -> float:
+        return min(10.0, max(1.0, self.w[4] - (rating - 3) * self.w[5]))
+
+    def retrievability(self, elapsed_days: float, stability: float) -> float:
+        return (1 + FSRS_FACTOR * elapsed_days / stability) ** FSRS_DECAY
+
+    def next_interval(self, stability: float) -> int:
+        interval = stability / FSRS_FACTOR * (self.desired_retention ** (1 / FSRS_DECAY) - 1)
+        return max(1, round(interval))
+
+    def next_state(self, stability: float, difficulty: float, elapsed_days: float, rating: int) -> tuple[float, float]:
+        """Return ``(stability, difficulty)`` after a review with ``rating``."""
+        w = self.w
+        r = self.retrievability(elapsed_days, stability)
+        if rating == 1:
+            new_stability = (
+                w[11] * difficulty ** -w[12] * ((stability + 1) ** w[13] - 1) * math.exp(w[14] * (1 - r))
+            )
+        else:
+            hard_penalty = w[15] if rating == 2 else 1.0
+            easy_bonus = w[16] if rating == 4 else 1.0
+            new_stability = stability * (
+                math.exp(w[8]) * (11 - difficulty) * stability ** -w[9] * (math.exp(w[10] * (1 - r)) - 1)
+                * hard_penalty * easy_bonus + 1
+            )
+        new_difficulty = w[7] * self.initial_difficulty(3) + (1 - w[7]) * (difficulty - w[6] * (rating - 3))
+        return (
+            min(MAX_STABILITY, max(MIN_STABILITY, new_stability)),
+            min(10.0, max(1.0, new_difficulty)),
+        )
+
+    def review(self, review: SRSReview, quality: int, now: datetime) -> None:
+        rating = quality_to_rating(quality)
+        if review.stability is None or review.difficulty is None:
+            if review.last_reviewed_at is None:
+                # New card: its first rating picks the initial state
+                stability = self.w[rating - 1]
+                difficulty = self.initial_difficulty(rating)
+                review.stability, review.difficulty = stability, difficulty
+            else:
+                # Card scheduled by SM-2 so far, lapsed or not: seed stability from its current interval
+                stability = float(max(review.interval_days, 1))
+                difficulty = self.initial_difficulty(3)
+                review.stability, review.difficulty = self.next_state(
+                    stability, difficulty, elapsed_days(review, now), rating
+                )
+        else:
+            review.stability, review.difficulty = self.next_state(
+                review.stability, review.difficulty, elapsed_days(review, now), rating
+            )
+
+        review.repetitions = 0 if rating == 1 else review.repetitions + 1
+        review.interval_days = 1 if rating == 1 else self.next_interval(review.stability)
+        review.last_quality = quality
+        review.last_reviewed_at = now
+        review.due_at = now + timedelta(days=review.interval_days)
+
+
+sm2_scheduler = SM2Scheduler()
+
+
+def get_scheduler(user: User, deck_scheduler: str | None = None) -> Scheduler:
+    """Scheduler for ``user``'s reviews in a deck whose ``srs_scheduler`` is ``deck_scheduler``."""
+    name = deck_scheduler or user.srs_scheduler or SM2
+    if name == FSRS:
+        return FSRSScheduler(user.fsrs_weights)
+    return sm2_scheduler
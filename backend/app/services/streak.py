@@ -6,12 +6,69 @@ If a user misses a day, the streak resets to 1 (not 0, since they're starting fr
 """
 from datetime import date, datetime, timedelta, timezone
 
+from sqlalchemy import func, select, text
 from sqlmodel import Session
 
 from ..models import User
+from ..models.enums import QuizStatus
+
+# Gaps-and-islands over each user's distinct study days: consecutive days share the same
+# ``day - row_number()`` key, so each island is one streak. The current streak is the
+# island ending on the user's last study day. Days are bucketed in UTC like
+# ``update_user_streak``, using the time the session was finished.
+_POSTGRES_STREAK_SQL = """
+WITH days AS (
+    SELECT DISTINCT user_id, CAST(COALESCE(ended_at, started_at) AT TIME ZONE 'UTC' AS DATE) AS day
+    FROM quiz_sessions
+    WHERE status = :status AND user_id BETWEEN :lo AND :hi
+), islands AS (
+    SELECT user_id, day, day - CAST(ROW_NUMBER() OVER (PARTITION BY user_id ORDER BY day) AS INTEGER) AS grp
+    FROM days
+), runs AS (
+    SELECT user_id, COUNT(*) AS length, MAX(day) AS run_end
+    FROM islands
+    GROUP BY user_id, grp
+), per_user AS (
+    SELECT user_id, MAX(length) AS longest, MAX(run_end) AS last_day
+    FROM runs
+    GROUP BY user_id
+)
+UPDATE users
+SET current_streak = runs.length, longest_streak = per_user.longest, last_activity_date = per_user.last_day
+FROM per_user JOIN runs ON runs.user_id = per_user.user_id AND runs.run_end = per_user.last_day
+WHERE users.id = per_user.user_id
+"""
+
+_SQLITE_STREAK_SQL = """
+WITH days AS (
+    SELECT DISTINCT user_id, date(COALESCE(ended_at, started_at)) AS day
+    FROM quiz_sessions
+    WHERE status = :status AND user_id BETWEEN :lo AND :hi
+), islands AS (
+    SELECT user_id, day, julianday(day) - ROW_NUMBER() OVER (PARTITION BY user_id ORDER BY day) AS grp
+    FROM days
+), runs AS (
+    SELECT user_id, COUNT(*) AS length, MAX(day) AS run_end
+    FROM islands
+    GROUP BY user_id, grp
+), per_user AS (
+    SELECT user_id, MAX(length) AS longest, MAX(run_end) AS last_day
+    FROM runs
+    GROUP BY user_id
+)
+UPDATE users
+SET current_streak = runs.length, longest_streak = per_user.longest, last_activity_date = per_user.last_day
+FROM per_user JOIN runs ON runs.user_id = per_user.user_id AND runs.run_end = per_user.last_day
+WHERE users.id = per_user.user_id
+"""
+
+_RESET_STREAK_SQL = """
+UPDATE users SET current_streak = 0, longest_streak = 0, last_activity_date = NULL
+WHERE id BETWEEN :lo AND :hi
+"""
 
 
-def update_user_streak(db: Session, user: User) -> User:
+def update_user_streak(db: Session, user: User, today: date | None = None) -> User:
     """
     Update user's streak based on their activity.
 
@@ -24,19 +81,22 @@ def update_user_streak(db: Session, user: User) -> User:
     Args:
         db: Database session
         user: User object to update
+        today: Day the activity happened on (defaults to the current UTC day); the
+            write-behind pipeline passes the day the session was finished
 
     Returns:
         Updated user object
     """
-    today = datetime.now(tz=timezone.utc).date()
+    if today is None:
+        today = datetime.now(tz=timezone.utc).date()
 
     # If this is the first activity ever
     if user.last_activity_date is None:
         user.current_streak = 1
         user.longest_streak = 1
         user.last_activity_date = today
-    # If already studied today, don't change anything
-    elif user.last_activity_date == today:
+    # If already studied today (or a later day was already applied), don't change anything
+    elif user.last_activity_date >= today:
         pass  # No update needed
     # If studied yesterday, increment streak
     elif user.last_activity_date == today - timedelta(days=1):
@@ -77,3 +137,35 @@ def get_streak_stats(user: User) -> dict:
         "last_activity_date": user.last_activity_date,
         "is_active": is_active,
     }
+
+
+def recompute_all_streaks(db: Session, chunk_size: int = 10_000) -> int:
+    """
+    Recompute ``current_streak``, ``longest_streak`` and ``last_activity_date`` for every
+    user from their completed quiz sessions.
+
+    Users are processed in contiguous id ranges of ``chunk_size``, each range in its own
+    transaction, so the job makes a single pass over ``users`` and ``quiz_sessions``
+    without holding long locks. Users with no completed sessions are reset.
+
+    Args:
+        db: Database session
+        chunk_size: Number of user ids covered by each set-based UPDATE
+
+    Returns:
+        Number of id ranges processed
+    """
+    streak_sql = _POSTGRES_STREAK_SQL if db.get_bind().dialect.name == "postgresql" else _SQLITE_STREAK_SQL
+
+    lowest, highest = db.exec(select(func.min(User.id), func.max(User.id))).one()
+    if lowest is None:
+        return 0
+
+    chunks = 0
+    for lo in range(lowest, highest + 1, chunk_size):
+        params = {"lo": lo, "hi": lo + chunk_size - 1, "status": QuizStatus.COMPLETED.value}
+        db.exec(text(_RESET_STREAK_SQL), params=params)
+        db.exec(text(streak_sql), params=params)
+        db.commit()
+        chunks += 1
+    return chunks
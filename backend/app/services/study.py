@@ -1,15 +1,44 @@
-from datetime import datetime, timedelta, timezone
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
 from typing import Iterable, List, Tuple, Optional, Dict, Any
-import json
 
 from fastapi import HTTPException, status
-from sqlalchemy import func, select
+from loguru import logger
+from sqlalchemy import case, func, insert, select, update
+from sqlalchemy.exc import IntegrityError
 from sqlmodel import Session
 
-from ..models import Card, QuizResponse, QuizSession, SRSReview, User, UserDeckProgress
-from ..models.enums import CardType, QuizMode, QuizStatus
-from ..schemas.study import DueReviewCard, StudyAnswerCreate, StudySessionCreate
-from . import streak as streak_service
+from ..db.session import primary_reads
+from ..models import Card, Deck, QuizResponse, QuizSession, SRSReview, User
+from ..models.enums import QuizMode, QuizStatus
+from ..schemas.card import CardRead
+from ..schemas.study import (
+    CardReviewState,
+    DueReviewCard,
+    ForecastDay,
+    OfflineReview,
+    ReviewSyncResponse,
+    ReviewSyncResult,
+    SessionCard,
+    StudyAnswerCreate,
+    StudySessionBootstrap,
+    StudySessionCreate,
+    StudySessionRead,
+    SyncedReviewState,
+)
+from . import activity as activity_service
+from . import answer_matching
+from . import forks as fork_service
+from . import review_log
+from . import review_queue
+from . import scheduler as scheduler_service
+from .cache import cache
+from .grading import answer_grader
+from .group_commit import GroupCommitBuffer
+from .invalidation import invalidate_after_commit, user_key
+from .write_behind import write_behind
+
+MAX_FORECAST_DAYS = 365
 
 
 def create_session(db: Session, user: User, payload: StudySessionCreate) -> QuizSession:
@@ -26,6 +55,26 @@ def create_session(db: Session, user: User, payload: StudySessionCreate) -> Quiz
     return session
 
 
+def bootstrap_session(db: Session, user: User, payload: StudySessionCreate, limit: int) -> StudySessionBootstrap:
+    """
+    Create a session and return the first ``limit`` cards of today's review queue for
+    its deck (see :mod:`app.services.review_queue`) with the user's review state.
+    """
+    session = create_session(db, user, payload)
+    queue, rows = review_queue.read_queue_cards(db, user.id, session.deck_id, None, limit)
+    return StudySessionBootstrap(
+        session=StudySessionRead.model_validate(session),
+        cards=[
+            SessionCard(
+                card=CardRead.model_validate(card),
+                review=CardReviewState.model_validate(review) if review is not None else None,
+            )
+            for card, review in rows
+        ],
+        queue=queue,
+    )
+
+
 def get_session_or_404(db: Session, session_id: int, user: User) -> QuizSession:
     session = db.get(QuizSession, session_id)
     if not session or session.user_id != user.id:
@@ -35,18 +84,25 @@ def get_session_or_404(db: Session, session_id: int, user: User) -> QuizSession:
 
 def get_session_cards(db: Session, session: QuizSession) -> list[Card]:
     """Get all cards for a study session based on the session's deck."""
-    result = db.exec(select(Card).where(Card.deck_id == session.deck_id))
+    result = db.exec(select(Card).where(fork_service.deck_cards(db, session.deck_id)))
     return list(result.scalars().all())
 
 
 def finish_session(db: Session, session: QuizSession, user: User) -> QuizSession:
+    newly_completed = session.status != QuizStatus.COMPLETED
     session.status = QuizStatus.COMPLETED
     session.ended_at = datetime.now(tz=timezone.utc)
     db.add(session)
 
-    # Update user's streak when they complete a session
-    streak_service.update_user_streak(db, user)
+    # Sessions count towards the day they were started on, matching the historical grouping
+    if newly_completed:
+        activity_date = (session.started_at or session.ended_at).date()
+        activity_service.record_activity(db, user.id, activity_date, sessions_completed=1)
 
+    # Update user's streak when they complete a session (deferred while the write-behind worker runs)
+    write_behind.queue_streak(db, user, session.ended_at.date())
+
+    invalidate_after_commit(db, user_key(user.id))
     db.commit()
     db.refresh(session)
     return session
@@ -64,37 +120,14 @@ def _get_review_state(db: Session, user: User, card: Card) -> SRSReview:
     return review
 
 
-def _apply_sm2(review: SRSReview, quality: int) -> None:
+def _validate_quality(quality: int) -> None:
     if quality < 0 or quality > 5:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Quality must be between 0 and 5")
 
-    if quality < 3:
-        review.repetitions = 0
-        review.interval_days = 1
-    else:
-        if review.repetitions == 0:
-            review.repetitions = 1
-            review.interval_days = 1
-        elif review.repetitions == 1:
-            review.repetitions = 2
-            review.interval_days = 6
-        else:
-            review.interval_days = max(1, round(review.interval_days * review.easiness))
-            review.repetitions += 1
-
-    review.easiness = max(
-        1.3,
-        review.easiness + (0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02)),
-    )
-    review.last_quality = quality
-    review.due_at = datetime.now(tz=timezone.utc) + timedelta(days=review.interval_days)
-
 
-def _normalize_answer(text: str | None) -> str:
-    """Normalize answer text for comparison (lowercase, strip whitespace)."""
-    if not text:
-        return ""
-    return text.strip().lower()
+def _apply_sm2(review: SRSReview, quality: int) -> None:
+    _validate_quality(quality)
+    scheduler_service.sm2_scheduler.review(review, quality, datetime.now(tz=timezone.utc))
 
 
 def _check_cloze_answer(card: Card, user_answer: str | None) -> bool:
@@ -103,100 +136,34 @@ def _check_cloze_answer(card: Card, user_answer: str | None) -> bool:
     Expected format for user_answer: JSON string with array of answers
     Expected format for cloze_data: {"blanks": [{"answer": "Paris"}, {"answer": ["Art", "Fashion"]}]}
     """
-    if not user_answer or not card.cloze_data:
-        return False
-
-    try:
-        # Parse user answers
-        user_answers = json.loads(user_answer) if isinstance(user_answer, str) else user_answer
-        if not isinstance(user_answers, list):
-            return False
-
-        # Get expected answers from cloze_data
-        blanks = card.cloze_data.get("blanks", [])
-        if len(user_answers) != len(blanks):
-            return False
-
-        # Check each blank
-        for i, blank in enumerate(blanks):
-            user_ans = _normalize_answer(user_answers[i])
-
-            # Get acceptable answers for this blank
-            if "answer" in blank:
-                acceptable = blank["answer"]
-                # Support both single answer and multiple acceptable answers
-                if isinstance(acceptable, list):
-                    acceptable_answers = [_normalize_answer(ans) for ans in acceptable]
-                else:
-                    acceptable_answers = [_normalize_answer(acceptable)]
-
-                if user_ans not in acceptable_answers:
-                    return False
-            else:
-                return False
-
-        return True
-    except (json.JSONDecodeError, KeyError, IndexError):
+    if not user_answer:
         return False
+    return answer_matching.compiled_cards.get(card).matches_blanks(user_answer)
 
 
 def _check_answer_correctness(card: Card, user_answer: str | None) -> bool:
-    """Check if user answer is correct for the given card type."""
+    """Check a typed answer against the card's answer and the aliases in its options."""
     if not user_answer:
         return False
-
-    normalized_user_answer = _normalize_answer(user_answer)
-
-    if card.type == CardType.MULTIPLE_CHOICE:
-        return user_answer == card.answer
-
-    elif card.type == CardType.SHORT_ANSWER:
-        # For SHORT_ANSWER, support multiple valid answers stored in options
-        # If options is None or empty, fall back to exact match with card.answer
-        if card.options:
-            # options can be a list of acceptable answers
-            valid_answers = card.options if isinstance(card.options, list) else [card.answer]
-            return normalized_user_answer in [_normalize_answer(ans) for ans in valid_answers]
-        else:
-            return normalized_user_answer == _normalize_answer(card.answer)
-
-    elif card.type == CardType.CLOZE:
-        return _check_cloze_answer(card, user_answer)
-
-    return False
+    compiled = answer_matching.compiled_cards.get(card)
+    if compiled.blanks is not None:
+        return compiled.matches_blanks(user_answer)
+    return compiled.matches(user_answer)
 
 
 async def _check_answer_with_llm(card: Card, user_answer: str | None, user: User) -> Optional[Dict[str, Any]]:
     """
-    Use LLM to check answer for SHORT_ANSWER and CLOZE type cards.
+    Grade a typed answer with the configured grading backend.
 
     Returns:
-        Dict with 'is_correct' and 'feedback' keys, or None if LLM unavailable
+        Dict with 'is_correct' and 'feedback' keys, or None if grading is disabled or unavailable
     """
-    from loguru import logger
-
-    logger.info(f"_check_answer_with_llm called for card type: {card.type}")
-
     if not user_answer:
-        logger.warning("No user answer provided")
         return None
-
-    # Prepare the question and expected answer based on card type
-    question = card.prompt
-    expected_answer = card.answer
-
-    # For cloze cards, we need to extract the expected answers from cloze_data
-    if card.type == CardType.CLOZE and card.cloze_data:
-        blanks = card.cloze_data.get("blanks", [])
-        expected_answers = [blank.get("answer") for blank in blanks if blank.get("answer")]
-        if expected_answers:
-            expected_answer = ", ".join(str(ans) for ans in expected_answers)
-
-    logger.info(f"AI answer checking disabled in basic version")
-
-    # Simplified: No AI answer checking in basic version
-    # AI features removed - students can add this back later
-    return None  # Fallback to exact matching
+    grade = await answer_grader.grade(card, user_answer)
+    if grade is None:
+        return None
+    return {"is_correct": grade.is_correct, "feedback": grade.feedback}
 
 
 async def record_answer(
@@ -212,75 +179,321 @@ async def record_answer(
     Returns:
         Tuple of (QuizResponse, llm_feedback)
     """
-    from loguru import logger
-
     is_correct: bool | None = None
     quality = answer_in.quality
     llm_feedback: Optional[str] = None
 
     logger.info(f"record_answer: session mode={session.mode}, card type={card.type}")
 
-    # For REVIEW mode with BASIC cards, we don't auto-grade - user provides quality rating
-    # Auto-grading is only for other modes/card types (not applicable in simplified version)
-    logger.info(f"Using manual quality rating for {session.mode} mode")
-
-    response = QuizResponse(
-        session_id=session.id,
-        card_id=card.id,
-        user_answer=answer_in.user_answer,
-        quality=quality,
-        is_correct=is_correct,
+    # The user's quality rating drives scheduling. Typed answers are also graded when a
+    # grading backend is enabled, falling back to exact matching if it is unavailable.
+    if answer_in.user_answer and answer_grader.running:
+        graded = await _check_answer_with_llm(card, answer_in.user_answer, user)
+        if graded is not None:
+            is_correct, llm_feedback = graded["is_correct"], graded["feedback"]
+        else:
+            is_correct = _check_answer_correctness(card, answer_in.user_answer)
+
+    update_srs = session.mode == QuizMode.REVIEW and quality is not None
+    scheduler: scheduler_service.Scheduler = scheduler_service.sm2_scheduler
+    if update_srs:
+        _validate_quality(quality)
+        deck_scheduler = db.exec(select(Deck.srs_scheduler).where(Deck.id == session.deck_id)).scalar_one_or_none()
+        scheduler = scheduler_service.get_scheduler(user, deck_scheduler)
+
+    if answer_buffer.running:
+        # Group commit: the response, counters and SRS state are written with other
+        # concurrent answers in one transaction; we resume once that batch is durable.
+        response = await answer_buffer.submit(
+            _AnswerWrite(
+                session_id=session.id,
+                user_id=user.id,
+                card_id=card.id,
+                user_answer=answer_in.user_answer,
+                quality=quality,
+                is_correct=is_correct,
+                update_srs=update_srs,
+                responded_at=datetime.now(tz=timezone.utc),
+                scheduler=scheduler,
+            )
+        )
+    else:
+        response = QuizResponse(
+            session_id=session.id,
+            card_id=card.id,
+            user_answer=answer_in.user_answer,
+            quality=quality,
+            is_correct=is_correct,
+        )
+        db.add(response)
+        _increment_session_counters(db, session, is_correct)
+
+        if update_srs:
+            review = _get_review_state(db, user, card)
+            review_log.append(db, [review_log.apply_review(review, scheduler, quality, datetime.now(tz=timezone.utc))])
+
+    # Progress and the activity rollup are not needed to acknowledge the answer
+    write_behind.queue_progress(db, user.id, session.deck_id)
+    write_behind.queue_activity(
+        db,
+        user.id,
+        datetime.now(tz=timezone.utc).date(),
+        cards_reviewed=1,
+        lapses=1 if quality is not None and quality < 3 else 0,
     )
-    db.add(response)
-
-    if session.mode == QuizMode.REVIEW and quality is not None:
-        review = _get_review_state(db, user, card)
-        _apply_sm2(review, quality)
-
-    _update_progress(db, user, session.deck_id)
 
+    # Due reviews and activity read by this user are now stale
+    invalidate_after_commit(db, user_key(user.id))
     db.commit()
-    db.refresh(response)
+    if not answer_buffer.running:
+        db.refresh(response)
     return response, llm_feedback
 
 
-def _update_progress(db: Session, user: User, deck_id: int) -> None:
-    progress = db.exec(
-        select(UserDeckProgress).where(UserDeckProgress.user_id == user.id, UserDeckProgress.deck_id == deck_id)
-    ).scalar_one_or_none()
+@dataclass
+class _AnswerWrite:
+    session_id: int
+    user_id: int
+    card_id: int
+    user_answer: str | None
+    quality: int | None
+    is_correct: bool | None
+    update_srs: bool
+    responded_at: datetime
+    scheduler: scheduler_service.Scheduler = scheduler_service.sm2_scheduler
+
+
+def _write_answer_batch(db: Session, items: list[_AnswerWrite]) -> list[QuizResponse]:
+    """Persist a group-commit batch of answers: one multi-row INSERT plus grouped updates."""
+    responses = [
+        QuizResponse(
+            session_id=item.session_id,
+            card_id=item.card_id,
+            user_answer=item.user_answer,
+            quality=item.quality,
+            is_correct=item.is_correct,
+            responded_at=item.responded_at,
+        )
+        for item in items
+    ]
+    db.add_all(responses)
+    db.flush()
+
+    counters: dict[int, list[int]] = {}
+    for item in items:
+        totals = counters.setdefault(item.session_id, [0, 0, 0, 0])
+        totals[0] += 1
+        totals[1 if item.is_correct is True else 2 if item.is_correct is False else 3] += 1
+    for session_id, (total, correct, incorrect, unanswered) in counters.items():
+        _bump_session_counters(db, session_id, total, correct, incorrect, unanswered)
+
+    srs_items = [item for item in items if item.update_srs]
+    if srs_items:
+        reviews = {
+            (review.user_id, review.card_id): review
+            for review in db.exec(
+                select(SRSReview).where(
+                    SRSReview.user_id.in_({item.user_id for item in srs_items}),
+                    SRSReview.card_id.in_({item.card_id for item in srs_items}),
+                )
+            ).scalars()
+        }
+        log_rows = []
+        for item in srs_items:
+            review = reviews.get((item.user_id, item.card_id))
+            if review is None:
+                review = reviews[(item.user_id, item.card_id)] = SRSReview(user_id=item.user_id, card_id=item.card_id)
+                db.add(review)
+            log_rows.append(review_log.apply_review(review, item.scheduler, item.quality, item.responded_at))
+        review_log.append(db, log_rows)
+
+    return responses
+
+
+answer_buffer: GroupCommitBuffer[_AnswerWrite, QuizResponse] = GroupCommitBuffer("quiz_responses", _write_answer_batch)
+
+
+def sync_offline_reviews(db: Session, user: User, reviews: list[OfflineReview]) -> ReviewSyncResponse:
+    """
+    Apply a batch of answers recorded offline, in one transaction.
 
-    if not progress:
-        progress = UserDeckProgress(user_id=user.id, deck_id=deck_id, percent_complete=0.0)
-        db.add(progress)
+    Reviews are replayed in ``reviewed_at`` order with their real timestamps (clamped to
+    the server clock), so intervals are computed from when each review happened. Each
+    ``(session_id, client_review_id)`` is applied at most once. A review that is not
+    newer than the server's latest review of the card, which must then have come from
+    another device, is recorded as an answer but does not change the card's schedule.
 
-    total_cards = int(db.exec(select(func.count(Card.id)).where(Card.deck_id == deck_id)).scalar_one())
+    Returns:
+        Per-review outcomes and the resulting SRS state of every card in the batch
+    """
+    now = datetime.now(tz=timezone.utc)
+    session_ids = {item.session_id for item in reviews}
+    card_ids = {item.card_id for item in reviews}
 
-    reviewed_cards = int(
+    sessions = {
+        session.id: session
+        for session in db.exec(select(QuizSession).where(QuizSession.id.in_(session_ids))).scalars()
+    }
+    if any(session_id not in sessions or sessions[session_id].user_id != user.id for session_id in session_ids):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Session not found")
+    cards = {card.id: card for card in db.exec(select(Card).where(Card.id.in_(card_ids))).scalars()}
+    for item in reviews:
+        card = cards.get(item.card_id)
+        if card is None or not fork_service.deck_has_card(db, sessions[item.session_id].deck_id, card):
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Card not part of session deck")
+
+    deck_ids = {session.deck_id for session in sessions.values()}
+    schedulers = {
+        deck_id: scheduler_service.get_scheduler(user, deck_scheduler)
+        for deck_id, deck_scheduler in db.exec(select(Deck.id, Deck.srs_scheduler).where(Deck.id.in_(deck_ids))).all()
+    }
+    synced = set(
         db.exec(
-            select(func.count(QuizResponse.id))
-            .join(QuizSession, QuizSession.id == QuizResponse.session_id)
-            .where(
-                QuizSession.user_id == user.id,
-                QuizSession.deck_id == deck_id,
+            select(QuizResponse.session_id, QuizResponse.client_review_id).where(
+                QuizResponse.session_id.in_(session_ids),
+                QuizResponse.client_review_id.in_({item.client_review_id for item in reviews}),
             )
-        ).scalar_one()
+        ).all()
     )
+    states = {
+        review.card_id: review
+        for review in db.exec(
+            select(SRSReview).where(SRSReview.user_id == user.id, SRSReview.card_id.in_(card_ids))
+        ).scalars()
+    }
+    # The server's latest review of each card before this batch
+    server_last = {
+        card_id: review_queue.as_aware(review.last_reviewed_at)
+        for card_id, review in states.items()
+        if review.last_reviewed_at
+    }
 
-    if total_cards:
-        progress.percent_complete = min(100.0, (reviewed_cards / total_cards) * 100)
-    progress.last_studied_at = datetime.now(tz=timezone.utc)
-    progress.streak = max(progress.streak, 1)
-
-    db.add(progress)
+    results: list[ReviewSyncResult] = []
+    response_rows: list[dict] = []
+    log_rows: list[dict] = []
+    counters: dict[int, int] = {}
+    activity: dict[date, list[int]] = {}
+    for item in sorted(reviews, key=lambda item: (review_queue.as_aware(item.reviewed_at), item.client_review_id)):
+        key = (item.session_id, item.client_review_id)
+        if key in synced:
+            results.append(
+                ReviewSyncResult(client_review_id=item.client_review_id, card_id=item.card_id, status="duplicate")
+            )
+            continue
+        synced.add(key)
+
+        reviewed_at = min(review_queue.as_aware(item.reviewed_at), now)
+        response_rows.append({
+            "session_id": item.session_id,
+            "card_id": item.card_id,
+            "user_answer": item.user_answer,
+            "quality": item.quality,
+            "is_correct": None,
+            "client_review_id": item.client_review_id,
+            "responded_at": reviewed_at,
+        })
+        counters[item.session_id] = counters.get(item.session_id, 0) + 1
+        day_totals = activity.setdefault(reviewed_at.date(), [0, 0])
+        day_totals[0] += 1
+        day_totals[1] += int(item.quality < 3)
+
+        last = server_last.get(item.card_id)
+        if last is not None and reviewed_at <= last:
+            outcome = "conflict"
+        else:
+            review = states.get(item.card_id)
+            if review is None:
+                review = states[item.card_id] = SRSReview(user_id=user.id, card_id=item.card_id)
+                db.add(review)
+            scheduler = schedulers[sessions[item.session_id].deck_id]
+            log_rows.append(review_log.apply_review(review, scheduler, item.quality, reviewed_at))
+            base = review_queue.as_aware(item.base_reviewed_at) if item.base_reviewed_at else None
+            outcome = "merged" if last is not None and base is not None and last > base else "applied"
+        results.append(ReviewSyncResult(client_review_id=item.client_review_id, card_id=item.card_id, status=outcome))
+
+    if response_rows:
+        db.exec(insert(QuizResponse), params=response_rows)
+    for session_id, count in counters.items():
+        _bump_session_counters(db, session_id, count, unanswered=count)
+    review_log.append(db, log_rows)
+    for day, (reviewed, lapses) in activity.items():
+        write_behind.queue_activity(db, user.id, day, cards_reviewed=reviewed, lapses=lapses)
+    for deck_id in {sessions[session_id].deck_id for session_id in counters}:
+        write_behind.queue_progress(db, user.id, deck_id)
+
+    invalidate_after_commit(db, user_key(user.id))
+    try:
+        db.commit()
+    except IntegrityError:
+        # Another upload of the same reviews committed first
+        db.rollback()
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Reviews are already being synced")
+
+    return ReviewSyncResponse(
+        results=results,
+        states=[
+            SyncedReviewState(card_id=card_id, **CardReviewState.model_validate(review).model_dump())
+            for card_id, review in states.items()
+        ],
+    )
 
 
 def due_reviews(db: Session, user: User) -> List[DueReviewCard]:
-    rows = db.exec(
-        select(SRSReview, Card)
-        .join(Card, Card.id == SRSReview.card_id)
-        .where(SRSReview.user_id == user.id, SRSReview.due_at <= func.now())
-        .order_by(SRSReview.due_at)
-    ).all()
+    payload = cache.get_or_compute(
+        "due_reviews",
+        user.id,
+        lambda: [card.model_dump(mode="json") for card in _load_due_reviews(db, user)],
+        tags=[user_key(user.id)],
+    )
+    return [DueReviewCard.model_validate(item) for item in payload]
+
+
+def get_review_forecast(db: Session, user: User, days: int, deck_id: int | None = None) -> List[ForecastDay]:
+    """
+    Number of reviews falling due on each of the next ``days`` UTC days, today first.
+
+    Overdue reviews count towards today. Cached per user until their next answer.
+    """
+    today = datetime.now(tz=timezone.utc).date()
+    payload = cache.get_or_compute(
+        "forecast",
+        f"{user.id}:{deck_id}:{days}:{today}",
+        lambda: _load_review_forecast(db, user, today, days, deck_id),
+        tags=[user_key(user.id)],
+    )
+    return [ForecastDay(**item) for item in payload]
+
+
+def _load_review_forecast(db: Session, user: User, today: date, days: int, deck_id: int | None) -> List[dict]:
+    window_end = datetime.combine(today + timedelta(days=days), datetime.min.time(), tzinfo=timezone.utc)
+    due_day = func.date(SRSReview.due_at)
+    # Served by ix_srs_reviews_user_due_at: a range scan over the user's window only
+    stmt = (
+        select(due_day, func.count())
+        .where(SRSReview.user_id == user.id, SRSReview.due_at < window_end)
+        .group_by(due_day)
+    )
+    # Cached, so read from the primary rather than a possibly lagging replica
+    with primary_reads(db):
+        if deck_id is not None:
+            stmt = stmt.join(Card, Card.id == SRSReview.card_id).where(fork_service.deck_cards(db, deck_id))
+        rows = db.exec(stmt).all()
+
+    counts = [0] * days
+    for day, due in rows:
+        counts[max(0, (activity_service.as_date(day) - today).days)] += due
+    return [{"date": str(today + timedelta(days=i)), "due": due} for i, due in enumerate(counts)]
+
+
+def _load_due_reviews(db: Session, user: User) -> List[DueReviewCard]:
+    # Cached, so read from the primary rather than a possibly lagging replica
+    with primary_reads(db):
+        rows = db.exec(
+            select(SRSReview, Card)
+            .join(Card, Card.id == SRSReview.card_id)
+            .where(SRSReview.user_id == user.id, SRSReview.due_at <= func.now())
+            .order_by(SRSReview.due_at)
+        ).all()
 
     results: list[DueReviewCard] = []
     for review, card in rows:
@@ -297,72 +510,164 @@ def due_reviews(db: Session, user: User) -> List[DueReviewCard]:
     return results
 
 
+def _bump_session_counters(
+    db: Session,
+    session_id: int,
+    total: int,
+    correct: int = 0,
+    incorrect: int = 0,
+    unanswered: int = 0,
+) -> None:
+    """Add to a session's response counters with a single atomic UPDATE."""
+    db.exec(
+        update(QuizSession)
+        .where(QuizSession.id == session_id)
+        .values(
+            total_responses=QuizSession.total_responses + total,
+            correct_count=QuizSession.correct_count + correct,
+            incorrect_count=QuizSession.incorrect_count + incorrect,
+            unanswered_count=QuizSession.unanswered_count + unanswered,
+        )
+    )
+
+
+def _increment_session_counters(db: Session, session: QuizSession, is_correct: bool | None) -> None:
+    """Count one response against the session's counters."""
+    _bump_session_counters(
+        db,
+        session.id,
+        1,
+        correct=int(is_correct is True),
+        incorrect=int(is_correct is False),
+        unanswered=int(is_correct is None),
+    )
+
+
 def get_session_statistics(db: Session, session: QuizSession) -> dict:
     """
     Get statistics for a quiz session.
 
+    Reads the counters maintained by ``record_answer`` by primary key rather than
+    aggregating ``quiz_responses``.
+
     Returns:
         dict with total_responses, correct_count, incorrect_count, unanswered_count
     """
-    from sqlalchemy import func as sql_func, case
-
-    # Query counts directly from database to avoid SQLAlchemy mapper cache issues
     result = db.exec(
         select(
-            sql_func.count().label("total"),
-            sql_func.sum(case((QuizResponse.is_correct == True, 1), else_=0)).label("correct"),
-            sql_func.sum(case((QuizResponse.is_correct == False, 1), else_=0)).label("incorrect"),
-            sql_func.sum(case((QuizResponse.is_correct == None, 1), else_=0)).label("unanswered"),
-        ).where(QuizResponse.session_id == session.id)
-    ).first()
+            QuizSession.total_responses,
+            QuizSession.correct_count,
+            QuizSession.incorrect_count,
+            QuizSession.unanswered_count,
+        ).where(QuizSession.id == session.id)
+    ).one()
 
     return {
-        "total_responses": result.total or 0,
-        "correct_count": result.correct or 0,
-        "incorrect_count": result.incorrect or 0,
-        "unanswered_count": result.unanswered or 0,
+        "total_responses": result.total_responses,
+        "correct_count": result.correct_count,
+        "incorrect_count": result.incorrect_count,
+        "unanswered_count": result.unanswered_count,
     }
 
 
+def _aggregate_session_statistics(session_ids: Iterable[int] | None = None):
+    """Build the ``quiz_responses`` aggregate the session counters are checked against."""
+    stmt = select(
+        QuizResponse.session_id,
+        func.count().label("total"),
+        func.sum(case((QuizResponse.is_correct == True, 1), else_=0)).label("correct"),  # noqa: E712
+        func.sum(case((QuizResponse.is_correct == False, 1), else_=0)).label("incorrect"),  # noqa: E712
+        func.sum(case((QuizResponse.is_correct == None, 1), else_=0)).label("unanswered"),  # noqa: E711
+    ).group_by(QuizResponse.session_id)
+    if session_ids is not None:
+        stmt = stmt.where(QuizResponse.session_id.in_(list(session_ids)))
+    return stmt
+
+
+def reconcile_session_counters(
+    db: Session,
+    session_ids: Iterable[int] | None = None,
+    fix: bool = False,
+) -> list[dict]:
+    """
+    Compare the maintained session counters against the ``quiz_responses`` aggregate.
+
+    Returns one dict per drifted session with the stored and expected counters. With
+    ``fix=True`` the stored counters are overwritten with the aggregate and committed.
+    """
+    scoped_ids = list(session_ids) if session_ids is not None else None
+    aggregate = _aggregate_session_statistics(scoped_ids).subquery()
+
+    stmt = select(
+        QuizSession.id,
+        QuizSession.total_responses,
+        QuizSession.correct_count,
+        QuizSession.incorrect_count,
+        QuizSession.unanswered_count,
+        func.coalesce(aggregate.c.total, 0),
+        func.coalesce(aggregate.c.correct, 0),
+        func.coalesce(aggregate.c.incorrect, 0),
+        func.coalesce(aggregate.c.unanswered, 0),
+    ).outerjoin(aggregate, aggregate.c.session_id == QuizSession.id)
+    if scoped_ids is not None:
+        stmt = stmt.where(QuizSession.id.in_(scoped_ids))
+
+    drifted: list[dict] = []
+    for session_id, *values in db.exec(stmt).all():
+        stored, expected = tuple(values[:4]), tuple(int(v) for v in values[4:])
+        if stored != expected:
+            drifted.append({"session_id": session_id, "stored": stored, "expected": expected})
+
+    if fix and drifted:
+        for row in drifted:
+            total, correct, incorrect, unanswered = row["expected"]
+            db.exec(
+                update(QuizSession)
+                .where(QuizSession.id == row["session_id"])
+                .values(
+                    total_responses=total,
+                    correct_count=correct,
+                    incorrect_count=incorrect,
+                    unanswered_count=unanswered,
+                )
+            )
+        db.commit()
+
+    return drifted
+
+
 def get_activity_data(db: Session, user: User, days: int = 7) -> List[dict]:
     """
     Get quiz activity data for the past N days.
 
-    Returns a list of dicts with date and count of completed quiz sessions.
+    Reads the ``user_daily_activity`` rollup, so the cost is O(days) regardless of the
+    user's history. Returns a list of dicts with the date, the count of completed quiz
+    sessions, and the cards reviewed and lapses recorded that day.
     """
-    from sqlalchemy import cast, Date
-
-    # Calculate the start date (N days ago)
-    start_date = datetime.now(tz=timezone.utc) - timedelta(days=days - 1)
-    start_of_day = start_date.replace(hour=0, minute=0, second=0, microsecond=0)
+    start, end = activity_service.activity_window(days)
+    # Keyed by the window's last day so the cached entry rolls over at midnight
+    return cache.get_or_compute(
+        "activity",
+        f"{user.id}:{days}:{end}",
+        lambda: _load_activity_data(db, user, start, end),
+        tags=[user_key(user.id)],
+    )
 
-    # Query completed quiz sessions grouped by date
-    # Use func.date() for SQLite compatibility
-    result = db.exec(
-        select(
-            func.date(QuizSession.started_at).label("date"),
-            func.count(QuizSession.id).label("count")
-        )
-        .where(
-            QuizSession.user_id == user.id,
-            QuizSession.status == QuizStatus.COMPLETED,
-            QuizSession.started_at >= start_of_day
-        )
-        .group_by(func.date(QuizSession.started_at))
-        .order_by(func.date(QuizSession.started_at))
-    ).all()
 
-    # Create a dict for easy lookup (date is already string from func.date())
-    activity_dict = {row.date: row.count for row in result}
+def _load_activity_data(db: Session, user: User, start: date, end: date) -> List[dict]:
+    # Cached, so read from the primary rather than a possibly lagging replica
+    with primary_reads(db):
+        rollup = activity_service.get_daily_activity(db, user.id, start, end)
 
-    # Generate data for all days in the range, filling in 0 for days with no activity
     activity_data = []
-    for i in range(days):
-        date = (datetime.now(tz=timezone.utc) - timedelta(days=days - 1 - i)).date()
-        date_str = str(date)
+    for i in range((end - start).days + 1):
+        day = start + timedelta(days=i)
+        row = rollup.get(day)
         activity_data.append({
-            "date": date_str,
-            "count": activity_dict.get(date_str, 0)
+            "date": str(day),
+            "count": row.sessions_completed if row else 0,
+            "cards_reviewed": row.cards_reviewed if row else 0,
+            "lapses": row.lapses if row else 0,
         })
 
     return activity_data
@@ -0,0 +1,206 @@
+"""
+In-process write-behind pipeline for non-critical study side effects.
+
+Deck progress, streaks and the answer side of the daily activity rollup do not have to
+be durable before an answer is acknowledged. While the worker runs they are queued
+here, coalesced per (user, deck), per user and per (user, day), and flushed in a single
+transaction every ``WRITE_BEHIND_FLUSH_MS`` by an asyncio task started in the app
+lifespan. The queue is flushed once more on graceful shutdown.
+
+Updates are staged on the caller's session and only reach the queue once that session
+commits, like cache invalidations; a rolled-back transaction drops them.
+
+When the worker is not running (CLI scripts, tests without a lifespan, or
+``WRITE_BEHIND_ENABLED=false``) every update is applied inline in the caller's session
+and commits with the caller's transaction, as before.
+"""
+import asyncio
+import threading
+from collections.abc import Callable
+from contextlib import suppress
+from dataclasses import dataclass, field
+from datetime import date, datetime, timezone
+
+from anyio import to_thread
+from loguru import logger
+from sqlalchemy import event, select
+from sqlmodel import Session
+
+from ..core.config import settings
+from ..models import User
+from . import activity as activity_service
+from . import progress as progress_service
+from . import streak as streak_service
+from .invalidation import invalidate_after_commit, user_key
+
+_STAGED_KEY = "write_behind_updates"
+
+
+@dataclass
+class _Batch:
+    progress: dict[tuple[int, int], datetime] = field(default_factory=dict)
+    streaks: dict[int, set[date]] = field(default_factory=dict)
+    activity: dict[tuple[int, date], list[int]] = field(default_factory=dict)
+
+    def __bool__(self) -> bool:
+        return bool(self.progress or self.streaks or self.activity)
+
+    def update(self, other: "_Batch") -> None:
+        """Coalesce ``other`` into this batch."""
+        for key, studied_at in other.progress.items():
+            self.progress[key] = max(studied_at, self.progress.get(key, studied_at))
+        for user_id, days in other.streaks.items():
+            self.streaks.setdefault(user_id, set()).update(days)
+        for key, (reviewed, lapses) in other.activity.items():
+            totals = self.activity.setdefault(key, [0, 0])
+            totals[0] += reviewed
+            totals[1] += lapses
+
+    def split(self) -> list["_Batch"]:
+        """One batch per queued update."""
+        return [
+            *(_Batch(progress={key: studied_at}) for key, studied_at in self.progress.items()),
+            *(_Batch(streaks={user_id: days}) for user_id, days in self.streaks.items()),
+            *(_Batch(activity={key: totals}) for key, totals in self.activity.items()),
+        ]
+
+
+def _default_session_factory() -> Session:
+    from ..db.session import SessionLocal
+
+    return SessionLocal()
+
+
+class WriteBehindQueue:
+    """Coalescing buffer of deferred progress, streak and activity updates."""
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = _default_session_factory,
+        flush_interval: float | None = None,
+    ) -> None:
+        self._session_factory = session_factory
+        self._flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._pending = _Batch()
+        self._task: asyncio.Task | None = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    def queue_progress(self, db: Session, user_id: int, deck_id: int) -> None:
+        studied_at = datetime.now(tz=timezone.utc)
+        if not self.running:
+            progress_service.update_deck_progress(db, user_id, deck_id, studied_at)
+            return
+        self._staged(db).update(_Batch(progress={(user_id, deck_id): studied_at}))
+
+    def queue_streak(self, db: Session, user: User, activity_date: date) -> None:
+        if not self.running:
+            streak_service.update_user_streak(db, user, today=activity_date)
+            return
+        self._staged(db).update(_Batch(streaks={user.id: {activity_date}}))
+
+    def queue_activity(self, db: Session, user_id: int, activity_date: date, *, cards_reviewed: int, lapses: int) -> None:
+        if not self.running:
+            activity_service.record_activity(db, user_id, activity_date, cards_reviewed=cards_reviewed, lapses=lapses)
+            return
+        self._staged(db).update(_Batch(activity={(user_id, activity_date): [cards_reviewed, lapses]}))
+
+    def _staged(self, db: Session) -> _Batch:
+        """The updates ``db`` has queued in its current transaction, handed over on commit."""
+        return db.info.setdefault(_STAGED_KEY, {}).setdefault(self, _Batch())
+
+    def _enqueue(self, batch: _Batch) -> None:
+        with self._lock:
+            self._pending.update(batch)
+
+    async def start(self) -> None:
+        """Start the periodic flush task on the running event loop."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the flush task and write out everything still queued."""
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            with suppress(asyncio.CancelledError):
+                await task
+        await self.flush()
+
+    async def flush(self) -> None:
+        """
+        Write the queued updates in one transaction.
+
+        If that fails, each update is written in a transaction of its own, and the ones
+        that still fail are logged and dropped. A bad row, such as progress for a deck
+        purged in the meantime, would otherwise be retried forever and hold back every
+        other update.
+        """
+        with self._lock:
+            batch, self._pending = self._pending, _Batch()
+        if not batch:
+            return
+        try:
+            await to_thread.run_sync(self._write, batch)
+        except Exception:
+            logger.exception("Write-behind flush failed; writing {} update(s) one at a time", self._size(batch))
+            await to_thread.run_sync(self._write_each, batch)
+
+    async def _run(self) -> None:
+        interval = self._flush_interval
+        if interval is None:
+            interval = settings.WRITE_BEHIND_FLUSH_MS / 1000
+        while True:
+            await asyncio.sleep(interval)
+            with suppress(Exception):
+                await self.flush()
+
+    def _write(self, batch: _Batch) -> None:
+        with self._session_factory() as db:
+            for (user_id, deck_id), studied_at in batch.progress.items():
+                progress_service.update_deck_progress(db, user_id, deck_id, studied_at)
+
+            if batch.streaks:
+                users = db.exec(select(User).where(User.id.in_(list(batch.streaks)))).scalars()
+                for user in users:
+                    for day in sorted(batch.streaks[user.id]):
+                        streak_service.update_user_streak(db, user, today=day)
+
+            for (user_id, day), (reviewed, lapses) in batch.activity.items():
+                activity_service.record_activity(db, user_id, day, cards_reviewed=reviewed, lapses=lapses)
+
+            user_ids = set(batch.streaks)
+            user_ids.update(user_id for user_id, _ in batch.progress)
+            user_ids.update(user_id for user_id, _ in batch.activity)
+            invalidate_after_commit(db, *(user_key(user_id) for user_id in user_ids))
+            db.commit()
+
+    def _write_each(self, batch: _Batch) -> None:
+        for item in batch.split():
+            try:
+                self._write(item)
+            except Exception:
+                logger.exception("Dropping write-behind update {}", item)
+
+    @staticmethod
+    def _size(batch: _Batch) -> int:
+        return len(batch.progress) + len(batch.streaks) + len(batch.activity)
+
+
+@event.listens_for(Session, "after_commit")
+def _enqueue_staged(session) -> None:
+    for queue, batch in session.info.pop(_STAGED_KEY, {}).items():
+        queue._enqueue(batch)
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _discard_staged(session, transaction) -> None:
+    # Runs after after_commit, so anything left here was rolled back or closed
+    if transaction.parent is None:
+        session.info.pop(_STAGED_KEY, None)
+
+
+write_behind = WriteBehindQueue()
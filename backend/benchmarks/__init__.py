@@ -0,0 +1,5 @@
+"""Benchmarks for the Flash-Decks backend.
+
+Each module is runnable on its own from the ``backend`` directory, e.g.
+``python -m benchmarks.startup``.
+"""
@@ -0,0 +1,82 @@
+"""Report the import cost of ``app.main`` (or any module) against a budget.
+
+Runs ``python -X importtime -c "import <module>"`` in a fresh interpreter, prints the
+cumulative cost of the target and the most expensive modules it pulls in, and exits
+non-zero when the target exceeds the budget.
+
+    python -m benchmarks.imports --budget-ms 1200
+    python -m benchmarks.imports --module app.services.study --top 15
+"""
+
+import argparse
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+
+DEFAULT_MODULE = "app.main"
+DEFAULT_BUDGET_MS = 1200.0
+# Dependencies that should only load on first use; importing the target must not pull them in.
+LAZY_MODULES = ("passlib", "argon2", "jose", "cryptography", "numpy")
+
+_LINE_RE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+def profile(module: str) -> list[tuple[str, int, int, int]]:
+    """Return ``(name, self_us, cumulative_us, depth)`` for every module imported by ``module``."""
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_DIR,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stderr
+    rows = []
+    for line in stderr.splitlines():
+        match = _LINE_RE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            rows.append((name, int(self_us), int(cumulative_us), len(indent) // 2))
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default=DEFAULT_MODULE)
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS)
+    parser.add_argument("--top", type=int, default=10, help="number of direct imports to list")
+    args = parser.parse_args()
+
+    rows = profile(args.module)
+    index = next((i for i, row in enumerate(rows) if row[0] == args.module), None)
+    if index is None:
+        sys.exit(f"{args.module} was not imported")
+    depth = rows[index][3]
+    total_ms = rows[index][2] / 1000
+
+    # -X importtime prints children before their parent, one indent level deeper.
+    children = []
+    for row in reversed(rows[:index]):
+        if row[3] <= depth:
+            break
+        if row[3] == depth + 1:
+            children.append(row)
+    heaviest = sorted(children, key=lambda row: row[2], reverse=True)
+    print(f"{'direct import of ' + args.module:<40} {'cumulative ms':>14}")
+    for name, _, cumulative_us, _ in heaviest[: args.top]:
+        print(f"{name:<40} {cumulative_us / 1000:>14.1f}")
+
+    eager = sorted({row[0].split(".")[0] for row in rows} & set(LAZY_MODULES))
+    if eager:
+        print(f"\nlazy dependencies imported eagerly: {', '.join(eager)}")
+
+    verdict = "OK" if total_ms <= args.budget_ms and not eager else "OVER BUDGET"
+    print(f"\n{args.module}: {total_ms:.1f} ms (budget {args.budget_ms:.0f} ms) {verdict}")
+    if verdict != "OK":
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
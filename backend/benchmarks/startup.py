@@ -0,0 +1,59 @@
+"""Measure worker start-up: importing ``app.main`` and running the lifespan hook.
+
+Every sample runs in a fresh interpreter so module caches do not hide import cost.
+The database named by ``DATABASE_URL`` must be migrated to head unless
+``DB_SCHEMA_CHECK`` is relaxed.
+
+    python -m benchmarks.startup --runs 10
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+
+_PROBE = """
+import asyncio, json, time
+t0 = time.perf_counter()
+from app.main import app
+t1 = time.perf_counter()
+
+async def _lifespan():
+    async with app.router.lifespan_context(app):
+        pass
+
+asyncio.run(_lifespan())
+t2 = time.perf_counter()
+print(json.dumps({"import_ms": (t1 - t0) * 1000, "lifespan_ms": (t2 - t1) * 1000, "total_ms": (t2 - t0) * 1000}))
+"""
+
+
+def sample() -> dict[str, float]:
+    """Start one fresh interpreter and return its start-up timings in milliseconds."""
+    output = subprocess.run(
+        [sys.executable, "-c", _PROBE],
+        cwd=BACKEND_DIR,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    samples = [sample() for _ in range(args.runs)]
+    for key in ("import_ms", "lifespan_ms", "total_ms"):
+        values = [s[key] for s in samples]
+        print(f"{key:<12} median={statistics.median(values):8.1f}  min={min(values):8.1f}  max={max(values):8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Compare JSON and columnar MessagePack encodings of large deck and study payloads.
+
+Builds a synthetic ``DeckRead`` with ``--cards`` cards and a due-review list of the
+same length. Each is encoded ``--runs`` times the way the API does it: pydantic JSON
+serialization plus ``json.dumps`` for JSON, and ``app.api.negotiation.encode_msgpack``
+for MessagePack. Reports body size (raw and gzipped) and CPU time per encode.
+
+    python -m benchmarks.wire_format --cards 2000 --runs 50
+"""
+
+import argparse
+import gzip
+import json
+import time
+from datetime import datetime, timedelta, timezone
+
+from pydantic import TypeAdapter
+
+from app.api.negotiation import encode_msgpack
+from app.schemas.card import CardRead
+from app.schemas.deck import DeckRead
+from app.schemas.study import DueReviewCard
+
+
+def build_payloads(n: int) -> dict[str, object]:
+    now = datetime(2026, 10, 19, 12, 0, tzinfo=timezone.utc)
+    cards = [
+        CardRead(
+            id=i,
+            deck_id=1,
+            prompt=f"What is the capital of country number {i}?",
+            answer=f"City {i}",
+            explanation=None if i % 3 else "Seen in lesson 4",
+            created_at=now - timedelta(days=i % 400, seconds=i),
+            updated_at=now - timedelta(days=i % 90, seconds=i),
+        )
+        for i in range(n)
+    ]
+    deck = DeckRead(
+        id=1,
+        title="Capitals",
+        description="World capitals",
+        is_public=True,
+        owner_user_id=1,
+        created_at=now,
+        updated_at=now,
+        cards=cards,
+    )
+    due = [
+        DueReviewCard(
+            card_id=i,
+            deck_id=1,
+            due_at=now - timedelta(hours=i % 72),
+            repetitions=i % 9,
+            interval_days=1 + i % 40,
+            easiness=1.3 + (i % 17) / 10,
+        )
+        for i in range(n)
+    ]
+    return {"deck": deck, "due_reviews": due}
+
+
+def encode_json(payload) -> bytes:
+    adapter = TypeAdapter(type(payload) if not isinstance(payload, list) else list[type(payload[0])])
+    content = adapter.dump_python(payload, mode="json")
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+def measure(encode, payload, runs: int) -> tuple[bytes, float]:
+    body = encode(payload)
+    started = time.process_time()
+    for _ in range(runs):
+        encode(payload)
+    return body, (time.process_time() - started) / runs * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cards", type=int, default=2000)
+    parser.add_argument("--runs", type=int, default=50)
+    args = parser.parse_args()
+
+    print(f"{'payload':<12} {'format':<8} {'bytes':>10} {'gzip':>9} {'cpu ms':>8}")
+    for name, payload in build_payloads(args.cards).items():
+        for label, encode in (("json", encode_json), ("msgpack", encode_msgpack)):
+            body, cpu_ms = measure(encode, payload, args.runs)
+            print(f"{name:<12} {label:<8} {len(body):>10,} {len(gzip.compress(body)):>9,} {cpu_ms:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
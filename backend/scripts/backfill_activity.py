@@ -0,0 +1,19 @@
+"""Rebuild the daily activity rollup from existing quiz history."""
+
+import sys
+
+from sqlmodel import Session
+
+from app.db.session import engine
+from app.services.activity import backfill_daily_activity
+
+
+def backfill(user_ids: list[int] | None = None) -> None:
+    """Run the backfill inside a managed session."""
+    with Session(engine) as session:
+        written = backfill_daily_activity(session, user_ids)
+    print(f"Wrote {written} daily activity rows")
+
+
+if __name__ == "__main__":
+    backfill([int(arg) for arg in sys.argv[1:]] or None)
@@ -0,0 +1,17 @@
+"""Fill in the content hash of cards created before duplicate detection existed."""
+
+from sqlmodel import Session
+
+from app.db.session import engine
+from app.services.decks import backfill_card_hashes
+
+
+def backfill() -> None:
+    """Run the backfill inside a managed session."""
+    with Session(engine) as session:
+        written = backfill_card_hashes(session)
+    print(f"Hashed {written} cards")
+
+
+if __name__ == "__main__":
+    backfill()
@@ -0,0 +1,20 @@
+"""Prebuild today's review queue for every recently studied user and deck (intended to run nightly)."""
+
+import sys
+from datetime import datetime, timezone
+
+from sqlmodel import Session
+
+from app.db.session import engine
+from app.services.review_queue import build_daily_queues
+
+
+def build(active_days: int = 30) -> None:
+    """Build queues for decks studied in the last ``active_days`` inside a managed session."""
+    with Session(engine) as session:
+        built = build_daily_queues(session, datetime.now(tz=timezone.utc).date(), active_days=active_days)
+    print(f"Built {built} review queue(s)")
+
+
+if __name__ == "__main__":
+    build(int(sys.argv[1]) if len(sys.argv) > 1 else 30)
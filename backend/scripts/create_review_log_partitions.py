@@ -0,0 +1,18 @@
+"""Create upcoming monthly partitions of a partitioned ``review_logs`` table (Postgres, run monthly)."""
+
+import sys
+from datetime import datetime, timezone
+
+from app.db.session import engine
+from app.services.review_log import create_partitions
+
+
+def create(months: int = 3) -> None:
+    """Create partitions for the current month and the ``months - 1`` after it."""
+    with engine.begin() as connection:
+        names = create_partitions(connection, datetime.now(tz=timezone.utc).date(), months)
+    print(f"Review log partitions in place: {', '.join(names)}")
+
+
+if __name__ == "__main__":
+    create(int(sys.argv[1]) if len(sys.argv) > 1 else 3)
@@ -0,0 +1,19 @@
+"""Fit per-user FSRS weights from quiz history (intended to run nightly)."""
+
+import sys
+
+from sqlmodel import Session
+
+from app.db.session import engine
+from app.services.fsrs_optimizer import optimize_users
+
+
+def optimize(chunk_size: int = 2_000) -> None:
+    """Fit every FSRS user's weights inside a managed session."""
+    with Session(engine) as session:
+        updated = optimize_users(session, chunk_size=chunk_size)
+    print(f"Updated FSRS weights for {updated} user(s)")
+
+
+if __name__ == "__main__":
+    optimize(int(sys.argv[1]) if len(sys.argv) > 1 else 2_000)
@@ -0,0 +1,17 @@
+"""Delete card tombstones past the retention period (intended to run daily)."""
+
+from sqlmodel import Session
+
+from app.db.session import engine
+from app.services.decks import purge_card_tombstones
+
+
+def purge() -> None:
+    """Purge expired tombstones inside a managed session."""
+    with Session(engine) as session:
+        removed = purge_card_tombstones(session)
+    print(f"Removed {removed} card tombstone(s)")
+
+
+if __name__ == "__main__":
+    purge()
@@ -0,0 +1,17 @@
+"""Finish purging decks marked deleted, e.g. after a restart interrupted a background purge."""
+
+from sqlmodel import Session
+
+from app.db.session import engine
+from app.services.purge import purge_deleted_decks
+
+
+def purge() -> None:
+    """Purge deleted decks inside a managed session."""
+    with Session(engine) as session:
+        purged = purge_deleted_decks(session)
+    print(f"Purged {purged} deleted deck(s)")
+
+
+if __name__ == "__main__":
+    purge()
@@ -0,0 +1,19 @@
+"""Recompute every user's streak columns from quiz history."""
+
+import sys
+
+from sqlmodel import Session
+
+from app.db.session import engine
+from app.services.streak import recompute_all_streaks
+
+
+def recompute(chunk_size: int = 10_000) -> None:
+    """Run the recomputation inside a managed session."""
+    with Session(engine) as session:
+        chunks = recompute_all_streaks(session, chunk_size=chunk_size)
+    print(f"Recomputed streaks across {chunks} user id range(s)")
+
+
+if __name__ == "__main__":
+    recompute(int(sys.argv[1]) if len(sys.argv) > 1 else 10_000)
@@ -0,0 +1,23 @@
+"""Check quiz session counters against the quiz_responses aggregate."""
+
+import sys
+
+from sqlmodel import Session
+
+from app.db.session import engine
+from app.services.study import reconcile_session_counters
+
+
+def reconcile(fix: bool = False) -> int:
+    """Report drifted sessions, optionally repairing them. Returns the drift count."""
+    with Session(engine) as session:
+        drifted = reconcile_session_counters(session, fix=fix)
+    for row in drifted:
+        print(f"session {row['session_id']}: stored={row['stored']} expected={row['expected']}")
+    print(f"{len(drifted)} drifted session(s){' repaired' if fix and drifted else ''}")
+    return len(drifted)
+
+
+if __name__ == "__main__":
+    fix = "--fix" in sys.argv[1:]
+    sys.exit(1 if reconcile(fix=fix) and not fix else 0)
@@ -4,11 +4,11 @@ from sqlmodel import Session, select
 
 from app.db.session import engine
 from app.models import Deck, User, UserRole
-from app.schemas.card import CardCreate
+from app.schemas.card import CardCreate, CardImport
 from app.schemas.deck import DeckCreate
 from app.schemas.user import UserCreate
 from app.services import auth
-from app.services.decks import create_deck
+from app.services.decks import create_deck, import_cards
 
 
 STARTER_DECKS = [
@@ -58,6 +58,8 @@ def seed() -> None:
         for deck_payload in STARTER_DECKS:
             existing = session.exec(select(Deck).where(Deck.title == deck_payload.title)).first()
             if existing:
+                # Adds starter cards missing from the deck, without duplicating the others
+                import_cards(session, existing, CardImport(cards=deck_payload.cards or []))
                 continue
             create_deck(session, owner=None, deck_in=deck_payload)
 
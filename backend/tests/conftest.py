@@ -9,6 +9,7 @@ from sqlmodel import Session, SQLModel, create_engine
 from sqlmodel.pool import StaticPool
 
 from app.services.auth import create_access_token, hash_password
+from app.services.cache import cache
 from app.db.session import get_db
 from app.main import app
 from app.models import Card, Deck, QuizResponse, QuizSession, SRSReview, User, UserDeckProgress
@@ -19,6 +20,12 @@ warnings.filterwarnings("ignore", category=ResourceWarning)
 warnings.filterwarnings("ignore", category=DeprecationWarning)
 
 
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Every test database reuses the same ids, so cached payloads must not leak between tests."""
+    cache.clear()
+
+
 @pytest.fixture(name="engine")
 def engine_fixture():
     """Create an in-memory SQLite engine for testing."""
@@ -166,6 +173,16 @@ def test_cards_fixture(db: Session, test_deck: Deck) -> list[Card]:
     return cards
 
 
+@pytest.fixture(name="basic_card")
+def basic_card_fixture(db: Session, test_deck: Deck) -> Card:
+    """Create a single basic card in the test deck."""
+    card = Card(deck_id=test_deck.id, type=CardType.BASIC, prompt="Capital of Peru?", answer="Lima")
+    db.add(card)
+    db.commit()
+    db.refresh(card)
+    return card
+
+
 @pytest.fixture(name="quiz_session")
 def quiz_session_fixture(db: Session, test_user: User, test_deck: Deck) -> QuizSession:
     """Create a quiz session."""
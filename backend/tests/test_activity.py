@@ -0,0 +1,106 @@
+"""Tests for the daily activity rollup and streak recomputation."""
+import datetime as dt
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlmodel import Session, select
+
+from app.models import QuizResponse, QuizSession, UserDailyActivity
+from app.models.enums import QuizMode, QuizStatus
+from app.services.activity import backfill_daily_activity
+
+
+def _rollup(db: Session, user_id: int) -> list[UserDailyActivity]:
+    return list(db.exec(select(UserDailyActivity).where(UserDailyActivity.user_id == user_id)).all())
+
+
+@pytest.mark.integration
+class TestActivityRollup:
+    """Rollup rows are maintained by the study endpoints."""
+
+    def test_answers_and_finish_update_rollup(self, client: TestClient, db, quiz_session, basic_card, test_user, test_user_token):
+        headers = {"Authorization": f"Bearer {test_user_token}"}
+        for quality in (5, 1):
+            response = client.post(
+                f"/api/v1/study/sessions/{quiz_session.id}/answer",
+                json={"card_id": basic_card.id, "quality": quality},
+                headers=headers,
+            )
+            assert response.status_code == 200
+        client.post(f"/api/v1/study/sessions/{quiz_session.id}/finish", headers=headers)
+        # Finishing twice must not count the session twice
+        client.post(f"/api/v1/study/sessions/{quiz_session.id}/finish", headers=headers)
+
+        rows = _rollup(db, test_user.id)
+        assert len(rows) == 1
+        assert rows[0].sessions_completed == 1
+        assert rows[0].cards_reviewed == 2
+        assert rows[0].lapses == 1
+
+        data = client.get("/api/v1/study/activity?days=7", headers=headers).json()
+        assert len(data) == 7
+        assert data[-1] == {"date": str(rows[0].activity_date), "count": 1, "cards_reviewed": 2, "lapses": 1}
+
+    def test_activity_days_bounded(self, client: TestClient, test_user_token):
+        response = client.get(
+            "/api/v1/study/activity?days=5000",
+            headers={"Authorization": f"Bearer {test_user_token}"},
+        )
+        assert response.status_code == 422
+
+
+@pytest.mark.unit
+def test_backfill_rebuilds_from_history(db: Session, test_user, test_deck, basic_card):
+    day = dt.datetime(2024, 3, 1, 12, 0)
+    session = QuizSession(
+        user_id=test_user.id,
+        deck_id=test_deck.id,
+        mode=QuizMode.REVIEW,
+        status=QuizStatus.COMPLETED,
+        started_at=day,
+        ended_at=day,
+    )
+    db.add(session)
+    db.flush()
+    db.add(QuizResponse(session_id=session.id, card_id=basic_card.id, quality=2, responded_at=day))
+    db.add(QuizResponse(session_id=session.id, card_id=basic_card.id, quality=4, responded_at=day))
+    db.add(UserDailyActivity(user_id=test_user.id, activity_date=dt.date(2024, 3, 1), sessions_completed=9))
+    db.commit()
+
+    assert backfill_daily_activity(db) == 1
+
+    rows = _rollup(db, test_user.id)
+    assert [(r.activity_date, r.sessions_completed, r.cards_reviewed, r.lapses) for r in rows] == [
+        (dt.date(2024, 3, 1), 1, 2, 1)
+    ]
+
+
+@pytest.mark.unit
+def test_recompute_all_streaks_gaps_and_islands(db: Session, test_user, admin_user, test_deck):
+    from app.services.streak import recompute_all_streaks
+
+    # Study days: 1, 2, 3 (streak of 3), gap, 6, 7 (current streak of 2)
+    for day in (1, 2, 2, 3, 6, 7):
+        finished = dt.datetime(2024, 5, day, 9, 30)
+        db.add(
+            QuizSession(
+                user_id=test_user.id,
+                deck_id=test_deck.id,
+                mode=QuizMode.REVIEW,
+                status=QuizStatus.COMPLETED,
+                started_at=finished,
+                ended_at=finished,
+            )
+        )
+    admin_user.current_streak = 5
+    admin_user.longest_streak = 5
+    db.add(admin_user)
+    db.commit()
+
+    assert recompute_all_streaks(db, chunk_size=1) == 2
+
+    db.refresh(test_user)
+    db.refresh(admin_user)
+    assert (test_user.current_streak, test_user.longest_streak) == (2, 3)
+    assert test_user.last_activity_date == dt.date(2024, 5, 7)
+    assert (admin_user.current_streak, admin_user.longest_streak, admin_user.last_activity_date) == (0, 0, None)
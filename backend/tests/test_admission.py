@@ -0,0 +1,73 @@
+"""Tests for per-client rate limits and the global concurrency cap."""
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+
+from app.api.admission import ConcurrencyGate, TokenBuckets, rate_limits
+from app.core.metrics import metrics
+from app.services.auth import create_access_token
+
+
+@pytest.mark.unit
+def test_token_bucket_allows_bursts_then_refills_at_the_rate():
+    buckets = TokenBuckets({"read": (2.0, 3.0)})
+    assert [buckets.take("read", "a", now=0.0) for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert buckets.take("read", "a", now=0.0) == pytest.approx(0.5)
+    # Other clients and unlimited route classes are unaffected
+    assert buckets.take("read", "b", now=0.0) == 0.0
+    assert buckets.take("export", "a", now=0.0) == 0.0
+    assert buckets.take("read", "a", now=0.5) == 0.0
+    assert buckets.take("read", "a", now=0.5) == pytest.approx(0.5)
+
+
+@pytest.mark.unit
+def test_concurrency_gate_queues_then_sheds_excess_requests():
+    gate = ConcurrencyGate(max_concurrency=1, max_queue=1, queue_timeout=0.05)
+
+    async def scenario():
+        await gate.acquire()
+        waiting = asyncio.create_task(gate.acquire())
+        await asyncio.sleep(0)
+        with pytest.raises(HTTPException) as full:
+            await gate.acquire()
+        gate.release()
+        await waiting
+        with pytest.raises(HTTPException) as timed_out:
+            await gate.acquire()
+        gate.release()
+        return full.value, timed_out.value
+
+    full, timed_out = asyncio.run(scenario())
+    assert full.status_code == timed_out.status_code == 503
+    assert full.headers["Retry-After"] == "1"
+
+
+@pytest.mark.integration
+def test_clients_over_their_rate_get_429(client: TestClient, monkeypatch):
+    monkeypatch.setattr(rate_limits, "limits", {"read": (0.01, 2.0)})
+    monkeypatch.setattr(rate_limits, "_buckets", {})
+    rejected = metrics.meter("admission_rejected_read").value
+    headers = {"Authorization": f"Bearer {create_access_token('1')}"}
+
+    assert [client.get("/api/v1/decks", headers=headers).status_code for _ in range(2)] == [200, 200]
+    response = client.get("/api/v1/decks", headers=headers)
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) >= 90
+    assert metrics.meter("admission_rejected_read").value == rejected + 1
+
+    other_user = {"Authorization": f"Bearer {create_access_token('2')}"}
+    assert client.get("/api/v1/decks", headers=other_user).status_code == 200
+
+
+@pytest.mark.integration
+def test_unverified_tokens_share_the_address_bucket(client: TestClient, monkeypatch):
+    monkeypatch.setattr(rate_limits, "limits", {"read": (0.01, 2.0)})
+    monkeypatch.setattr(rate_limits, "_buckets", {})
+
+    statuses = [
+        client.get("/api/v1/decks", headers={"Authorization": f"Bearer made-up-{i}"}).status_code for i in range(3)
+    ]
+    assert statuses == [200, 200, 429]
+    assert client.get("/api/v1/decks").status_code == 429
@@ -0,0 +1,89 @@
+"""Tests for typed-answer grading."""
+import datetime as dt
+import random
+
+import pytest
+
+from app.models import Card
+from app.services.answer_matching import (
+    AnswerMatcher,
+    CompiledCardCache,
+    _compile_pattern,
+    bounded_distance,
+    normalize,
+)
+from app.services.study import _check_answer_correctness, _check_cloze_answer
+
+
+def _levenshtein(a: str, b: str) -> int:
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b)))
+        previous = current
+    return previous[-1]
+
+
+@pytest.mark.unit
+def test_normalize_folds_case_accents_punctuation_and_width():
+    assert normalize("  Café  au-Lait! ") == "cafe au lait"
+    assert normalize("ＰＡＲＩＳ") == "paris"
+    assert normalize("Straße") == "strasse"
+    assert normalize("São   Paulo") == normalize("sao paulo")
+    assert normalize(None) == ""
+
+
+@pytest.mark.unit
+def test_bounded_distance_matches_levenshtein():
+    rng = random.Random(7)
+    for _ in range(2000):
+        a = "".join(rng.choice("abcd") for _ in range(rng.randint(0, 70)))
+        b = "".join(rng.choice("abcd") for _ in range(rng.randint(0, 70)))
+        expected = _levenshtein(a, b)
+        for limit in (0, 1, 2, 5):
+            got = bounded_distance(_compile_pattern(a), b, limit)
+            assert got == (expected if expected <= limit else limit + 1)
+
+
+@pytest.mark.unit
+def test_matcher_tolerates_typos_only_in_longer_answers():
+    matcher = AnswerMatcher(["Mitochondria", "powerhouse of the cell", "cat", "1848"])
+    assert matcher.matches("mitochondira")
+    assert matcher.matches("Powerhouse of teh cell")
+    assert not matcher.matches("mitochon")
+    assert not matcher.matches("car")
+    assert not matcher.matches("1849")
+    assert not matcher.matches("")
+
+
+@pytest.mark.unit
+def test_cards_are_graded_against_answer_and_aliases():
+    card = Card(id=1, deck_id=1, prompt="Capital of France?", answer="Paris", options=["Paname"])
+    card.updated_at = dt.datetime(2026, 10, 19, tzinfo=dt.timezone.utc)
+    assert _check_answer_correctness(card, "paris.")
+    assert _check_answer_correctness(card, "PANAME")
+    assert not _check_answer_correctness(card, "London")
+    assert not _check_answer_correctness(card, None)
+    assert not _check_cloze_answer(card, '["Paris"]')
+
+
+@pytest.mark.unit
+def test_compiled_cards_are_recompiled_when_the_card_changes():
+    cache = CompiledCardCache(max_entries=1)
+    card = Card(id=1, deck_id=1, prompt="Largest planet?", answer="Jupiter")
+    card.updated_at = dt.datetime(2026, 10, 19, tzinfo=dt.timezone.utc)
+    compiled = cache.get(card)
+    assert cache.get(card) is compiled
+
+    card.answer = "Saturn"
+    assert cache.get(card) is compiled
+    card.updated_at += dt.timedelta(seconds=1)
+    recompiled = cache.get(card)
+    assert recompiled.matches("saturn")
+
+    # Bounded: caching another card evicts the least recently used one
+    other = Card(id=2, deck_id=1, prompt="Smallest planet?", answer="Mercury")
+    other.updated_at = card.updated_at
+    cache.get(other)
+    assert cache.get(card) is not recompiled
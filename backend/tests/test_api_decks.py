@@ -39,6 +39,36 @@ class TestListDecks:
         data = response.json()
         assert isinstance(data, list)
 
+    def test_list_decks_pages_with_cursor(self, client: TestClient, db: Session):
+        from datetime import datetime, timezone
+
+        # Five decks sharing a creation time, so pages are told apart by id
+        created_at = datetime(2026, 10, 19, tzinfo=timezone.utc)
+        decks = [Deck(title=f"Deck {i}", created_at=created_at, updated_at=created_at) for i in range(5)]
+        db.add_all(decks)
+        db.commit()
+
+        seen, cursor = [], None
+        while True:
+            response = client.get("/api/v1/decks", params={"limit": 2, **({"cursor": cursor} if cursor else {})})
+            assert response.status_code == 200
+            assert "X-Total-Count" not in response.headers
+            seen.extend(deck["id"] for deck in response.json())
+            cursor = response.headers.get("X-Next-Cursor")
+            if cursor is None:
+                break
+        assert seen == sorted((deck.id for deck in decks), reverse=True)
+
+    def test_list_decks_counts_only_on_request(self, client: TestClient, test_deck, private_deck):
+        response = client.get("/api/v1/decks", params={"limit": 1}, headers={"X-Total-Count": "true"})
+        assert response.headers["X-Total-Count"] == "2"
+        assert len(response.json()) == 1
+
+    def test_list_decks_rejects_malformed_cursor(self, client: TestClient):
+        response = client.get("/api/v1/decks", params={"cursor": "not-a-cursor"})
+        assert response.status_code == 400
+
+
 @pytest.mark.integration
 class TestReadDeck:
     """Test GET /api/v1/decks/{deck_id} endpoint."""
@@ -239,21 +269,23 @@ class TestDeleteDeck:
         db.add(card1)
         db.add(card2)
         db.commit()
+        # Rows are deleted set-based, so read the ids while the instances can still load them
+        deck_id, card1_id, card2_id = deck.id, card1.id, card2.id
 
         # Delete the deck
         response = client.delete(
-            f"/api/v1/decks/{deck.id}",
+            f"/api/v1/decks/{deck_id}",
             headers={"Authorization": f"Bearer {test_user_token}"},
         )
         assert response.status_code == 200
 
         # Verify deck is deleted
-        deleted_deck = db.get(Deck, deck.id)
+        deleted_deck = db.get(Deck, deck_id)
         assert deleted_deck is None
 
         # Verify cards are also deleted (cascade)
-        deleted_card1 = db.get(Card, card1.id)
-        deleted_card2 = db.get(Card, card2.id)
+        deleted_card1 = db.get(Card, card1_id)
+        deleted_card2 = db.get(Card, card2_id)
         assert deleted_card1 is None
         assert deleted_card2 is None
 
@@ -359,3 +391,38 @@ class TestRemoveCard:
             headers={"Authorization": f"Bearer {test_user_token}"},
         )
         assert response.status_code == 404
+
+
+@pytest.mark.integration
+class TestDeckChanges:
+    """Test GET /api/v1/decks/{deck_id}/changes endpoint."""
+
+    def test_changes_since_cursor_return_only_edits_and_deletions(
+        self, client: TestClient, db: Session, test_deck: Deck, test_user_token
+    ):
+        from datetime import datetime, timedelta, timezone
+
+        an_hour_ago = datetime.now(tz=timezone.utc) - timedelta(hours=1)
+        cards = [
+            Card(deck_id=test_deck.id, type=CardType.BASIC, prompt=f"Q{i}", answer="A", updated_at=an_hour_ago)
+            for i in range(3)
+        ]
+        db.add_all(cards)
+        db.commit()
+        headers = {"Authorization": f"Bearer {test_user_token}"}
+
+        full = client.get(f"/api/v1/decks/{test_deck.id}/changes").json()
+        assert full["reset"] is True
+        assert [card["id"] for card in full["cards"]] == [card.id for card in cards]
+
+        client.put(f"/api/v1/decks/cards/{cards[0].id}", json={"prompt": "Edited"}, headers=headers)
+        client.delete(f"/api/v1/decks/{test_deck.id}/cards/{cards[1].id}", headers=headers)
+
+        delta = client.get(f"/api/v1/decks/{test_deck.id}/changes", params={"since": full["cursor"]}).json()
+        assert delta["reset"] is False
+        assert [card["prompt"] for card in delta["cards"]] == ["Edited"]
+        assert delta["deleted_card_ids"] == [cards[1].id]
+
+    def test_changes_reject_malformed_cursor(self, client: TestClient, test_deck: Deck):
+        response = client.get(f"/api/v1/decks/{test_deck.id}/changes", params={"since": "not-a-cursor"})
+        assert response.status_code == 400
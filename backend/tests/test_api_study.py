@@ -265,6 +265,7 @@ class TestSessionStatistics:
 
     def test_get_session_statistics_with_responses(self, client: TestClient, quiz_session, test_cards, test_user_token, db):
         from app.models import QuizResponse
+        from app.services.study import reconcile_session_counters
 
         # Add some quiz responses
         responses = [
@@ -276,6 +277,8 @@ class TestSessionStatistics:
         for r in responses:
             db.add(r)
         db.commit()
+        # Rows inserted behind record_answer's back only show up once the counters are reconciled
+        reconcile_session_counters(db, [quiz_session.id], fix=True)
 
         response = client.get(
             f"/api/v1/study/sessions/{quiz_session.id}/statistics",
@@ -341,6 +344,30 @@ class TestSessionStatistics:
         assert data["correct_count"] == 1
         assert data["incorrect_count"] == 1
 
+    def test_counters_track_answers_and_reconcile(self, client: TestClient, quiz_session, basic_card, test_user_token, db):
+        from sqlalchemy import update
+
+        from app.models import QuizSession
+        from app.services.study import reconcile_session_counters
+
+        headers = {"Authorization": f"Bearer {test_user_token}"}
+        for quality in (4, 2):
+            client.post(
+                f"/api/v1/study/sessions/{quiz_session.id}/answer",
+                json={"card_id": basic_card.id, "quality": quality},
+                headers=headers,
+            )
+
+        data = client.get(f"/api/v1/study/sessions/{quiz_session.id}/statistics", headers=headers).json()
+        assert data == {"total_responses": 2, "correct_count": 0, "incorrect_count": 0, "unanswered_count": 2}
+        assert reconcile_session_counters(db) == []
+
+        db.exec(update(QuizSession).where(QuizSession.id == quiz_session.id).values(total_responses=7))
+        db.commit()
+        drifted = reconcile_session_counters(db, fix=True)
+        assert drifted == [{"session_id": quiz_session.id, "stored": (7, 0, 0, 2), "expected": (2, 0, 0, 2)}]
+        assert reconcile_session_counters(db) == []
+
 
 @pytest.mark.integration
 class TestActivityData:
@@ -421,6 +448,51 @@ class TestActivityData:
         assert len(data) == 14  # Should return 14 days of data
 
 
+@pytest.mark.integration
+class TestReviewForecast:
+    """Test GET /api/v1/study/forecast endpoint."""
+
+    def test_forecast_buckets_reviews_by_due_day(
+        self, client: TestClient, test_user_token, test_deck, basic_card, quiz_session, db
+    ):
+        """Overdue reviews count towards today; the cached forecast refreshes after an answer."""
+        from datetime import datetime, timedelta, timezone
+        from app.models import Card, SRSReview
+        from app.models.enums import CardType
+
+        now = datetime.now(tz=timezone.utc)
+        for due_at in (now - timedelta(days=3), now + timedelta(days=2, hours=1)):
+            card = Card(deck_id=test_deck.id, type=CardType.BASIC, prompt="Q", answer="A")
+            db.add(card)
+            db.flush()
+            db.add(SRSReview(user_id=quiz_session.user_id, card_id=card.id, due_at=due_at))
+        db.commit()
+        headers = {"Authorization": f"Bearer {test_user_token}"}
+
+        data = client.get("/api/v1/study/forecast?days=5", headers=headers).json()
+        assert len(data) == 5
+        assert data[0]["due"] == 1 and data[1]["due"] == 0
+        assert sum(item["due"] for item in data) == 2
+
+        client.post(
+            f"/api/v1/study/sessions/{quiz_session.id}/answer",
+            json={"card_id": basic_card.id, "quality": 4},
+            headers=headers,
+        )
+        data = client.get("/api/v1/study/forecast?days=5", headers=headers).json()
+        assert sum(item["due"] for item in data) == 3
+
+        data = client.get(f"/api/v1/study/forecast?days=5&deck_id={test_deck.id + 1}", headers=headers).json()
+        assert sum(item["due"] for item in data) == 0
+
+    def test_forecast_validates_days(self, client: TestClient, test_user_token):
+        response = client.get(
+            "/api/v1/study/forecast?days=0",
+            headers={"Authorization": f"Bearer {test_user_token}"},
+        )
+        assert response.status_code == 422
+
+
 @pytest.mark.integration
 class TestExamModeCardFiltering:
     """Test that exam mode correctly filters out basic card types."""
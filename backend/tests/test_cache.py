@@ -0,0 +1,197 @@
+"""Tests for the two-tier read-through cache, with a fake Redis-protocol server as the shared tier."""
+import socket
+import socketserver
+import threading
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.metrics import metrics
+from app.services.cache import Cache, LRUCache, RedisTier, decode, encode
+
+
+class _FakeRedisHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            args = []
+            for _ in range(int(line[1:])):
+                length = int(self.rfile.readline()[1:])
+                args.append(self.rfile.read(length + 2)[:-2])
+            self.wfile.write(self.server.execute(args))
+
+
+class FakeRedisServer(socketserver.ThreadingTCPServer):
+    """Just enough of GET/MGET/SET/INCR/SADD/SMEMBERS/DEL/PEXPIRE for the shared cache tier."""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), _FakeRedisHandler)
+        self.data: dict[bytes, tuple[object, float | None]] = {}
+        self.lock = threading.Lock()
+
+    def _live(self, key):
+        value, expires_at = self.data.get(key, (None, None))
+        if expires_at is not None and expires_at <= time.monotonic():
+            self.data.pop(key, None)
+            return None
+        return value
+
+    def execute(self, args) -> bytes:
+        command, *rest = args
+        with self.lock:
+            if command == b"GET":
+                value = self._live(rest[0])
+                return b"$-1\r\n" if value is None else b"$%d\r\n%s\r\n" % (len(value), value)
+            if command == b"MGET":
+                values = [self._live(key) for key in rest]
+                return b"*%d\r\n" % len(values) + b"".join(
+                    b"$-1\r\n" if value is None else b"$%d\r\n%s\r\n" % (len(value), value) for value in values
+                )
+            if command == b"INCR":
+                value = int(self._live(rest[0]) or 0) + 1
+                self.data[rest[0]] = (str(value).encode(), self.data.get(rest[0], (None, None))[1])
+                return b":%d\r\n" % value
+            if command == b"SET":
+                expires_at = time.monotonic() + int(rest[3]) / 1000 if len(rest) > 2 else None
+                self.data[rest[0]] = (rest[1], expires_at)
+                return b"+OK\r\n"
+            if command == b"SADD":
+                members = self._live(rest[0]) or set()
+                members.update(rest[1:])
+                self.data[rest[0]] = (members, None)
+                return b":1\r\n"
+            if command == b"PEXPIRE":
+                if rest[0] in self.data:
+                    self.data[rest[0]] = (self.data[rest[0]][0], time.monotonic() + int(rest[1]) / 1000)
+                return b":1\r\n"
+            if command == b"SMEMBERS":
+                members = self._live(rest[0]) or set()
+                return b"*%d\r\n" % len(members) + b"".join(b"$%d\r\n%s\r\n" % (len(m), m) for m in members)
+            if command == b"DEL":
+                removed = sum(self.data.pop(key, None) is not None for key in rest)
+                return b":%d\r\n" % removed
+        return b"-ERR unknown command\r\n"
+
+
+@pytest.fixture(name="redis_url")
+def redis_url_fixture():
+    server = FakeRedisServer()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"redis://127.0.0.1:{server.server_address[1]}/0"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.mark.unit
+def test_lru_evicts_least_recent_expires_and_drops_tags():
+    lru = LRUCache(max_entries=2)
+    lru.set("a", 1, ttl=60, tags=("deck:1",))
+    lru.set("b", 2, ttl=60)
+    lru.get("a")
+    lru.set("c", 3, ttl=60)
+    assert lru.get("b") == (False, None)
+    assert lru.get("a") == (True, 1)
+
+    lru.invalidate_tags(["deck:1"])
+    assert lru.get("a") == (False, None)
+
+    lru.set("d", 4, ttl=0)
+    assert lru.get("d") == (False, None)
+
+
+@pytest.mark.unit
+def test_encoding_is_compact_and_round_trips():
+    small = {"id": 1, "title": "Deck"}
+    assert encode(small) == b'j{"id":1,"title":"Deck"}'
+    large = [{"prompt": "What is the capital of Peru?", "answer": "Lima"}] * 100
+    payload = encode(large)
+    assert payload[:1] == b"z" and len(payload) < len(str(large))
+    assert decode(payload) == large
+
+
+@pytest.mark.unit
+def test_workers_share_entries_through_the_shared_tier(redis_url):
+    worker_a = Cache(max_entries=100, shared=RedisTier(redis_url), ttls={"deck": 60})
+    worker_b = Cache(max_entries=100, shared=RedisTier(redis_url), ttls={"deck": 60})
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return {"title": "Deck"}
+
+    assert worker_a.get_or_compute("deck", 1, compute, tags=["deck:1"]) == {"title": "Deck"}
+    assert worker_a.get_or_compute("deck", 1, compute, tags=["deck:1"]) == {"title": "Deck"}
+    assert worker_b.get_or_compute("deck", 1, compute, tags=["deck:1"]) == {"title": "Deck"}
+    assert len(calls) == 1
+
+    # The writing worker clears the shared tier; every worker clears its own LRU from the bus
+    worker_a.invalidate_shared(["deck:1"])
+    worker_a.invalidate_local(["deck:1"])
+    worker_b.invalidate_local(["deck:1"])
+    worker_b.get_or_compute("deck", 1, compute, tags=["deck:1"])
+    assert len(calls) == 2
+
+    assert metrics.snapshot()["cache_deck_hit_ratio"]["value"] > 0
+
+
+@pytest.mark.unit
+def test_values_computed_across_an_invalidation_are_not_stored(redis_url):
+    worker = Cache(max_entries=100, shared=RedisTier(redis_url), ttls={"deck": 60})
+    other = Cache(max_entries=100, shared=RedisTier(redis_url), ttls={"deck": 60})
+
+    def compute_during_write():
+        # The write commits and is published while the read is still computing
+        worker.invalidate_local(["deck:1"])
+        worker.invalidate_shared(["deck:1"])
+        return {"title": "Before the write"}
+
+    assert worker.get_or_compute("deck", 1, compute_during_write, tags=["deck:1"]) == {"title": "Before the write"}
+    assert worker.get_or_compute("deck", 1, lambda: {"title": "After"}, tags=["deck:1"]) == {"title": "After"}
+    assert other.get_or_compute("deck", 1, lambda: {"title": "Recomputed"}, tags=["deck:1"]) == {"title": "After"}
+
+    # Another worker's invalidation of the shared tier voids the store there too
+    def compute_during_remote_write():
+        worker.invalidate_shared(["deck:2"])
+        return "stale"
+
+    other.get_or_compute("deck", 2, compute_during_remote_write, tags=["deck:2"])
+    assert worker.shared.get("deck:2") is None
+
+    local_only = LRUCache(max_entries=10)
+    generation = local_only.generation(("user:1",))
+    local_only.invalidate_tags(["user:1"])
+    assert not local_only.set("due_reviews:1", [], 60, ("user:1",), generation)
+    assert local_only.get("due_reviews:1") == (False, None)
+
+
+@pytest.mark.unit
+def test_unreachable_shared_tier_falls_back_to_compute():
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    tier = RedisTier(f"redis://127.0.0.1:{port}")
+    worker = Cache(max_entries=10, shared=tier)
+    assert worker.get_or_compute("deck", 1, lambda: "fresh") == "fresh"
+    assert tier.get("deck:1") is None
+
+
+@pytest.mark.integration
+def test_deck_reads_are_cached_until_the_deck_changes(client: TestClient, test_deck, test_user_token):
+    headers = {"Authorization": f"Bearer {test_user_token}"}
+    hits = metrics.counter("cache_deck_hits")
+    before = hits.value
+
+    assert client.get(f"/api/v1/decks/{test_deck.id}").json()["title"] == "Test Deck"
+    assert client.get(f"/api/v1/decks/{test_deck.id}").json()["title"] == "Test Deck"
+    assert hits.value == before + 1
+
+    response = client.put(f"/api/v1/decks/{test_deck.id}", json={"title": "Renamed"}, headers=headers)
+    assert response.status_code == 200
+    assert client.get(f"/api/v1/decks/{test_deck.id}").json()["title"] == "Renamed"
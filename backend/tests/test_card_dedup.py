@@ -0,0 +1,71 @@
+"""Tests for content-hash duplicate detection on card creation and import."""
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import select, update
+from sqlmodel import Session
+
+from app.models import Card, Deck
+from app.models.card import card_content_hash
+from app.services import decks as deck_service
+
+
+@pytest.mark.unit
+def test_content_hash_ignores_case_and_spacing_only():
+    assert card_content_hash("What is  H2O?", "Water") == card_content_hash(" what is h2o? ", "WATER")
+    assert card_content_hash("What is H2O?", "Water") != card_content_hash("What is H2O?", "Ice")
+    assert card_content_hash("a b", "c") != card_content_hash("a", "b c")
+
+
+@pytest.mark.integration
+def test_reimport_writes_only_the_rows_that_differ(client: TestClient, db: Session, test_deck: Deck, test_user_token):
+    headers = {"Authorization": f"Bearer {test_user_token}"}
+    url = f"/api/v1/decks/{test_deck.id}/cards/import"
+    cards = [{"prompt": f"Q{i}", "answer": f"A{i}"} for i in range(4)]
+
+    first = client.post(url, json={"cards": cards + [{"prompt": "q0", "answer": "a0"}]}, headers=headers)
+    assert first.json() == {"created": 4, "updated": 0, "unchanged": 0}
+    assert client.post(url, json={"cards": cards}, headers=headers).json() == {
+        "created": 0,
+        "updated": 0,
+        "unchanged": 4,
+    }
+
+    cards[1]["explanation"] = "Because"
+    cards.append({"prompt": "Q4", "answer": "A4"})
+    response = client.post(url, json={"cards": cards, "on_duplicate": "update"}, headers=headers)
+    assert response.json() == {"created": 1, "updated": 1, "unchanged": 3}
+    explanations = dict(db.exec(select(Card.prompt, Card.explanation).where(Card.deck_id == test_deck.id)).all())
+    assert explanations == {"Q0": None, "Q1": "Because", "Q2": None, "Q3": None, "Q4": None}
+
+    allowed = client.post(url, json={"cards": cards[:2], "on_duplicate": "allow"}, headers=headers)
+    assert allowed.json()["created"] == 2
+
+
+@pytest.mark.integration
+def test_add_card_reuses_a_duplicate_when_asked(client: TestClient, test_deck: Deck, basic_card: Card, test_user_token):
+    headers = {"Authorization": f"Bearer {test_user_token}"}
+    url = f"/api/v1/decks/{test_deck.id}/cards"
+    card = {"prompt": f"  {basic_card.prompt.upper()} ", "answer": basic_card.answer}
+
+    skipped = client.post(url, params={"on_duplicate": "skip"}, json=card, headers=headers)
+    assert skipped.status_code == 200
+    assert skipped.json()["id"] == basic_card.id
+    updated = client.post(url, params={"on_duplicate": "update"}, json={**card, "explanation": "New"}, headers=headers)
+    assert (updated.status_code, updated.json()["id"], updated.json()["explanation"]) == (200, basic_card.id, "New")
+    assert client.post(url, json=card, headers=headers).status_code == 201
+
+
+@pytest.mark.integration
+def test_backfill_hashes_cards_without_touching_updated_at(db: Session, test_deck: Deck):
+    cards = [Card(deck_id=test_deck.id, prompt=f"Q{i}", answer=f"A{i}") for i in range(3)]
+    db.add_all(cards)
+    db.commit()
+    assert all(card.content_hash == card_content_hash(card.prompt, card.answer) for card in cards)
+    db.exec(update(Card).values(content_hash=None))
+    db.commit()
+    before = dict(db.exec(select(Card.id, Card.updated_at)).all())
+
+    assert deck_service.backfill_card_hashes(db) == len(cards)
+    db.expire_all()
+    assert all(card.content_hash == card_content_hash(card.prompt, card.answer) for card in cards)
+    assert dict(db.exec(select(Card.id, Card.updated_at)).all()) == before
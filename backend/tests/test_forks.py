@@ -0,0 +1,101 @@
+"""Tests for copy-on-write deck forks."""
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import func, select
+from sqlmodel import Session
+
+from app.models import Card, Deck, SRSReview
+from app.services import purge as purge_service
+
+
+def _add_cards(db: Session, deck: Deck, count: int = 5) -> list[int]:
+    db.add_all([Card(deck_id=deck.id, prompt=f"Q{i}", answer=f"A{i}") for i in range(count)])
+    db.commit()
+    return list(db.exec(select(Card.id).where(Card.deck_id == deck.id).order_by(Card.id)).scalars())
+
+
+def _card_rows(db: Session, deck_id: int) -> int:
+    return db.exec(select(func.count(Card.id)).where(Card.deck_id == deck_id)).scalar_one()
+
+
+@pytest.mark.integration
+def test_shared_fork_reads_the_source_cards_and_copies_them_on_write(
+    client: TestClient, db: Session, test_deck: Deck, test_user_token
+):
+    headers = {"Authorization": f"Bearer {test_user_token}"}
+    card_ids = _add_cards(db, test_deck)
+    source_id = test_deck.id
+
+    response = client.post(f"/api/v1/decks/{source_id}/fork", json={"title": "Mine"}, headers=headers)
+    assert response.status_code == 201
+    fork = response.json()
+    assert (fork["title"], fork["card_count"], fork["is_public"]) == ("Mine", 5, False)
+    assert _card_rows(db, fork["id"]) == 0
+
+    edited = client.put(f"/api/v1/decks/{fork['id']}/cards/{card_ids[0]}", json={"answer": "mine"}, headers=headers)
+    assert edited.status_code == 200
+    assert edited.json()["id"] != card_ids[0] and edited.json()["deck_id"] == fork["id"]
+    assert client.delete(f"/api/v1/decks/{fork['id']}/cards/{card_ids[1]}", headers=headers).status_code == 200
+    # The source's own edits keep showing through
+    client.put(f"/api/v1/decks/cards/{card_ids[2]}", json={"answer": "upstream"}, headers=headers)
+
+    snapshot = client.get(f"/api/v1/decks/{fork['id']}", headers=headers).json()
+    answers = sorted(card["answer"] for card in snapshot["cards"])
+    assert answers == ["A3", "A4", "mine", "upstream"]
+    assert {card["deck_id"] for card in snapshot["cards"]} == {fork["id"]}
+    assert snapshot["forked_from_id"] == source_id
+    source = client.get(f"/api/v1/decks/{source_id}", headers=headers).json()
+    assert sorted(card["answer"] for card in source["cards"]) == ["A0", "A1", "A3", "A4", "upstream"]
+
+    session = client.post("/api/v1/study/sessions", json={"deck_id": fork["id"], "mode": "review"}, headers=headers)
+    answer_url = f"/api/v1/study/sessions/{session.json()['id']}/answer"
+    assert client.post(answer_url, json={"card_id": card_ids[3], "quality": 4}, headers=headers).status_code == 200
+    # Hidden from the fork
+    assert client.post(answer_url, json={"card_id": card_ids[1], "quality": 4}, headers=headers).status_code == 404
+
+
+@pytest.mark.integration
+def test_copy_mode_copies_every_card_in_one_statement(
+    client: TestClient, db: Session, test_deck: Deck, test_user_token
+):
+    headers = {"Authorization": f"Bearer {test_user_token}"}
+    card_ids = _add_cards(db, test_deck)
+
+    response = client.post(f"/api/v1/decks/{test_deck.id}/fork", json={"mode": "copy"}, headers=headers)
+    assert response.status_code == 201
+    fork_id = response.json()["id"]
+    copies = db.exec(select(Card).where(Card.deck_id == fork_id).order_by(Card.id)).scalars().all()
+    assert [card.source_card_id for card in copies] == card_ids
+    assert [card.answer for card in copies] == [f"A{i}" for i in range(5)]
+    assert db.get(Deck, fork_id).forked_from_id is None
+
+
+@pytest.mark.integration
+def test_purging_the_source_gives_its_forks_their_own_cards(
+    client: TestClient, db: Session, test_deck: Deck, test_user_token
+):
+    headers = {"Authorization": f"Bearer {test_user_token}"}
+    card_ids = _add_cards(db, test_deck, count=3)
+    source_id = test_deck.id
+    fork_id = client.post(f"/api/v1/decks/{source_id}/fork", json={}, headers=headers).json()["id"]
+    client.delete(f"/api/v1/decks/{fork_id}/cards/{card_ids[0]}", headers=headers)
+    session = client.post("/api/v1/study/sessions", json={"deck_id": fork_id, "mode": "review"}, headers=headers)
+    answer_url = f"/api/v1/study/sessions/{session.json()['id']}/answer"
+    assert client.post(answer_url, json={"card_id": card_ids[1], "quality": 4}, headers=headers).status_code == 200
+    synced = client.get(f"/api/v1/decks/{fork_id}/changes", headers=headers).json()
+    assert sorted(card["id"] for card in synced["cards"]) == card_ids[1:]
+
+    assert client.delete(f"/api/v1/decks/{source_id}", headers=headers).status_code == 200
+    db.expire_all()
+    assert db.get(Deck, source_id) is None
+    assert db.get(Deck, fork_id).forked_from_id is None
+    copies = {card.source_card_id: card.id for card in db.exec(select(Card).where(Card.deck_id == fork_id)).scalars()}
+    assert sorted(copies) == card_ids[1:]
+    # The review state of the studied card followed it into the fork
+    assert db.exec(select(SRSReview.card_id)).scalars().all() == [copies[card_ids[1]]]
+    assert purge_service.purge_deleted_decks(db) == 0
+    # Delta sync clients of the fork swap the shared cards for the copies
+    changes = client.get(f"/api/v1/decks/{fork_id}/changes", params={"since": synced["cursor"]}, headers=headers).json()
+    assert not changes["reset"]
+    assert set(card_ids[1:]) <= set(changes["deleted_card_ids"])
+    assert sorted(card["id"] for card in changes["cards"]) == sorted(copies.values())
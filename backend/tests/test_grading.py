@@ -0,0 +1,136 @@
+"""Tests for the batched answer-grading pipeline."""
+import asyncio
+import datetime as dt
+
+import pytest
+from sqlmodel import Session
+
+from app.models import Card
+from app.schemas.study import StudyAnswerCreate
+from app.services import study as study_service
+from app.services.grading import AnswerGrader, LocalGradingBackend
+
+
+class _RecordingBackend(LocalGradingBackend):
+    def __init__(self, delay: float = 0.0) -> None:
+        super().__init__()
+        self.delay = delay
+        self.batches: list[list[str]] = []
+        self.active = 0
+        self.max_active = 0
+
+    async def grade(self, requests):
+        self.batches.append([request.answer for request in requests])
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            await asyncio.sleep(self.delay)
+            return await super().grade(requests)
+        finally:
+            self.active -= 1
+
+
+def _card(card_id: int = 1, answer: str = "Photosynthesis") -> Card:
+    card = Card(id=card_id, deck_id=1, prompt="How do plants make sugar?", answer=answer)
+    card.updated_at = dt.datetime(2026, 10, 19, tzinfo=dt.timezone.utc)
+    return card
+
+
+def _run(grader: AnswerGrader, scenario):
+    async def wrapped():
+        await grader.start()
+        try:
+            return await scenario()
+        finally:
+            await grader.stop()
+
+    return asyncio.run(wrapped())
+
+
+@pytest.mark.unit
+def test_answers_are_batched_deduplicated_and_memoized():
+    backend = _RecordingBackend()
+    grader = AnswerGrader(backend, max_batch=10, max_delay=0.05)
+    card = _card()
+
+    async def scenario():
+        first = await asyncio.gather(
+            grader.grade(card, "photosynthesis"),
+            grader.grade(card, "Photosynthesis!"),
+            grader.grade(card, "fotosynthesis"),
+            grader.grade(card, "respiration"),
+        )
+        again = await asyncio.gather(grader.grade(card, "FOTOSYNTHESIS"), grader.grade(card, "photosynthesis"))
+        return first, again
+
+    first, again = _run(grader, scenario)
+
+    assert backend.batches == [["photosynthesis", "fotosynthesis", "respiration"]]
+    assert [grade.is_correct for grade in first] == [True, True, True, False]
+    assert again == [first[2], first[0]]
+
+
+@pytest.mark.unit
+def test_edited_cards_are_graded_again():
+    backend = _RecordingBackend()
+    grader = AnswerGrader(backend, max_delay=0.001)
+    card = _card()
+
+    async def scenario():
+        before = await grader.grade(card, "chemosynthesis")
+        card.answer = "Chemosynthesis"
+        card.updated_at += dt.timedelta(minutes=1)
+        return before, await grader.grade(card, "chemosynthesis")
+
+    before, after = _run(grader, scenario)
+    assert (before.is_correct, after.is_correct) == (False, True)
+    assert len(backend.batches) == 2
+
+
+@pytest.mark.unit
+def test_concurrent_backend_calls_are_limited():
+    backend = _RecordingBackend(delay=0.02)
+    grader = AnswerGrader(backend, max_batch=1, max_concurrency=2)
+
+    async def scenario():
+        return await asyncio.gather(*(grader.grade(_card(card_id), "photosynthesis") for card_id in range(6)))
+
+    grades = _run(grader, scenario)
+    assert all(grade.is_correct for grade in grades)
+    assert len(backend.batches) == 6
+    assert backend.max_active == 2
+
+
+@pytest.mark.unit
+def test_slow_backends_fall_back_to_exact_matching(db: Session, quiz_session, basic_card, test_user, monkeypatch):
+    grader = AnswerGrader(_RecordingBackend(delay=1.0), max_delay=0.001, timeout=0.05)
+    monkeypatch.setattr(study_service, "answer_grader", grader)
+
+    async def scenario():
+        slow = await grader.grade(basic_card, "Lima")
+        response, feedback = await study_service.record_answer(
+            db, quiz_session, basic_card, test_user, StudyAnswerCreate(card_id=basic_card.id, user_answer="lima")
+        )
+        return slow, response, feedback
+
+    slow, response, feedback = _run(grader, scenario)
+
+    assert slow is None
+    assert response.is_correct is True
+    assert feedback is None
+
+
+@pytest.mark.unit
+def test_grading_feedback_is_recorded(db: Session, quiz_session, basic_card, test_user, monkeypatch):
+    grader = AnswerGrader(_RecordingBackend(), max_delay=0.001)
+    monkeypatch.setattr(study_service, "answer_grader", grader)
+
+    async def scenario():
+        return await study_service.record_answer(
+            db, quiz_session, basic_card, test_user, StudyAnswerCreate(card_id=basic_card.id, user_answer="Quito")
+        )
+
+    response, feedback = _run(grader, scenario)
+
+    assert response.is_correct is False
+    assert feedback == "Expected: Lima"
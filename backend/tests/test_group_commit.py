@@ -0,0 +1,61 @@
+"""Tests for group-committed answer writes."""
+import asyncio
+import datetime as dt
+
+import pytest
+from sqlmodel import Session, select
+
+from app.core.metrics import metrics
+from app.models import QuizResponse, QuizSession, SRSReview
+from app.services.group_commit import GroupCommitBuffer
+from app.services.study import _AnswerWrite, _write_answer_batch
+
+
+def _answer(quiz_session, card, quality) -> _AnswerWrite:
+    return _AnswerWrite(
+        session_id=quiz_session.id,
+        user_id=quiz_session.user_id,
+        card_id=card.id,
+        user_answer=None,
+        quality=quality,
+        is_correct=None,
+        update_srs=True,
+        responded_at=dt.datetime.now(dt.timezone.utc),
+    )
+
+
+@pytest.mark.unit
+def test_concurrent_answers_share_one_commit(engine, db: Session, quiz_session, basic_card):
+    buffer = GroupCommitBuffer("test_answers", _write_answer_batch, lambda: Session(engine), max_batch=10, max_delay=0.05)
+    commits_before = metrics.meter("test_answers_commits").value
+
+    async def scenario():
+        await buffer.start()
+        results = await asyncio.gather(*(buffer.submit(_answer(quiz_session, basic_card, q)) for q in (5, 4, 3)))
+        await buffer.stop()
+        return results
+
+    responses = asyncio.run(scenario())
+
+    assert all(response.id is not None for response in responses)
+    assert metrics.meter("test_answers_commits").value - commits_before == 1
+    assert len(db.exec(select(QuizResponse)).all()) == 3
+    db.expire_all()
+    assert db.get(QuizSession, quiz_session.id).total_responses == 3
+    review = db.exec(select(SRSReview)).one()
+    assert review.repetitions == 3 and review.interval_days > 6
+
+
+@pytest.mark.unit
+def test_batch_failure_reaches_every_waiter(engine):
+    def failing_writer(db, items):
+        raise RuntimeError("disk full")
+
+    buffer = GroupCommitBuffer("test_failing", failing_writer, lambda: Session(engine), max_batch=2, max_delay=1)
+
+    async def scenario():
+        await buffer.start()
+        return await asyncio.gather(buffer.submit(1), buffer.submit(2), return_exceptions=True)
+
+    results = asyncio.run(scenario())
+    assert [str(result) for result in results] == ["disk full", "disk full"]
@@ -0,0 +1,29 @@
+"""Tests guarding the import cost of the application package."""
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+
+
+@pytest.mark.slow
+def test_app_main_defers_heavy_dependencies():
+    probe = (
+        "import sys, app.main; "
+        "print(','.join(sorted(m for m in ('passlib', 'argon2', 'jose', 'cryptography') if m in sys.modules)))"
+    )
+    env = {**os.environ, "DATABASE_URL": os.environ.get("DATABASE_URL", "sqlite://")}
+    result = subprocess.run([sys.executable, "-c", probe], cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == ""
+
+
+@pytest.mark.unit
+def test_password_hashing_loads_lazily():
+    from app.services.auth import hash_password, verify_password
+
+    hashed = hash_password("correct horse")
+    assert verify_password("correct horse", hashed)
+    assert not verify_password("wrong horse", hashed)
@@ -0,0 +1,88 @@
+"""Tests for the cross-worker cache invalidation bus."""
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlmodel import Session, select
+
+from app.core.metrics import metrics
+from app.services import invalidation
+from app.services.invalidation import (
+    InMemoryBackend,
+    InMemoryHub,
+    InvalidationBus,
+    UnixSocketBackend,
+    deck_key,
+    invalidate_after_commit,
+    user_key,
+)
+
+
+@pytest.fixture(name="peer")
+def peer_fixture(monkeypatch):
+    """Start this worker's bus and a second worker's bus on a shared in-memory hub."""
+    hub = InMemoryHub()
+    local = InvalidationBus(InMemoryBackend(hub))
+    peer = InvalidationBus(InMemoryBackend(hub))
+    peer.received = []
+    peer.subscribe(peer.received.extend)
+    local.start()
+    peer.start()
+    monkeypatch.setattr(invalidation, "invalidation_bus", local)
+    yield peer
+    local.stop()
+    peer.stop()
+
+
+@pytest.mark.unit
+def test_keys_are_published_only_after_commit(db: Session, peer):
+    lag = metrics.summary("cache_invalidation_lag_seconds")
+    observed = lag.snapshot()["count"]
+
+    invalidate_after_commit(db, "deck:1", "user:2")
+    assert peer.received == []
+    db.commit()
+    assert sorted(peer.received) == ["deck:1", "user:2"]
+    assert lag.snapshot()["count"] == observed + 1
+
+    db.exec(select(1))
+    invalidate_after_commit(db, "deck:3")
+    db.rollback()
+    db.commit()
+    assert "deck:3" not in peer.received
+
+
+@pytest.mark.integration
+def test_deck_and_user_mutations_invalidate(client: TestClient, test_deck, test_user, test_user_token, peer):
+    headers = {"Authorization": f"Bearer {test_user_token}"}
+    response = client.put(f"/api/v1/decks/{test_deck.id}", json={"title": "Renamed"}, headers=headers)
+    assert response.status_code == 200
+    assert peer.received == [deck_key(test_deck.id)]
+
+    response = client.put(f"/api/v1/me/decks/{test_deck.id}/pin", json={"pinned": True}, headers=headers)
+    assert response.status_code == 200
+    assert peer.received[-1] == user_key(test_user.id)
+
+
+@pytest.mark.unit
+def test_unix_socket_backend_delivers_between_buses(tmp_path):
+    sender = InvalidationBus(UnixSocketBackend(tmp_path))
+    receiver = InvalidationBus(UnixSocketBackend(tmp_path))
+    delivered = threading.Event()
+    received = []
+
+    def on_keys(keys):
+        received.extend(keys)
+        delivered.set()
+
+    receiver.subscribe(on_keys)
+    sender.start()
+    receiver.start()
+    try:
+        sender.invalidate(["deck:7"])
+        assert delivered.wait(timeout=5)
+        assert received == ["deck:7"]
+    finally:
+        sender.stop()
+        receiver.stop()
+    assert list(tmp_path.glob("*.sock")) == []
@@ -0,0 +1,17 @@
+"""Tests for the in-process metrics endpoint."""
+import pytest
+from fastapi.testclient import TestClient
+
+from app.models import User
+
+
+@pytest.mark.integration
+def test_metrics_are_hidden_from_regular_users(client: TestClient, test_user: User):
+    assert client.get("/api/v1/metrics").status_code == 403
+
+
+@pytest.mark.integration
+def test_admins_can_read_metrics(client: TestClient, admin_user: User):
+    response = client.get("/api/v1/metrics")
+    assert response.status_code == 200
+    assert isinstance(response.json(), dict)
@@ -0,0 +1,55 @@
+"""Tests for MessagePack content negotiation on deck and study reads."""
+import datetime as dt
+
+import msgpack
+import pytest
+from fastapi.testclient import TestClient
+from starlette.requests import Request
+
+from app.api.negotiation import COLUMNS_KEY, MSGPACK_MEDIA_TYPE, to_wire, wants_msgpack
+
+
+def _request(accept: str) -> Request:
+    return Request({"type": "http", "headers": [(b"accept", accept.encode())]})
+
+
+@pytest.mark.unit
+def test_accept_header_negotiation():
+    assert wants_msgpack(_request("application/msgpack"))
+    assert wants_msgpack(_request("application/json;q=0.5, application/x-msgpack"))
+    assert not wants_msgpack(_request("application/json, application/msgpack;q=0.5"))
+    assert not wants_msgpack(_request("application/msgpack;q=0"))
+    assert not wants_msgpack(_request("*/*"))
+
+
+@pytest.mark.unit
+def test_lists_of_records_become_columns_with_epoch_timestamps():
+    moment = dt.datetime(2026, 10, 19, tzinfo=dt.timezone.utc)
+    wire = to_wire({
+        "title": "Deck",
+        "cards": [
+            {"id": 1, "updated_at": moment, "review": {"due_at": moment}},
+            {"id": 2, "updated_at": moment.replace(microsecond=500_000), "review": None},
+        ],
+    })
+    cards = wire["cards"]
+    assert cards[COLUMNS_KEY] == ["id", "updated_at", "review"]
+    assert cards["id"] == [1, 2]
+    assert cards["updated_at"] == [int(moment.timestamp()), moment.timestamp() + 0.5]
+    assert cards["review"] == [{"due_at": int(moment.timestamp())}, None]
+
+
+@pytest.mark.integration
+def test_deck_read_negotiates_msgpack(client: TestClient, test_deck, basic_card):
+    response = client.get(f"/api/v1/decks/{test_deck.id}", headers={"Accept": MSGPACK_MEDIA_TYPE})
+    assert response.headers["content-type"] == MSGPACK_MEDIA_TYPE
+    assert response.headers["vary"] == "Accept"
+    deck = msgpack.unpackb(response.content)
+    assert deck["title"] == "Test Deck"
+    assert deck["cards"]["id"] == [basic_card.id]
+    assert isinstance(deck["cards"]["created_at"][0], (int, float))
+
+    response = client.get(f"/api/v1/decks/{test_deck.id}")
+    assert response.headers["content-type"] == "application/json"
+    assert response.headers["vary"] == "Accept"
+    assert len(response.content) > len(msgpack.packb(deck))
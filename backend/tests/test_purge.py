@@ -0,0 +1,110 @@
+"""Tests for set-based deletion of decks and accounts."""
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import func, select
+from sqlmodel import Session
+
+from app.core.config import settings
+from app.models import (
+    Card,
+    CardTombstone,
+    Deck,
+    QuizResponse,
+    QuizSession,
+    ReviewLog,
+    SRSReview,
+    User,
+    UserDailyActivity,
+    UserDeckProgress,
+)
+from app.services import purge as purge_service
+
+COUNTED = (Card, QuizSession, QuizResponse, SRSReview, ReviewLog, UserDeckProgress, CardTombstone)
+
+
+def _counts(db: Session) -> dict[str, int]:
+    db.expire_all()
+    return {model.__name__: db.exec(select(func.count()).select_from(model)).scalar_one() for model in COUNTED}
+
+
+def _study(client: TestClient, db: Session, deck: Deck, headers: dict, cards: int = 5) -> None:
+    db.add_all([Card(deck_id=deck.id, prompt=f"Q{i}", answer="A") for i in range(cards)])
+    db.commit()
+    card_ids = db.exec(select(Card.id).where(Card.deck_id == deck.id)).scalars().all()
+    session = client.post("/api/v1/study/sessions", json={"deck_id": deck.id, "mode": "review"}, headers=headers)
+    session_id = session.json()["id"]
+    for card_id in card_ids:
+        response = client.post(
+            f"/api/v1/study/sessions/{session_id}/answer", json={"card_id": card_id, "quality": 4}, headers=headers
+        )
+        assert response.status_code == 200
+    client.delete(f"/api/v1/decks/{deck.id}/cards/{card_ids[0]}", headers=headers)
+
+
+@pytest.mark.integration
+def test_deleting_a_deck_removes_its_rows_in_chunks(
+    client: TestClient, db: Session, test_deck: Deck, test_user_token, monkeypatch
+):
+    headers = {"Authorization": f"Bearer {test_user_token}"}
+    deck_id = test_deck.id
+    _study(client, db, test_deck, headers)
+    before = _counts(db)
+    assert before["QuizResponse"] == 4 and before["CardTombstone"] == 1
+    monkeypatch.setattr(settings, "PURGE_CHUNK_SIZE", 2)
+
+    assert client.delete(f"/api/v1/decks/{test_deck.id}", headers=headers).status_code == 200
+
+    assert _counts(db) == {
+        "Card": 0,
+        "QuizSession": 0,
+        "QuizResponse": 0,
+        "SRSReview": 0,
+        # History outlives the deck
+        "ReviewLog": before["ReviewLog"],
+        "UserDeckProgress": 0,
+        "CardTombstone": 0,
+    }
+    assert db.get(Deck, deck_id) is None
+
+
+@pytest.mark.integration
+def test_large_decks_disappear_at_once_and_are_purged_in_the_background(
+    client: TestClient, engine, db: Session, test_deck: Deck, test_user_token, monkeypatch
+):
+    headers = {"Authorization": f"Bearer {test_user_token}"}
+    deck_id = test_deck.id
+    _study(client, db, test_deck, headers)
+    monkeypatch.setattr(settings, "DECK_PURGE_INLINE_MAX_CARDS", 1)
+    purged = []
+    monkeypatch.setattr(purge_service, "purge_deck_in_background", purged.append)
+
+    assert client.delete(f"/api/v1/decks/{deck_id}", headers=headers).status_code == 200
+    assert purged == [deck_id]
+    assert client.get(f"/api/v1/decks/{deck_id}").status_code == 404
+    assert all(deck["id"] != deck_id for deck in client.get("/api/v1/decks").json())
+    assert _counts(db)["Card"] == 4
+
+    with Session(engine) as sweeper:
+        assert purge_service.purge_deleted_decks(sweeper) == 1
+    assert _counts(db)["Card"] == 0
+    assert db.get(Deck, deck_id) is None
+
+
+@pytest.mark.integration
+def test_deleting_an_account_removes_its_study_data_and_keeps_its_decks(
+    client: TestClient, db: Session, test_deck: Deck, test_user: User, test_user_token
+):
+    headers = {"Authorization": f"Bearer {test_user_token}"}
+    _study(client, db, test_deck, headers)
+    user_id = test_user.id
+
+    assert client.delete("/api/v1/me", headers=headers).status_code == 200
+
+    counts = _counts(db)
+    assert counts["Card"] == 4 and counts["CardTombstone"] == 1
+    assert {name: counts[name] for name in ("QuizSession", "QuizResponse", "SRSReview", "ReviewLog")} == dict.fromkeys(
+        ("QuizSession", "QuizResponse", "SRSReview", "ReviewLog"), 0
+    )
+    assert db.exec(select(UserDailyActivity).where(UserDailyActivity.user_id == user_id)).first() is None
+    assert db.get(User, user_id) is None
+    assert db.get(Deck, test_deck.id).owner_user_id is None
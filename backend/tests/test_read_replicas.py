@@ -0,0 +1,119 @@
+"""Tests for read-replica routing, using one SQLite file as the primary and one as the replica."""
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import sessionmaker
+from sqlmodel import Session, SQLModel, create_engine, select
+
+from app.db import session as session_module
+from app.db.session import LAST_WRITE_COOKIE, RoutingSession
+from app.main import app
+from app.models import Deck, User
+from app.models.enums import UserRole
+from app.services.auth import create_access_token
+
+
+def _seed(engine, *deck_titles: str) -> None:
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as db:
+        user = User(email="student@flashcards.local", hashed_password="x", role=UserRole.USER)
+        db.add(user)
+        db.flush()
+        for title in deck_titles:
+            db.add(Deck(title=title, is_public=True, owner_user_id=user.id))
+        db.commit()
+
+
+@pytest.fixture(name="engines")
+def engines_fixture(tmp_path):
+    primary = create_engine(f"sqlite:///{tmp_path / 'primary.db'}")
+    replica = create_engine(f"sqlite:///{tmp_path / 'replica.db'}")
+    # The replica lags: it has not seen the primary's second deck yet
+    _seed(primary, "Replicated", "Primary only")
+    _seed(replica, "Replicated")
+    return primary, replica
+
+
+def _titles(db: Session) -> set[str]:
+    return set(db.exec(select(Deck.title)).all())
+
+
+@pytest.mark.unit
+def test_routing_session_reads_from_replica_until_it_writes(engines):
+    primary, replica = engines
+    with RoutingSession(bind=primary, replicas=[replica]) as db:
+        assert _titles(db) == {"Replicated", "Primary only"}
+
+        db.use_replica = True
+        assert _titles(db) == {"Replicated"}
+
+        db.add(Deck(title="New", is_public=True))
+        db.flush()
+        assert db.use_replica is False
+        assert _titles(db) == {"Replicated", "Primary only", "New"}
+        db.commit()
+
+    with Session(replica) as db:
+        assert "New" not in _titles(db)
+
+
+@pytest.mark.unit
+def test_routing_session_keeps_one_replica(engines, tmp_path):
+    primary, replica = engines
+    other = create_engine(f"sqlite:///{tmp_path / 'other.db'}")
+    _seed(other, "Other replica")
+    with RoutingSession(bind=primary, replicas=[replica, other]) as db:
+        db.use_replica = True
+        first = _titles(db)
+        assert all(_titles(db) == first for _ in range(10))
+
+
+@pytest.mark.integration
+def test_read_routes_use_replica_with_read_your_writes(engines, monkeypatch):
+    primary, replica = engines
+    monkeypatch.setattr(
+        session_module,
+        "SessionLocal",
+        sessionmaker(bind=primary, class_=RoutingSession, replicas=[replica], expire_on_commit=False),
+    )
+    monkeypatch.setattr(session_module.settings, "REPLICA_STICKY_SECONDS", 60)
+    client = TestClient(app)
+    headers = {"Authorization": f"Bearer {create_access_token('1')}"}
+
+    def listed(reader: TestClient = client, **kwargs) -> set[str]:
+        response = reader.get("/api/v1/decks", headers=kwargs.get("headers", headers))
+        assert response.status_code == 200
+        return {deck["title"] for deck in response.json()}
+
+    assert listed() == {"Replicated"}
+
+    response = client.post("/api/v1/decks", json={"title": "Mine", "is_public": True}, headers=headers)
+    assert response.status_code == 201
+    # The writer reads from the primary and sees its own deck, on whichever worker serves it
+    assert listed() == {"Replicated", "Primary only", "Mine"}
+    elsewhere = TestClient(app, cookies={LAST_WRITE_COOKIE: response.cookies[LAST_WRITE_COOKIE]})
+    assert listed(elsewhere) == {"Replicated", "Primary only", "Mine"}
+    # The cookie is only honoured for the user who wrote, and only if it is intact
+    assert listed(headers={"Authorization": f"Bearer {create_access_token('2')}"}) == {"Replicated"}
+    forged = response.cookies[LAST_WRITE_COOKIE].rsplit(":", 1)[0] + ":" + "0" * 64
+    assert listed(TestClient(app, cookies={LAST_WRITE_COOKIE: forged})) == {"Replicated"}
+
+    monkeypatch.setattr(session_module.settings, "REPLICA_STICKY_SECONDS", 0)
+    assert listed() == {"Replicated"}
+
+
+@pytest.mark.integration
+def test_deck_snapshot_is_cached_from_the_primary(engines, monkeypatch):
+    primary, replica = engines
+    monkeypatch.setattr(
+        session_module,
+        "SessionLocal",
+        sessionmaker(bind=primary, class_=RoutingSession, replicas=[replica], expire_on_commit=False),
+    )
+    client = TestClient(app)
+
+    with Session(primary) as db:
+        deck_id = db.exec(select(Deck.id).where(Deck.title == "Primary only")).one()
+    # Not on the replica yet, but the snapshot is filled from the primary
+    response = client.get(f"/api/v1/decks/{deck_id}")
+    assert response.status_code == 200
+    assert response.json()["title"] == "Primary only"
@@ -0,0 +1,67 @@
+"""Tests for the append-only review log written alongside SRS updates."""
+import datetime as dt
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlmodel import Session, select
+
+from app.models import ReviewLog, SRSReview
+from app.services.review_log import SCHEDULER_CODES, _month_start
+from app.services.study import _AnswerWrite, _write_answer_batch
+
+
+@pytest.mark.integration
+def test_answer_appends_before_and_after_state(
+    client: TestClient, db: Session, quiz_session, basic_card, test_user_token
+):
+    headers = {"Authorization": f"Bearer {test_user_token}"}
+    for quality in (5, 5, 2):
+        response = client.post(
+            f"/api/v1/study/sessions/{quiz_session.id}/answer",
+            json={"card_id": basic_card.id, "quality": quality},
+            headers=headers,
+        )
+        assert response.status_code == 200
+
+    logs = db.exec(select(ReviewLog).order_by(ReviewLog.id)).all()
+    assert [log.quality for log in logs] == [5, 5, 2]
+    assert {log.scheduler for log in logs} == {SCHEDULER_CODES["sm2"]}
+    assert (logs[0].repetitions_before, logs[0].repetitions) == (0, 1)
+    # Each row starts from the state the previous one left behind
+    assert all(prev.interval_days == log.interval_days_before for prev, log in zip(logs, logs[1:]))
+    assert logs[2].repetitions == 0 and logs[2].elapsed_days >= 0
+
+    review = db.exec(select(SRSReview).where(SRSReview.card_id == basic_card.id)).one()
+    assert review.interval_days == logs[-1].interval_days
+    assert review.easiness == pytest.approx(logs[-1].easiness)
+
+
+@pytest.mark.unit
+def test_group_commit_batch_logs_every_review(db: Session, quiz_session, basic_card):
+    now = dt.datetime.now(dt.timezone.utc)
+    items = [
+        _AnswerWrite(
+            session_id=quiz_session.id,
+            user_id=quiz_session.user_id,
+            card_id=basic_card.id,
+            user_answer=None,
+            quality=quality,
+            is_correct=None,
+            update_srs=update_srs,
+            responded_at=now + dt.timedelta(days=day),
+        )
+        for day, (quality, update_srs) in enumerate([(4, True), (None, False), (3, True)])
+    ]
+    _write_answer_batch(db, items)
+    db.commit()
+
+    logs = db.exec(select(ReviewLog).order_by(ReviewLog.id)).all()
+    assert [log.quality for log in logs] == [4, 3]
+    assert logs[1].elapsed_days == pytest.approx(2.0)
+    assert logs[1].repetitions_before == logs[0].repetitions == 1
+
+
+@pytest.mark.unit
+def test_month_start_rolls_over_years():
+    assert _month_start(dt.date(2026, 11, 17)) == dt.date(2026, 11, 1)
+    assert _month_start(dt.date(2026, 11, 17), 2) == dt.date(2027, 1, 1)
@@ -0,0 +1,109 @@
+"""Tests for materialized daily review queues."""
+import datetime as dt
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+
+from app.core.config import settings
+from app.models import Card, DailyReviewQueue, Deck, SRSReview
+from app.models.enums import CardType
+from app.services.review_queue import get_queue
+
+
+def _card(db: Session, deck: Deck, prompt: str) -> Card:
+    card = Card(deck_id=deck.id, type=CardType.BASIC, prompt=prompt, answer="A")
+    db.add(card)
+    db.flush()
+    return card
+
+
+@pytest.fixture(name="queued_deck")
+def queued_deck_fixture(db: Session, test_user, test_deck, monkeypatch) -> dict[str, int]:
+    """Three due reviews with different overdueness, one review not due, and three new cards."""
+    monkeypatch.setattr(settings, "QUEUE_NEW_CARDS_PER_DAY", 2)
+    now = dt.datetime.now(dt.timezone.utc)
+    cards = {}
+    for name, days_overdue, interval in (("slight", 1, 10), ("late", 3, 1), ("medium", 4, 8), ("future", -5, 10)):
+        card = cards[name] = _card(db, test_deck, name)
+        db.add(SRSReview(
+            user_id=test_user.id,
+            card_id=card.id,
+            repetitions=2,
+            interval_days=interval,
+            due_at=now - dt.timedelta(days=days_overdue),
+        ))
+    for name in ("new1", "new2", "new3"):
+        cards[name] = _card(db, test_deck, name)
+    db.commit()
+    return {name: card.id for name, card in cards.items()}
+
+
+@pytest.mark.integration
+def test_queue_orders_reviews_by_overdueness_then_new_cards(
+    client: TestClient, db: Session, test_user, test_deck, queued_deck, test_user_token
+):
+    headers = {"Authorization": f"Bearer {test_user_token}"}
+    page = client.get(f"/api/v1/study/queue?deck_id={test_deck.id}&limit=3", headers=headers).json()
+    assert page["card_ids"] == [queued_deck["late"], queued_deck["medium"], queued_deck["slight"]]
+    assert (page["total"], page["review_count"], page["new_count"]) == (5, 3, 2)
+    assert (page["cursor"], page["next_cursor"]) == (0, 3)
+
+    # Later reads the same day reuse the stored queue
+    stored = db.get(DailyReviewQueue, (test_user.id, test_deck.id))
+    assert get_queue(db, test_user.id, test_deck.id, stored.queue_date).built_at == stored.built_at
+
+    page = client.get(f"/api/v1/study/queue?deck_id={test_deck.id}&cursor=3", headers=headers).json()
+    assert page["card_ids"] == [queued_deck["new1"], queued_deck["new2"]]
+    assert page["next_cursor"] is None
+
+    # Without a cursor the read resumes where the last one started
+    page = client.get(f"/api/v1/study/queue?deck_id={test_deck.id}", headers=headers).json()
+    assert page["cursor"] == 3
+
+
+@pytest.mark.integration
+def test_queue_skips_cards_answered_since_it_was_built(
+    client: TestClient, db: Session, test_deck, queued_deck, quiz_session, test_user_token
+):
+    headers = {"Authorization": f"Bearer {test_user_token}"}
+    client.get(f"/api/v1/study/queue?deck_id={test_deck.id}", headers=headers)
+    client.post(
+        f"/api/v1/study/sessions/{quiz_session.id}/answer",
+        json={"card_id": queued_deck["late"], "quality": 4},
+        headers=headers,
+    )
+    page = client.get(f"/api/v1/study/queue?deck_id={test_deck.id}", headers=headers).json()
+    assert queued_deck["late"] not in page["card_ids"]
+    assert len(page["card_ids"]) == page["total"] - 1
+
+
+@pytest.mark.integration
+def test_queue_of_someone_elses_private_deck_is_forbidden(
+    client: TestClient, db: Session, test_user, admin_user, test_user_token
+):
+    deck = Deck(title="Hidden", is_public=False, owner_user_id=admin_user.id)
+    db.add(deck)
+    db.commit()
+    response = client.get(
+        f"/api/v1/study/queue?deck_id={deck.id}", headers={"Authorization": f"Bearer {test_user_token}"}
+    )
+    assert response.status_code == 403
+
+
+@pytest.mark.integration
+def test_bootstrap_creates_session_with_first_queued_cards(
+    client: TestClient, test_deck, queued_deck, test_user_token
+):
+    response = client.post(
+        "/api/v1/study/sessions/bootstrap?limit=2",
+        json={"deck_id": test_deck.id, "mode": "review"},
+        headers={"Authorization": f"Bearer {test_user_token}"},
+    )
+    assert response.status_code == 201
+    data = response.json()
+    assert data["session"]["status"] == "active" and data["session"]["deck_id"] == test_deck.id
+    assert [item["card"]["id"] for item in data["cards"]] == [queued_deck["late"], queued_deck["medium"]]
+    assert data["cards"][0]["review"]["interval_days"] == 1
+    assert data["queue"]["next_cursor"] == 2
+    assert data["cards"][-1]["review"]["due_at"] is not None
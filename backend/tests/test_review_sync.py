@@ -0,0 +1,102 @@
+"""Tests for offline review sync."""
+import datetime as dt
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlmodel import Session, select
+
+from app.models import QuizResponse, QuizSession, ReviewLog, SRSReview
+
+NOW = dt.datetime.now(dt.timezone.utc).replace(microsecond=0)
+
+
+def _review(client_id: str, quiz_session, card, quality: int, days_ago: float, **extra) -> dict:
+    return {
+        "client_review_id": client_id,
+        "session_id": quiz_session.id,
+        "card_id": card.id,
+        "quality": quality,
+        "reviewed_at": (NOW - dt.timedelta(days=days_ago)).isoformat(),
+        **extra,
+    }
+
+
+@pytest.mark.integration
+def test_sync_replays_reviews_in_time_order_with_real_timestamps(
+    client: TestClient, db: Session, quiz_session, basic_card, test_user_token
+):
+    headers = {"Authorization": f"Bearer {test_user_token}"}
+    # Uploaded out of order: day -7, then -1, then -6
+    batch = [
+        _review("b", quiz_session, basic_card, 5, 1),
+        _review("a", quiz_session, basic_card, 4, 7),
+        _review("c", quiz_session, basic_card, 5, 6),
+    ]
+    response = client.post("/api/v1/study/sync", json={"reviews": batch}, headers=headers)
+    assert response.status_code == 200
+    data = response.json()
+    assert [result["client_review_id"] for result in data["results"]] == ["a", "c", "b"]
+    assert {result["status"] for result in data["results"]} == {"applied"}
+
+    state = data["states"][0]
+    assert state["repetitions"] == 3
+    due_at = dt.datetime.fromisoformat(state["due_at"]).replace(tzinfo=dt.timezone.utc)
+    assert due_at == NOW - dt.timedelta(days=1) + dt.timedelta(days=state["interval_days"])
+
+    logs = db.exec(select(ReviewLog).order_by(ReviewLog.id)).all()
+    assert [log.quality for log in logs] == [4, 5, 5]
+    assert logs[1].elapsed_days == pytest.approx(1.0)
+    db.expire_all()
+    assert db.get(QuizSession, quiz_session.id).total_responses == 3
+
+    # Re-uploading the same batch changes nothing
+    again = client.post("/api/v1/study/sync", json={"reviews": batch}, headers=headers).json()
+    assert {result["status"] for result in again["results"]} == {"duplicate"}
+    assert len(db.exec(select(QuizResponse)).all()) == 3
+
+
+@pytest.mark.integration
+def test_sync_detects_reviews_from_other_devices(
+    client: TestClient, db: Session, quiz_session, basic_card, test_user, test_user_token
+):
+    other_device_at = NOW - dt.timedelta(days=2)
+    db.add(SRSReview(
+        user_id=test_user.id,
+        card_id=basic_card.id,
+        repetitions=2,
+        interval_days=6,
+        due_at=other_device_at + dt.timedelta(days=6),
+        last_reviewed_at=other_device_at,
+    ))
+    db.commit()
+    base = (NOW - dt.timedelta(days=10)).isoformat()
+
+    batch = [
+        _review("old", quiz_session, basic_card, 4, 3, base_reviewed_at=base),
+        _review("new", quiz_session, basic_card, 4, 1, base_reviewed_at=base),
+    ]
+    data = client.post(
+        "/api/v1/study/sync", json={"reviews": batch}, headers={"Authorization": f"Bearer {test_user_token}"}
+    ).json()
+    assert [(result["client_review_id"], result["status"]) for result in data["results"]] == [
+        ("old", "conflict"),
+        ("new", "merged"),
+    ]
+    assert data["states"][0]["repetitions"] == 3
+    assert len(db.exec(select(QuizResponse)).all()) == 2
+
+
+@pytest.mark.integration
+def test_sync_rejects_sessions_of_other_users(
+    client: TestClient, db: Session, quiz_session, basic_card, admin_user, test_user_token
+):
+    quiz_session.user_id = admin_user.id
+    db.add(quiz_session)
+    db.commit()
+    response = client.post(
+        "/api/v1/study/sync",
+        json={"reviews": [_review("x", quiz_session, basic_card, 4, 1)]},
+        headers={"Authorization": f"Bearer {test_user_token}"},
+    )
+    assert response.status_code == 404
+    assert db.exec(select(QuizResponse)).all() == []
@@ -0,0 +1,165 @@
+"""Tests for the SRS scheduler interface, FSRS scheduling and per-user FSRS fitting."""
+import datetime as dt
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+from sqlmodel import Session, select
+
+from app.models import QuizResponse, QuizSession, SRSReview
+from app.models.enums import QuizMode, QuizStatus
+from app.services.fsrs_optimizer import build_sequences, fit_weights, optimize_users, user_losses
+from app.services.scheduler import FSRS_DEFAULT_WEIGHTS, FSRSScheduler, SM2Scheduler, get_scheduler
+
+NOW = dt.datetime(2024, 6, 1, tzinfo=dt.timezone.utc)
+
+
+def _new_review() -> SRSReview:
+    return SRSReview(user_id=1, card_id=1, repetitions=0, interval_days=1, easiness=2.5, due_at=NOW)
+
+
+@pytest.mark.unit
+def test_fsrs_intervals_grow_with_successful_reviews_and_reset_on_lapse():
+    scheduler = FSRSScheduler()
+    review = _new_review()
+    scheduler.review(review, 4, NOW)
+    assert review.stability == pytest.approx(FSRS_DEFAULT_WEIGHTS[2])
+    assert review.interval_days == round(FSRS_DEFAULT_WEIGHTS[2])
+
+    now, intervals = NOW, []
+    for _ in range(3):
+        now += dt.timedelta(days=review.interval_days)
+        scheduler.review(review, 4, now)
+        intervals.append(review.interval_days)
+    assert intervals == sorted(intervals) and intervals[0] > round(FSRS_DEFAULT_WEIGHTS[2])
+
+    stability = review.stability
+    scheduler.review(review, 1, now + dt.timedelta(days=review.interval_days))
+    assert (review.repetitions, review.interval_days) == (0, 1)
+    assert review.stability < stability
+    assert review.due_at == review.last_reviewed_at + dt.timedelta(days=1)
+
+
+@pytest.mark.unit
+def test_fsrs_seeds_state_for_cards_scheduled_by_sm2():
+    review = _new_review()
+    sm2 = SM2Scheduler()
+    for day in range(3):
+        sm2.review(review, 5, NOW + dt.timedelta(days=day * 6))
+    assert review.stability is None
+
+    FSRSScheduler().review(review, 4, review.due_at)
+    assert review.stability > review.interval_days / 2
+    assert 1 <= review.difficulty <= 10
+
+    # A card that lapsed under SM-2 keeps its history rather than starting over as new
+    lapsed = _new_review()
+    for day in range(3):
+        sm2.review(lapsed, 5, NOW + dt.timedelta(days=day * 6))
+    sm2.review(lapsed, 1, NOW + dt.timedelta(days=30))
+    assert (lapsed.repetitions, lapsed.stability) == (0, None)
+    fsrs = FSRSScheduler()
+    reviewed_at = NOW + dt.timedelta(days=33)
+    expected = fsrs.next_state(float(lapsed.interval_days), fsrs.initial_difficulty(3), 3.0, 3)
+    fsrs.review(lapsed, 4, reviewed_at)
+    assert (lapsed.stability, lapsed.difficulty) == pytest.approx(expected)
+
+
+@pytest.mark.unit
+def test_deck_setting_overrides_user_setting(test_user):
+    assert get_scheduler(test_user).name == "sm2"
+    assert get_scheduler(test_user, "fsrs").name == "fsrs"
+    test_user.srs_scheduler = "fsrs"
+    test_user.fsrs_weights = [w * 1.1 for w in FSRS_DEFAULT_WEIGHTS]
+    scheduler = get_scheduler(test_user)
+    assert scheduler.name == "fsrs" and scheduler.w[0] == pytest.approx(FSRS_DEFAULT_WEIGHTS[0] * 1.1)
+    assert get_scheduler(test_user, "sm2").name == "sm2"
+
+
+@pytest.mark.integration
+def test_record_answer_uses_the_users_scheduler(
+    client: TestClient, db: Session, quiz_session, basic_card, test_user_token
+):
+    headers = {"Authorization": f"Bearer {test_user_token}"}
+    response = client.put("/api/v1/me/settings", json={"srs_scheduler": "fsrs"}, headers=headers)
+    assert response.status_code == 200
+    assert response.json()["srs_scheduler"] == "fsrs"
+
+    client.post(
+        f"/api/v1/study/sessions/{quiz_session.id}/answer",
+        json={"card_id": basic_card.id, "quality": 4},
+        headers=headers,
+    )
+    review = db.exec(select(SRSReview).where(SRSReview.card_id == basic_card.id)).one()
+    assert review.stability == pytest.approx(FSRS_DEFAULT_WEIGHTS[2])
+
+
+@pytest.mark.unit
+def test_build_sequences_collapses_same_day_reviews():
+    seqs = build_sequences(
+        user_index=np.array([0, 0, 0, 0, 1]),
+        card_ids=np.array([7, 7, 7, 8, 7]),
+        ratings=np.array([3, 1, 3, 4, 2], dtype=np.int8),
+        days=np.array([10.2, 10.9, 13.2, 11.0, 12.0]),
+        n_users=2,
+    )
+    assert seqs.lengths.tolist() == [2, 1, 1]
+    assert seqs.ratings[0].tolist() == [3, 3]
+    assert seqs.elapsed[0, 1] == pytest.approx(3.0)
+    assert seqs.reviews_per_user().tolist() == [1, 0]
+
+
+def _simulate(weights, cards: int, reviews: int, rng) -> list[tuple[int, int, float]]:
+    """(card, quality, day) reviews of ``cards`` new cards by a learner whose memory follows ``weights``."""
+    scheduler = FSRSScheduler(weights)
+    history = []
+    for card in range(cards):
+        review = _new_review()
+        now = NOW
+        quality = 4
+        for _ in range(reviews):
+            scheduler.review(review, quality, now)
+            history.append((card, quality, now.timestamp() / 86400))
+            elapsed = review.interval_days * rng.uniform(0.5, 3.0)
+            now += dt.timedelta(days=elapsed)
+            recalled = rng.random() < scheduler.retrievability(elapsed, review.stability)
+            quality = 4 if recalled else 1
+    return history
+
+
+@pytest.mark.unit
+def test_fitting_reduces_each_users_loss():
+    rng = np.random.default_rng(7)
+    defaults = np.asarray(FSRS_DEFAULT_WEIGHTS)
+    rows = []
+    for user in range(3):
+        true_weights = defaults * np.exp(rng.normal(0, 0.4, len(defaults)))
+        rows.extend((user, *review) for review in _simulate(true_weights, 40, 6, rng))
+    user_index, card_ids, qualities, days = (np.array(column) for column in zip(*rows))
+    ratings = np.where(qualities < 3, 1, qualities - 1).astype(np.int8)
+    seqs = build_sequences(user_index, card_ids, ratings, days.astype(float), n_users=3)
+
+    fitted = fit_weights(seqs, iterations=20)
+    default_loss = user_losses(np.tile(FSRS_DEFAULT_WEIGHTS, (3, 1)), seqs)
+    assert (user_losses(fitted, seqs) < default_loss).all()
+
+
+@pytest.mark.integration
+def test_optimize_users_stores_weights_for_users_with_history(db: Session, test_user, test_deck, basic_card):
+    test_user.srs_scheduler = "fsrs"
+    db.add(test_user)
+    session = QuizSession(
+        user_id=test_user.id, deck_id=test_deck.id, mode=QuizMode.REVIEW, status=QuizStatus.COMPLETED
+    )
+    db.add(session)
+    db.flush()
+    for day in range(0, 60, 3):
+        quality = 1 if day % 12 == 0 else 4
+        responded_at = NOW + dt.timedelta(days=day)
+        db.add(QuizResponse(session_id=session.id, card_id=basic_card.id, quality=quality, responded_at=responded_at))
+    db.commit()
+
+    assert optimize_users(db, min_reviews=100, iterations=2) == 0
+    assert optimize_users(db, min_reviews=10, iterations=2) == 1
+    db.refresh(test_user)
+    assert len(test_user.fsrs_weights) == len(FSRS_DEFAULT_WEIGHTS)
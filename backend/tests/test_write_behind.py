@@ -0,0 +1,116 @@
+"""Tests for the write-behind pipeline."""
+import asyncio
+import datetime as dt
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session, select
+
+from app.models import UserDailyActivity, UserDeckProgress
+from app.schemas.study import OfflineReview
+from app.services import study as study_service
+from app.services.write_behind import WriteBehindQueue
+
+
+@pytest.mark.unit
+def test_updates_are_coalesced_and_flushed_on_stop(engine, db: Session, test_user, test_deck, basic_card):
+    queue = WriteBehindQueue(session_factory=lambda: Session(engine), flush_interval=3600)
+    today = dt.date(2024, 6, 2)
+
+    async def scenario():
+        await queue.start()
+        for _ in range(3):
+            queue.queue_progress(db, test_user.id, test_deck.id)
+            queue.queue_activity(db, test_user.id, today, cards_reviewed=1, lapses=1)
+        queue.queue_streak(db, test_user, today - dt.timedelta(days=1))
+        queue.queue_streak(db, test_user, today)
+        db.commit()
+
+        # Nothing is written until the queue flushes
+        assert db.exec(select(UserDeckProgress)).first() is None
+        await queue.stop()
+
+    asyncio.run(scenario())
+    db.expire_all()
+
+    progress = db.exec(select(UserDeckProgress)).all()
+    assert [(p.user_id, p.deck_id) for p in progress] == [(test_user.id, test_deck.id)]
+    activity = db.exec(select(UserDailyActivity)).one()
+    assert (activity.cards_reviewed, activity.lapses) == (3, 3)
+    db.refresh(test_user)
+    assert (test_user.current_streak, test_user.last_activity_date) == (2, today)
+
+
+@pytest.mark.unit
+def test_updates_apply_inline_without_worker(db: Session, test_user, test_deck):
+    queue = WriteBehindQueue()
+    queue.queue_progress(db, test_user.id, test_deck.id)
+    db.commit()
+    assert db.exec(select(UserDeckProgress)).one().deck_id == test_deck.id
+
+
+@pytest.mark.unit
+def test_a_failing_update_is_dropped_without_holding_back_the_others(
+    engine, db: Session, test_user, test_deck, monkeypatch
+):
+    from app.services import progress as progress_service
+
+    queue = WriteBehindQueue(session_factory=lambda: Session(engine), flush_interval=3600)
+    update_deck_progress = progress_service.update_deck_progress
+
+    def fail_for_purged_deck(db, user_id, deck_id, studied_at=None):
+        if deck_id == -1:
+            raise RuntimeError("deck was purged")
+        update_deck_progress(db, user_id, deck_id, studied_at)
+
+    monkeypatch.setattr(progress_service, "update_deck_progress", fail_for_purged_deck)
+
+    async def scenario():
+        await queue.start()
+        queue.queue_progress(db, test_user.id, -1)
+        queue.queue_progress(db, test_user.id, test_deck.id)
+        queue.queue_activity(db, test_user.id, dt.date(2024, 6, 2), cards_reviewed=1, lapses=0)
+        db.commit()
+        await queue.flush()
+        await queue.stop()
+
+    asyncio.run(scenario())
+    db.expire_all()
+
+    assert [p.deck_id for p in db.exec(select(UserDeckProgress)).all()] == [test_deck.id]
+    assert db.exec(select(UserDailyActivity)).one().cards_reviewed == 1
+    assert not queue._pending
+
+
+@pytest.mark.unit
+def test_updates_of_a_rolled_back_transaction_are_dropped(
+    engine, db: Session, test_user, quiz_session, basic_card, monkeypatch
+):
+    queue = WriteBehindQueue(session_factory=lambda: Session(engine), flush_interval=3600)
+    monkeypatch.setattr(study_service, "write_behind", queue)
+    review = OfflineReview(
+        client_review_id="r1",
+        session_id=quiz_session.id,
+        card_id=basic_card.id,
+        quality=2,
+        reviewed_at=dt.datetime.now(dt.timezone.utc),
+    )
+
+    def racing_commit():
+        raise IntegrityError("INSERT INTO quiz_responses", {}, Exception("another upload committed first"))
+
+    async def scenario():
+        await queue.start()
+        monkeypatch.setattr(db, "commit", racing_commit)
+        with pytest.raises(HTTPException) as excinfo:
+            study_service.sync_offline_reviews(db, test_user, [review])
+        assert excinfo.value.status_code == 409
+        await queue.stop()
+
+    asyncio.run(scenario())
+    monkeypatch.undo()
+    db.expire_all()
+
+    assert db.exec(select(UserDailyActivity)).all() == []
+    assert db.exec(select(UserDeckProgress)).all() == []